@@ -1,34 +1,63 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import case, func, insert, or_, select, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, selectinload
 from fastapi import HTTPException
-from app.models.book import Book, Author, Publisher, BookCopy, BookCopyStatus
-from app.schemas.book import BookCreate, AuthorCreate, PublisherCreate, BookCopyCreate
+from app.models.book import Book, Author, Publisher, BookCopy, BookCopyStatus, book_authors
+from app.models.counters import LibraryCounter, LIBRARY_COUNTER_SHARDS, copies_counter
+from app.models.search import FTS_TABLE, fts_available, suspended_search_sync
+from contextlib import nullcontext
+from app.schemas.book import BookCreate, AuthorCreate, PublisherCreate, BookCopyCreate, BookImportRecord
+from app.schemas.pagination import ListView
+from app.core.pagination import paginate
+from app.core.response_cache import invalidate
+from pydantic import ValidationError
+from itertools import islice
 import logging
+import random
+import re
 
 logger = logging.getLogger("app")
 
+# Loader strategies matching the nesting of the read schemas. Many-to-one
+# relationships are joined, collections are fetched with one extra SELECT ... IN,
+# so serializing a page never falls back to per-row lazy loads.
+BOOK_READ_LOADERS = (joinedload(Book.publisher), selectinload(Book.authors))
+COPY_READ_LOADERS = (joinedload(BookCopy.book).options(*BOOK_READ_LOADERS),)
+
+# Columns matching BookSummary and BookCopySummary. Summary views select just
+# these as plain rows: no entities, identity map or related objects.
+BOOK_SUMMARY_COLUMNS = (
+    Book.id, Book.isbn, Book.title, Book.publication_year, Book.publisher_id, Book.available_copies,
+)
+COPY_SUMMARY_COLUMNS = (
+    BookCopy.id, BookCopy.book_id, BookCopy.shelf_location, BookCopy.status, Book.title.label("book_title"),
+)
+
 # --- Publisher ---
 def create_publisher(db: Session, publisher: PublisherCreate):
     db_publisher = Publisher(name=publisher.name)
     db.add(db_publisher)
+    invalidate(db, "publishers")
     db.commit()
     db.refresh(db_publisher)
-    logger.info(f"Publisher created: {db_publisher.name}")
+    logger.info("Publisher created: %s", db_publisher.name)
     return db_publisher
 
-def get_publishers(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Publisher).offset(skip).limit(limit).all()
+def get_publishers(db: Session, skip: int = 0, limit: int = 100, cursor: str = None):
+    return paginate(db.query(Publisher), Publisher.id, skip, limit, cursor)
 
 # --- Author ---
 def create_author(db: Session, author: AuthorCreate):
     db_author = Author(name=author.name)
     db.add(db_author)
+    invalidate(db, "authors")
     db.commit()
     db.refresh(db_author)
-    logger.info(f"Author created: {db_author.name}")
+    logger.info("Author created: %s", db_author.name)
     return db_author
 
-def get_authors(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Author).offset(skip).limit(limit).all()
+def get_authors(db: Session, skip: int = 0, limit: int = 100, cursor: str = None):
+    return paginate(db.query(Author), Author.id, skip, limit, cursor)
 
 # --- Book ---
 def create_book(db: Session, book: BookCreate):
@@ -42,25 +71,191 @@ def create_book(db: Session, book: BookCreate):
     if book.author_ids:
         authors = db.query(Author).filter(Author.id.in_(book.author_ids)).all()
         if len(authors) != len(book.author_ids):
-             logger.error(f"Book creation failed: One or more authors not found for IDs {book.author_ids}")
+             logger.error("Book creation failed: One or more authors not found for IDs %s", book.author_ids)
              raise HTTPException(status_code=400, detail="One or more authors not found")
         db_book.authors = authors
 
     db.add(db_book)
+    invalidate(db, "books")
     db.commit()
-    db.refresh(db_book)
-    logger.info(f"Book created: {db_book.title} (ISBN: {db_book.isbn})")
-    return db_book
+    logger.info("Book created: %s (ISBN: %s)", db_book.title, db_book.isbn)
+    return get_book(db, db_book.id)
 
-def get_books(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Book).offset(skip).limit(limit).all()
+def get_books(
+    db: Session, skip: int = 0, limit: int = 100, cursor: str = None, available: bool = None,
+    view: ListView = ListView.FULL,
+):
+    if view == ListView.SUMMARY:
+        query = db.query(*BOOK_SUMMARY_COLUMNS)
+    else:
+        query = db.query(Book).options(*BOOK_READ_LOADERS)
+    if available is not None:
+        query = query.filter(Book.available_copies > 0 if available else Book.available_copies == 0)
+    return paginate(query, Book.id, skip, limit, cursor)
 
 def get_book(db: Session, book_id: int):
-    book = db.query(Book).filter(Book.id == book_id).first()
+    book = db.query(Book).options(*BOOK_READ_LOADERS).filter(Book.id == book_id).first()
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
     return book
 
+# --- Search ---
+HIGHLIGHT_START, HIGHLIGHT_END = "<mark>", "</mark>"
+
+# bm25 column weights: title, authors, publisher, isbn
+_SEARCH_SQL = text(f"""
+    SELECT rowid AS book_id,
+           bm25({FTS_TABLE}, 10.0, 5.0, 2.0, 1.0) AS score,
+           highlight({FTS_TABLE}, 0, :hl_start, :hl_end) AS title,
+           highlight({FTS_TABLE}, 1, :hl_start, :hl_end) AS authors,
+           highlight({FTS_TABLE}, 2, :hl_start, :hl_end) AS publisher
+    FROM {FTS_TABLE}
+    WHERE {FTS_TABLE} MATCH :query
+    ORDER BY score
+    LIMIT :limit
+""")
+
+def _fts_query(q: str) -> str:
+    # Quote every term so user input can't inject FTS syntax, and make each a
+    # prefix match ("pyth" finds "python"). Terms are ANDed.
+    return " ".join(f'"{term}"*' for term in re.findall(r"\w+", q))
+
+def search_books(db: Session, q: str, limit: int = 20):
+    """Ranked catalog search over title, author names, publisher and ISBN."""
+    query = _fts_query(q)
+    if not query:
+        return []
+
+    if not fts_available(db.get_bind()):
+        pattern = f"%{q}%"
+        books = db.query(Book).options(*BOOK_READ_LOADERS).outerjoin(Book.publisher).filter(or_(
+            Book.title.ilike(pattern),
+            Book.isbn.ilike(pattern),
+            Publisher.name.ilike(pattern),
+            Book.authors.any(Author.name.ilike(pattern)),
+        )).order_by(Book.id).limit(limit).all()
+        return [{"book": book, "score": 0.0, "highlights": {}} for book in books]
+
+    rows = db.execute(_SEARCH_SQL, {
+        "query": query, "limit": limit, "hl_start": HIGHLIGHT_START, "hl_end": HIGHLIGHT_END,
+    }).all()
+    books = {
+        book.id: book
+        for book in db.query(Book).options(*BOOK_READ_LOADERS).filter(Book.id.in_([r.book_id for r in rows]))
+    }
+    results = []
+    for row in rows:
+        book = books.get(row.book_id)
+        if book is None:
+            continue
+        highlights = {
+            field: value
+            for field, value in (("title", row.title), ("authors", row.authors), ("publisher", row.publisher))
+            if value and HIGHLIGHT_START in value
+        }
+        # bm25() is lower-is-better; flip it so clients can sort descending
+        results.append({"book": book, "score": -row.score, "highlights": highlights})
+    return results
+
+# --- Copy counters ---
+# Book counter column per copy status; other statuses only count towards total_copies
+STATUS_COUNTERS = {
+    BookCopyStatus.AVAILABLE.value: "available_copies",
+    BookCopyStatus.ISSUED.value: "issued_copies",
+}
+
+def adjust_copy_counters(db: Session, book_id, **deltas):
+    """Add `deltas` to a book's counter columns in the caller's transaction.
+
+    `book_id` may be a SQL expression, e.g. a subquery on the copy being
+    changed. The increments are relative, so concurrent writers compose.
+    """
+    invalidate(db, "books")
+    db.execute(
+        update(Book)
+        .where(Book.id == book_id)
+        .values({getattr(Book, column): getattr(Book, column) + delta for column, delta in deltas.items()})
+        .execution_options(synchronize_session=False)
+    )
+
+def adjust_library_counters(db: Session, deltas: dict):
+    """Add `deltas` ({counter name: delta}) to the library-wide counters in the
+    caller's transaction, as one UPDATE of a random shard."""
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    db.execute(
+        update(LibraryCounter)
+        .where(LibraryCounter.name.in_(deltas), LibraryCounter.shard == random.randrange(LIBRARY_COUNTER_SHARDS))
+        .values(value=LibraryCounter.value + case(deltas, value=LibraryCounter.name))
+        .execution_options(synchronize_session=False)
+    )
+
+def _move_library_copies(db: Session, count, old_status: str, new_status: str):
+    adjust_library_counters(db, {copies_counter(old_status): -count, copies_counter(new_status): count})
+
+def copy_book_id(copy_id: int):
+    return select(BookCopy.book_id).where(BookCopy.id == copy_id).scalar_subquery()
+
+def move_copy_counters(db: Session, book_id, old_status: str, new_status: str):
+    """Counter bookkeeping for one copy of `book_id` going from `old_status` to `new_status`."""
+    if old_status == new_status:
+        return
+    _move_library_copies(db, 1, old_status, new_status)
+    deltas = {}
+    if old_status in STATUS_COUNTERS:
+        deltas[STATUS_COUNTERS[old_status]] = -1
+    if new_status in STATUS_COUNTERS:
+        deltas[STATUS_COUNTERS[new_status]] = 1
+    if deltas:
+        adjust_copy_counters(db, book_id, **deltas)
+
+def move_many_copy_counters(db: Session, moved: dict, old_status: str, new_status: str):
+    """move_copy_counters for `moved[book_id]` copies of each book, as one UPDATE."""
+    if not moved or old_status == new_status:
+        return
+    _move_library_copies(db, sum(moved.values()), old_status, new_status)
+    count = case(moved, value=Book.id)
+    values = {}
+    if old_status in STATUS_COUNTERS:
+        column = getattr(Book, STATUS_COUNTERS[old_status])
+        values[column] = column - count
+    if new_status in STATUS_COUNTERS:
+        column = getattr(Book, STATUS_COUNTERS[new_status])
+        values[column] = column + count
+    if values:
+        invalidate(db, "books")
+        db.execute(
+            update(Book)
+            .where(Book.id.in_(moved))
+            .values(values)
+            .execution_options(synchronize_session=False)
+        )
+
+def _counted_copies(status: str = None):
+    query = select(func.count()).select_from(BookCopy).where(BookCopy.book_id == Book.id)
+    if status is not None:
+        query = query.where(BookCopy.status == status)
+    return query.scalar_subquery()
+
+def reconcile_copy_counters(db: Session, dry_run: bool = False):
+    """Recount the copy counters of every book from book_copies and repair drift.
+
+    Returns the ids of the books whose counters were wrong. The repair is one
+    set-based UPDATE that only touches those books.
+    """
+    actual = {"total_copies": _counted_copies()}
+    actual.update({column: _counted_copies(status) for status, column in STATUS_COUNTERS.items()})
+    drifted = or_(*(getattr(Book, column) != count for column, count in actual.items()))
+
+    book_ids = list(db.scalars(select(Book.id).where(drifted).order_by(Book.id)))
+    if book_ids and not dry_run:
+        invalidate(db, "books")
+        db.execute(update(Book).where(drifted).values(actual).execution_options(synchronize_session=False))
+        db.commit()
+        logger.warning("Copy counters repaired for %d books", len(book_ids))
+    return book_ids
+
 # --- Copy ---
 def create_copy(db: Session, copy: BookCopyCreate):
     db_copy = BookCopy(
@@ -69,9 +264,146 @@ def create_copy(db: Session, copy: BookCopyCreate):
         status=copy.status
     )
     db.add(db_copy)
+    deltas = {"total_copies": 1}
+    status_counter = STATUS_COUNTERS.get(BookCopyStatus(copy.status).value)
+    if status_counter:
+        deltas[status_counter] = 1
+    adjust_copy_counters(db, copy.book_id, **deltas)
+    adjust_library_counters(db, {copies_counter(BookCopyStatus(copy.status).value): 1})
     db.commit()
-    db.refresh(db_copy)
-    return db_copy
+    return db.query(BookCopy).options(*COPY_READ_LOADERS).filter(BookCopy.id == db_copy.id).one()
+
+def get_all_copies(db: Session, skip: int = 0, limit: int = 100, cursor: str = None, view: ListView = ListView.FULL):
+    if view == ListView.SUMMARY:
+        query = db.query(*COPY_SUMMARY_COLUMNS).join(Book, Book.id == BookCopy.book_id)
+    else:
+        query = db.query(BookCopy).options(*COPY_READ_LOADERS)
+    return paginate(query, BookCopy.id, skip, limit, cursor)
+
+# --- Bulk Import ---
+def _resolve_names(db: Session, model, names, known: dict):
+    """Map names to ids for `model`, inserting the missing ones in one batch.
+
+    `known` persists across chunks so each distinct name is looked up once per import.
+    """
+    missing = {name for name in names if name not in known}
+    if not missing:
+        return
+    # Author names are not unique; reuse the oldest row with a given name
+    for row in db.execute(select(model.id, model.name).where(model.name.in_(missing)).order_by(model.id)):
+        known.setdefault(row.name, row.id)
+    new_names = sorted(missing - known.keys())
+    if new_names:
+        db.execute(insert(model.__table__), [{"name": name} for name in new_names])
+        for row in db.execute(select(model.id, model.name).where(model.name.in_(new_names)).order_by(model.id)):
+            known.setdefault(row.name, row.id)
+
+def _import_chunk(db: Session, chunk, publishers: dict, authors: dict, result: dict):
+    records = []
+    seen_isbns = set()
+    for row_no, raw in chunk:
+        try:
+            record = BookImportRecord.model_validate(raw)
+        except ValidationError as e:
+            error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            result["errors"].append({"row": row_no, "isbn": raw.get("isbn") if isinstance(raw, dict) else None, "error": error})
+            continue
+        if record.isbn in seen_isbns:
+            result["errors"].append({"row": row_no, "isbn": record.isbn, "error": "Duplicate ISBN in import"})
+            continue
+        seen_isbns.add(record.isbn)
+        records.append((row_no, record))
+
+    if seen_isbns:
+        existing = set(db.scalars(select(Book.isbn).where(Book.isbn.in_(seen_isbns))))
+        for row_no, record in records:
+            if record.isbn in existing:
+                result["errors"].append({"row": row_no, "isbn": record.isbn, "error": "ISBN already exists"})
+        records = [(row_no, record) for row_no, record in records if record.isbn not in existing]
+    if not records:
+        return
 
-def get_all_copies(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(BookCopy).offset(skip).limit(limit).all()
+    # On SQLite the FTS index is filled in one statement per chunk instead of by
+    # the per-row triggers, which would otherwise dominate the import time
+    book_ids = {}
+    sync = suspended_search_sync(db, book_ids.values()) if fts_available(db.connection()) else nullcontext()
+    with sync:
+        _insert_records(db, records, publishers, authors, book_ids, result)
+
+def _insert_records(db: Session, records, publishers: dict, authors: dict, book_ids: dict, result: dict):
+    invalidate(db, "books", "authors", "publishers")
+    _resolve_names(db, Publisher, {r.publisher for _, r in records if r.publisher}, publishers)
+    _resolve_names(db, Author, {name for _, r in records for name in r.authors}, authors)
+
+    # Core inserts on the tables: executemany without the ORM bulk-persistence overhead
+    db.execute(insert(Book.__table__), [
+        {
+            "isbn": r.isbn,
+            "title": r.title,
+            "publication_year": r.publication_year,
+            "publisher_id": publishers.get(r.publisher),
+            "total_copies": r.copies,
+            "available_copies": r.copies,
+        }
+        for _, r in records
+    ])
+    book_ids.update(db.execute(select(Book.isbn, Book.id).where(Book.isbn.in_([r.isbn for _, r in records]))).all())
+
+    links = {
+        (book_ids[r.isbn], authors[name])
+        for _, r in records
+        for name in r.authors
+    }
+    if links:
+        db.execute(insert(book_authors), [{"book_id": b, "author_id": a} for b, a in links])
+
+    copies = [
+        {"book_id": book_ids[r.isbn], "shelf_location": r.shelf_location, "status": BookCopyStatus.AVAILABLE.value}
+        for _, r in records
+        for _ in range(r.copies)
+    ]
+    if copies:
+        db.execute(insert(BookCopy.__table__), copies)
+        adjust_library_counters(db, {copies_counter(BookCopyStatus.AVAILABLE.value): len(copies)})
+
+    result["inserted"] += len(records)
+    result["copies_created"] += len(copies)
+
+def import_books(db: Session, records, batch_size: int = 1000):
+    """Bulk-load catalog records (dicts shaped like `BookImportRecord`).
+
+    `records` may be any iterable, so callers can stream large files. Each
+    chunk of `batch_size` rows is validated, deduplicated and written with
+    batched INSERTs in its own transaction; bad rows are reported by their
+    1-based position instead of aborting the import.
+    """
+    result = {"received": 0, "inserted": 0, "copies_created": 0, "errors": []}
+    publishers, authors = {}, {}
+    numbered = enumerate(records, start=1)
+    while True:
+        chunk = list(islice(numbered, batch_size))
+        if not chunk:
+            break
+        result["received"] += len(chunk)
+        inserted_before, copies_before = result["inserted"], result["copies_created"]
+        errors_before = len(result["errors"])
+        try:
+            _import_chunk(db, chunk, publishers, authors, result)
+            db.commit()
+        except IntegrityError as e:
+            # Lost a race with a concurrent writer; the whole chunk is rolled back
+            db.rollback()
+            publishers.clear()
+            authors.clear()
+            result["inserted"], result["copies_created"] = inserted_before, copies_before
+            del result["errors"][errors_before:]
+            result["errors"].extend(
+                {"row": row_no, "isbn": raw.get("isbn") if isinstance(raw, dict) else None, "error": f"Chunk rolled back: {e.orig}"}
+                for row_no, raw in chunk
+            )
+    result["errors"].sort(key=lambda error: error["row"])
+    logger.info(
+        "Bulk import: %d/%d books, %d copies, %d errors",
+        result["inserted"], result["received"], result["copies_created"], len(result["errors"]),
+    )
+    return result
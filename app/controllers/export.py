@@ -0,0 +1,131 @@
+from sqlalchemy import select
+from fastapi import HTTPException
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional
+from app.database import SessionLocal
+from app.models.book import Book, BookCopy, BookCopyStatus, Publisher
+from app.models.transaction import Issue, IssueStatus
+from app.models.user import User
+from app.schemas.export import ExportFormat, ExportTable
+from app.controllers.book import COPY_SUMMARY_COLUMNS
+from app.controllers.transaction import ISSUE_SUMMARY_COLUMNS
+from dotenv import load_dotenv
+import csv
+import io
+import json
+import logging
+import os
+
+load_dotenv()
+
+logger = logging.getLogger("app")
+
+# Rows fetched from the cursor (and written to the client) per chunk
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+@dataclass(frozen=True)
+class ExportSpec:
+    """How one table is exported: its flat SELECT and the columns behind the filters."""
+    select: Callable
+    key: object
+    date_column: object = None
+    status_column: object = None
+    # Enum of the values status_column holds
+    statuses: object = None
+
+def _books_select():
+    return select(
+        Book.id, Book.isbn, Book.title, Book.publication_year, Book.publisher_id,
+        Publisher.name.label("publisher"), Book.total_copies, Book.available_copies, Book.issued_copies,
+    ).outerjoin(Publisher, Publisher.id == Book.publisher_id)
+
+def _copies_select():
+    return select(*COPY_SUMMARY_COLUMNS, BookCopy.created_at).join(Book, Book.id == BookCopy.book_id)
+
+def _issues_select():
+    return (
+        select(*ISSUE_SUMMARY_COLUMNS)
+        .join(BookCopy, BookCopy.id == Issue.copy_id)
+        .join(Book, Book.id == BookCopy.book_id)
+        .join(User, User.id == Issue.user_id)
+    )
+
+def _users_select():
+    # Never the password hash
+    return select(User.id, User.email, User.role, User.is_active, User.created_at)
+
+EXPORTS = {
+    ExportTable.BOOKS: ExportSpec(_books_select, Book.id),
+    ExportTable.COPIES: ExportSpec(_copies_select, BookCopy.id, BookCopy.created_at, BookCopy.status, BookCopyStatus),
+    ExportTable.ISSUES: ExportSpec(_issues_select, Issue.id, Issue.issue_date, Issue.status, IssueStatus),
+    ExportTable.USERS: ExportSpec(_users_select, User.id, User.created_at),
+}
+
+def export_statement(
+    table: ExportTable, since: Optional[datetime] = None, until: Optional[datetime] = None, status: Optional[str] = None
+):
+    """The filtered SELECT behind an export, in primary key order.
+
+    `since` is inclusive and `until` exclusive, both on the table's date column
+    (copies: created_at, issues: issue_date, users: created_at). Filters a table
+    does not have, and statuses it does not use, are rejected before anything
+    is streamed.
+    """
+    spec = EXPORTS[table]
+    statement = spec.select()
+    if since is not None or until is not None:
+        if spec.date_column is None:
+            raise HTTPException(status_code=400, detail=f"{table.value} cannot be filtered by date")
+        if since is not None:
+            statement = statement.where(spec.date_column >= since)
+        if until is not None:
+            statement = statement.where(spec.date_column < until)
+    if status is not None:
+        if spec.status_column is None:
+            raise HTTPException(status_code=400, detail=f"{table.value} cannot be filtered by status")
+        if status not in {member.value for member in spec.statuses}:
+            expected = ", ".join(member.value for member in spec.statuses)
+            raise HTTPException(
+                status_code=400, detail=f"Unknown {table.value} status '{status}'; expected one of: {expected}"
+            )
+        statement = statement.where(spec.status_column == status)
+    return statement.order_by(spec.key)
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def _ndjson_chunk(keys, rows) -> bytes:
+    return "".join(
+        json.dumps(dict(zip(keys, row)), default=_json_default, separators=(",", ":")) + "\n" for row in rows
+    ).encode()
+
+def _csv_chunk(rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in row] for row in rows
+    )
+    return buffer.getvalue().encode()
+
+def iter_export(statement, fmt: ExportFormat, batch_size: int = EXPORT_BATCH_SIZE):
+    """Stream the rows of `statement` as NDJSON or CSV, one chunk per batch.
+
+    Runs on its own session, so it outlives the request's, and reads through
+    yield_per: the driver hands rows over `batch_size` at a time and nothing
+    keeps them around, so memory stays flat however large the table is.
+    """
+    db = SessionLocal()
+    rows_sent = 0
+    try:
+        result = db.execute(statement.execution_options(yield_per=batch_size))
+        keys = list(result.keys())
+        if fmt == ExportFormat.CSV:
+            yield _csv_chunk([keys])
+        for rows in result.partitions():
+            yield _ndjson_chunk(keys, rows) if fmt == ExportFormat.NDJSON else _csv_chunk(rows)
+            rows_sent += len(rows)
+        logger.info("Export finished: %d rows", rows_sent)
+    finally:
+        db.close()
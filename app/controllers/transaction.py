@@ -1,24 +1,102 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import Integer, and_, case, cast, func, insert, or_, select, update
+from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException
-from datetime import datetime
+from datetime import datetime, timedelta
 from app.models.transaction import Issue, IssueRequest, IssueStatus, RequestStatus
-from app.models.book import BookCopy, BookCopyStatus
-from app.schemas.transaction import IssueCreate, IssueRequestCreate, IssueRequestUpdate
+from app.models.book import Book, BookCopy, BookCopyStatus
+from app.models.counters import (
+    LibraryCounter, LIBRARY_COUNTERS, LIBRARY_COUNTER_SHARDS, OPEN_ISSUES_COUNTER, copies_counter
+)
 from app.models.user import User
+from app.schemas.transaction import (
+    IssueCreate, IssueRequestCreate, IssueRequestUpdate, IssueRequestBulkUpdate, RequestBulkAction, BookCheckout
+)
+from app.core.principals import Principal
+from app.controllers.book import (
+    BOOK_READ_LOADERS, COPY_READ_LOADERS, adjust_library_counters, copy_book_id, move_copy_counters,
+    move_many_copy_counters,
+)
+from app.schemas.pagination import ListView
+from app.core.pagination import paginate
+from dotenv import load_dotenv
 import logging
+import os
+
+load_dotenv()
 
 logger = logging.getLogger("app")
 
+# Fine per full day a loan is past its return date
+FINE_PER_DAY = 10.0
+# Days a returned copy is kept on hold for the request at the head of its queue
+HOLD_PICKUP_DAYS = float(os.getenv("HOLD_PICKUP_DAYS", 3))
+
+# Requests waiting for a copy; a book's hold queue is these in request_time order
+QUEUED_REQUEST_STATUSES = (RequestStatus.PENDING.value, RequestStatus.APPROVED.value)
+# Requests that keep a member from requesting the same book again
+ACTIVE_REQUEST_STATUSES = QUEUED_REQUEST_STATUSES + (RequestStatus.READY.value,)
+
+# Loader strategies matching IssueRequestRead and IssueRead
+REQUEST_READ_LOADERS = (
+    joinedload(IssueRequest.user),
+    joinedload(IssueRequest.book).options(*BOOK_READ_LOADERS),
+)
+ISSUE_READ_LOADERS = (
+    joinedload(Issue.user),
+    joinedload(Issue.book_copy).options(*COPY_READ_LOADERS),
+)
+
+# Columns matching IssueRequestSummary and IssueSummary
+REQUEST_SUMMARY_COLUMNS = (
+    IssueRequest.id, IssueRequest.user_id, IssueRequest.book_id, IssueRequest.status, IssueRequest.request_time,
+    IssueRequest.copy_id, IssueRequest.hold_expires_at, Book.title.label("book_title"), User.email.label("user_email"),
+)
+ISSUE_SUMMARY_COLUMNS = (
+    Issue.id, Issue.copy_id, Issue.user_id, Issue.issue_date, Issue.return_date, Issue.actual_return_date,
+    Issue.status, Issue.fine_amount, BookCopy.book_id, Book.title.label("book_title"), User.email.label("user_email"),
+)
+
+def _request_list(db: Session, view: ListView):
+    if view == ListView.SUMMARY:
+        return (
+            db.query(*REQUEST_SUMMARY_COLUMNS)
+            .join(Book, Book.id == IssueRequest.book_id)
+            .join(User, User.id == IssueRequest.user_id)
+        )
+    return db.query(IssueRequest).options(*REQUEST_READ_LOADERS)
+
+def _issue_list(db: Session, view: ListView):
+    if view == ListView.SUMMARY:
+        return (
+            db.query(*ISSUE_SUMMARY_COLUMNS)
+            .join(BookCopy, BookCopy.id == Issue.copy_id)
+            .join(Book, Book.id == BookCopy.book_id)
+            .join(User, User.id == Issue.user_id)
+        )
+    return db.query(Issue).options(*ISSUE_READ_LOADERS)
+
+def _load_request(db: Session, request_id: int):
+    return db.query(IssueRequest).options(*REQUEST_READ_LOADERS).filter(IssueRequest.id == request_id).first()
+
+def _load_issue(db: Session, issue_id: int):
+    return db.query(Issue).options(*ISSUE_READ_LOADERS).filter(Issue.id == issue_id).first()
+
+# Columns the request workflow needs, without loading the ORM object
+_REQUEST_ROW = (
+    IssueRequest.id, IssueRequest.user_id, IssueRequest.book_id,
+    IssueRequest.status, IssueRequest.request_time, IssueRequest.copy_id,
+)
+
 # --- Issue Requests ---
-def create_request(db: Session, request: IssueRequestCreate, current_user: User):
-    # Check if user already has a pending request for this book
+def create_request(db: Session, request: IssueRequestCreate, current_user: Principal):
+    # Check if user already has a pending request (or a hold) for this book
     existing = db.query(IssueRequest).filter(
         IssueRequest.user_id == current_user.id,
         IssueRequest.book_id == request.book_id,
-        IssueRequest.status == RequestStatus.PENDING
+        IssueRequest.status.in_(ACTIVE_REQUEST_STATUSES)
     ).first()
     if existing:
-        logger.warning(f"Duplicate request: User {current_user.id} for Book {request.book_id}")
+        logger.warning("Duplicate request: User %s for Book %s", current_user.id, request.book_id)
         raise HTTPException(status_code=400, detail="You already have a pending request for this book")
 
     db_request = IssueRequest(
@@ -28,35 +106,357 @@ def create_request(db: Session, request: IssueRequestCreate, current_user: User)
     )
     db.add(db_request)
     db.commit()
-    db.refresh(db_request)
-    logger.info(f"Issue Request created: User {current_user.id} requested Book {request.book_id}")
-    return db_request
+    logger.info("Issue Request created: User %s requested Book %s", current_user.id, request.book_id)
+    return _load_request(db, db_request.id)
 
-def get_requests(db: Session, current_user: User, skip: int = 0, limit: int = 100):
-    if current_user.role == "admin":
-        return db.query(IssueRequest).offset(skip).limit(limit).all()
-    else:
-        return db.query(IssueRequest).filter(IssueRequest.user_id == current_user.id).offset(skip).limit(limit).all()
+def get_requests(
+    db: Session, current_user: Principal, skip: int = 0, limit: int = 100, cursor: str = None,
+    view: ListView = ListView.FULL,
+):
+    query = _request_list(db, view)
+    if current_user.role != "admin":
+        query = query.filter(IssueRequest.user_id == current_user.id)
+    return paginate(query, IssueRequest.id, skip, limit, cursor)
+
+# --- Hold queue ---
+# Every queue lookup is a seek on (book_id, status, request_time), once per
+# queued status, so serving the head of a queue costs the same with ten holds
+# or ten thousand.
+def _queue_head(db: Session, book_id: int):
+    heads = []
+    for status in QUEUED_REQUEST_STATUSES:
+        head = db.execute(
+            select(IssueRequest.id, IssueRequest.request_time)
+            .where(IssueRequest.book_id == book_id, IssueRequest.status == status)
+            .order_by(IssueRequest.request_time, IssueRequest.id)
+            .limit(1)
+        ).first()
+        if head is not None:
+            heads.append(head)
+    return min(heads, key=lambda head: (head.request_time, head.id), default=None)
+
+def _release_copy(db: Session, copy_id: int, book_id: int, from_status: str, now: datetime = None):
+    """Hand a copy leaving `from_status` to the head of its book's hold queue.
+
+    The copy goes on hold for that request until HOLD_PICKUP_DAYS from `now`,
+    or back on the shelf when nobody is waiting. Runs in the caller's
+    transaction; returns the id of the request now holding the copy, if any.
+    """
+    now = now or datetime.utcnow()
+    head = _queue_head(db, book_id)
+    target = BookCopyStatus.ON_HOLD.value if head is not None else BookCopyStatus.AVAILABLE.value
+    # Only a copy still in from_status moves, so the counters move exactly when the status does
+    result = db.execute(
+        update(BookCopy)
+        .where(BookCopy.id == copy_id, BookCopy.status == from_status)
+        .values(status=target)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        logger.warning("Copy %s was not %s; left unchanged", copy_id, from_status)
+        return None
+
+    hold_expires_at = now + timedelta(days=HOLD_PICKUP_DAYS)
+    for _ in range(CHECKOUT_ATTEMPTS):
+        if head is None:
+            break
+        result = db.execute(
+            update(IssueRequest)
+            .where(IssueRequest.id == head.id, IssueRequest.status.in_(QUEUED_REQUEST_STATUSES))
+            .values(status=RequestStatus.READY.value, copy_id=copy_id, hold_expires_at=hold_expires_at)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            move_copy_counters(db, book_id, from_status, BookCopyStatus.ON_HOLD.value)
+            logger.info("Copy %s on hold for Request %s until %s", copy_id, head.id, hold_expires_at)
+            return head.id
+        # That request left the queue in the meantime; try the next one
+        head = _queue_head(db, book_id)
+
+    if target == BookCopyStatus.ON_HOLD.value:
+        db.execute(
+            update(BookCopy)
+            .where(BookCopy.id == copy_id)
+            .values(status=BookCopyStatus.AVAILABLE.value)
+            .execution_options(synchronize_session=False)
+        )
+    move_copy_counters(db, book_id, from_status, BookCopyStatus.AVAILABLE.value)
+    return None
+
+def expire_holds(db: Session, now: datetime = None) -> int:
+    """Expire holds that were not picked up in time and pass their copies on."""
+    now = now or datetime.utcnow()
+    expired = db.execute(
+        select(IssueRequest.id, IssueRequest.book_id, IssueRequest.copy_id)
+        .where(IssueRequest.status == RequestStatus.READY.value, IssueRequest.hold_expires_at < now)
+        .order_by(IssueRequest.hold_expires_at)
+    ).all()
+    count = 0
+    for row in expired:
+        result = db.execute(
+            update(IssueRequest)
+            .where(IssueRequest.id == row.id, IssueRequest.status == RequestStatus.READY.value)
+            .values(status=RequestStatus.EXPIRED.value)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            count += 1
+            _release_copy(db, row.copy_id, row.book_id, BookCopyStatus.ON_HOLD.value, now)
+    db.commit()
+    if count:
+        logger.info("Hold expiry: %d holds expired", count)
+    return count
+
+def get_queue_position(db: Session, request_id: int, current_user: Principal):
+    """Place of a waiting request in its book's queue (1 = next copy back).
+
+    Counts the queued requests ahead of it on the queue index, so the cost
+    grows with the position, not with the size of the table.
+    """
+    row = db.execute(
+        select(*_REQUEST_ROW, IssueRequest.hold_expires_at).where(IssueRequest.id == request_id)
+    ).first()
+    if row is None or (current_user.role != "admin" and row.user_id != current_user.id):
+        raise HTTPException(status_code=404, detail="Request not found")
+
+    position = None
+    if row.status in QUEUED_REQUEST_STATUSES:
+        ahead = or_(
+            IssueRequest.request_time < row.request_time,
+            and_(IssueRequest.request_time == row.request_time, IssueRequest.id < row.id),
+        )
+        position = 1 + sum(
+            db.scalar(
+                select(func.count()).select_from(IssueRequest)
+                .where(IssueRequest.book_id == row.book_id, IssueRequest.status == status, ahead)
+            )
+            for status in QUEUED_REQUEST_STATUSES
+        )
+    return {
+        "request_id": row.id,
+        "book_id": row.book_id,
+        "status": row.status,
+        "position": position,
+        "hold_expires_at": row.hold_expires_at,
+    }
 
 def update_request_status(db: Session, request_id: int, status_update: IssueRequestUpdate):
     db_request = db.query(IssueRequest).filter(IssueRequest.id == request_id).first()
     if not db_request:
         raise HTTPException(status_code=404, detail="Request not found")
-    
+    # A hold needs a copy set aside for it, which only a returned or released copy provides
+    if status_update.status == RequestStatus.READY:
+        raise HTTPException(status_code=400, detail="Requests become ready only when a copy is put on hold for them")
+
+    if db_request.status == RequestStatus.READY.value:
+        if status_update.status.value in QUEUED_REQUEST_STATUSES:
+            # Back in the queue it would be its own head and get the same copy again
+            raise HTTPException(status_code=400, detail="A ready request cannot go back to the queue")
+        if status_update.status == RequestStatus.FULFILLED:
+            # Picked up: issue the copy on hold
+            results = {}
+            row = db.execute(select(*_REQUEST_ROW).where(IssueRequest.id == request_id)).first()
+            if not _fulfill_requests(db, [row], None, results):
+                db.rollback()
+                raise HTTPException(status_code=400, detail=results[request_id]["detail"])
+        else:
+            # Any other change gives up the hold
+            db_request.status = status_update.status
+            db.flush()
+            _release_copy(db, db_request.copy_id, db_request.book_id, BookCopyStatus.ON_HOLD.value)
+
     db_request.status = status_update.status
     db.commit()
-    db.refresh(db_request)
-    logger.info(f"Request {request_id} updated to {status_update.status}")
-    return db_request
+    logger.info("Request %s updated to %s", request_id, status_update.status)
+    return _load_request(db, request_id)
+
+# --- Bulk request workflow ---
+# Statuses a request must be in for each bulk action, and the status it ends in
+BULK_ALLOWED_FROM = {
+    RequestBulkAction.APPROVE: (RequestStatus.PENDING.value,),
+    RequestBulkAction.REJECT: ACTIVE_REQUEST_STATUSES,
+    RequestBulkAction.FULFILL: ACTIVE_REQUEST_STATUSES,
+}
+BULK_TARGET_STATUS = {
+    RequestBulkAction.APPROVE: RequestStatus.APPROVED.value,
+    RequestBulkAction.REJECT: RequestStatus.REJECTED.value,
+    RequestBulkAction.FULFILL: RequestStatus.FULFILLED.value,
+}
+
+def _bulk_item(request_id: int, ok: bool, status: str = None, detail: str = None,
+               issue_id: int = None, copy_id: int = None):
+    return {
+        "request_id": request_id, "ok": ok, "status": status,
+        "issue_id": issue_id, "copy_id": copy_id, "detail": detail,
+    }
+
+def _claim_copies(db: Session, copy_ids, from_status: str) -> set:
+    if not copy_ids:
+        return set()
+    # Copies that left from_status since they were read drop out here
+    return set(db.scalars(
+        update(BookCopy)
+        .where(BookCopy.id.in_(copy_ids), BookCopy.status == from_status)
+        .values(status=BookCopyStatus.ISSUED.value)
+        .returning(BookCopy.id)
+        .execution_options(synchronize_session=False)
+    ))
+
+def _fulfill_requests(db: Session, rows, return_date: datetime, results: dict):
+    """Issue a copy to each request.
+
+    A request ready for pickup gets its copy on hold; the others get available
+    copies, oldest request of a book first. Copies are picked with one ranked
+    query over the (book_id, status) index, claimed with one conditional UPDATE
+    per source status, counted with one UPDATE of the books and the issues
+    inserted in one flush. Requests left without a copy keep their status.
+    Returns the fulfilled ids.
+    """
+    held = [row for row in rows if row.status == RequestStatus.READY.value]
+    queues = {}
+    for row in sorted(rows, key=lambda row: (row.request_time, row.id)):
+        if row.status != RequestStatus.READY.value:
+            queues.setdefault(row.book_id, []).append(row)
+
+    free = {}
+    if queues:
+        free = _free_copies(db, {book_id: len(queue) for book_id, queue in queues.items()})
+
+    allocations = [(row, row.copy_id, BookCopyStatus.ON_HOLD.value) for row in held] + [
+        (row, copy_id, BookCopyStatus.AVAILABLE.value)
+        for book_id, queue in queues.items()
+        for row, copy_id in zip(queue, free.get(book_id, []))
+    ]
+    claimed = set()
+    for from_status in (BookCopyStatus.ON_HOLD.value, BookCopyStatus.AVAILABLE.value):
+        copy_ids = [copy_id for _, copy_id, source in allocations if source == from_status]
+        claimed |= _claim_copies(db, copy_ids, from_status)
+        per_book = {}
+        for row, copy_id, source in allocations:
+            if source == from_status and copy_id in claimed:
+                per_book[row.book_id] = per_book.get(row.book_id, 0) + 1
+        move_many_copy_counters(db, per_book, from_status, BookCopyStatus.ISSUED.value)
+
+    issued = [(row, copy_id) for row, copy_id, _ in allocations if copy_id in claimed]
+    issues = [
+        Issue(user_id=row.user_id, copy_id=copy_id, return_date=return_date, status=IssueStatus.ISSUED)
+        for row, copy_id in issued
+    ]
+    db.add_all(issues)
+    adjust_library_counters(db, {OPEN_ISSUES_COUNTER: len(issues)})
+    db.flush()
+
+    fulfilled = []
+    for (row, copy_id), db_issue in zip(issued, issues):
+        fulfilled.append(row.id)
+        results[row.id] = _bulk_item(
+            row.id, True, RequestStatus.FULFILLED.value, issue_id=db_issue.id, copy_id=copy_id
+        )
+    for row in rows:
+        if row.id not in results:
+            detail = "Held copy is no longer on hold" if row in held else "No available copies for this book"
+            results[row.id] = _bulk_item(row.id, False, row.status, detail)
+    return fulfilled
+
+def _free_copies(db: Session, needed: dict) -> dict:
+    """The first `needed[book_id]` available copies of each book, by copy id."""
+    ranked = (
+        select(
+            BookCopy.book_id, BookCopy.id,
+            func.row_number().over(partition_by=BookCopy.book_id, order_by=BookCopy.id).label("rank"),
+        )
+        .where(BookCopy.book_id.in_(needed), BookCopy.status == BookCopyStatus.AVAILABLE.value)
+        .subquery()
+    )
+    free = {}
+    for book_id, copy_id in db.execute(
+        select(ranked.c.book_id, ranked.c.id)
+        .where(ranked.c.rank <= case(needed, value=ranked.c.book_id))
+        .order_by(ranked.c.book_id, ranked.c.rank)
+    ):
+        free.setdefault(book_id, []).append(copy_id)
+    return free
+
+def bulk_update_requests(db: Session, bulk: IssueRequestBulkUpdate):
+    """Approve, reject or fulfill many requests in one transaction.
+
+    Each request gets its own result; requests that are missing, in the wrong
+    status or (when fulfilling) find no copy fail individually without
+    affecting the rest. Fulfilling allocates copies FIFO by request_time and
+    creates the issues.
+    """
+    request_ids = list(dict.fromkeys(bulk.request_ids))
+    allowed = BULK_ALLOWED_FROM[bulk.action]
+    found = {
+        row.id: row for row in db.execute(
+            select(*_REQUEST_ROW).where(IssueRequest.id.in_(request_ids))
+        )
+    }
+
+    results, eligible = {}, []
+    for request_id in request_ids:
+        row = found.get(request_id)
+        if row is None:
+            results[request_id] = _bulk_item(request_id, False, detail="Request not found")
+        elif row.status not in allowed:
+            results[request_id] = _bulk_item(request_id, False, row.status, f"Request is already {row.status}")
+        else:
+            eligible.append(row)
+
+    target = BULK_TARGET_STATUS[bulk.action]
+    if bulk.action == RequestBulkAction.FULFILL:
+        done = _fulfill_requests(db, eligible, bulk.return_date, results)
+    else:
+        done = [row.id for row in eligible]
+        for request_id in done:
+            results[request_id] = _bulk_item(request_id, True, target)
+
+    if done:
+        result = db.execute(
+            update(IssueRequest)
+            .where(IssueRequest.id.in_(done), IssueRequest.status.in_(allowed))
+            .values(status=target)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != len(done):
+            # Another admin changed some of these requests; nothing is applied
+            db.rollback()
+            logger.warning("Bulk %s aborted: requests changed concurrently", bulk.action.value)
+            raise HTTPException(status_code=409, detail="Some requests changed while processing; retry")
+        if bulk.action == RequestBulkAction.REJECT:
+            # Rejected holds pass their copies down the queue
+            for row in eligible:
+                if row.status == RequestStatus.READY.value:
+                    _release_copy(db, row.copy_id, row.book_id, BookCopyStatus.ON_HOLD.value)
+    db.commit()
+
+    items = [results[request_id] for request_id in request_ids]
+    succeeded = sum(1 for item in items if item["ok"])
+    logger.info("Bulk %s: %d of %d requests updated", bulk.action.value, succeeded, len(items))
+    return {"succeeded": succeeded, "failed": len(items) - succeeded, "items": items}
 
 # --- Issues ---
+def _claim_copy(db: Session, copy_id: int) -> bool:
+    # Conditional UPDATE: the status check and the write are a single statement,
+    # so of several concurrent checkouts of the same copy exactly one matches.
+    result = db.execute(
+        update(BookCopy)
+        .where(BookCopy.id == copy_id, BookCopy.status == BookCopyStatus.AVAILABLE.value)
+        .values(status=BookCopyStatus.ISSUED.value)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return False
+    move_copy_counters(db, copy_book_id(copy_id), BookCopyStatus.AVAILABLE.value, BookCopyStatus.ISSUED.value)
+    return True
+
 def create_issue(db: Session, issue: IssueCreate):
-    # Verify copy availability
-    copy = db.query(BookCopy).filter(BookCopy.id == issue.copy_id).first()
-    if not copy:
-        raise HTTPException(status_code=404, detail="Book copy not found")
-    if copy.status != BookCopyStatus.AVAILABLE:
-        logger.warning(f"Issue failed: Copy {issue.copy_id} is not available")
+    # Claim the copy and verify availability in one statement
+    if not _claim_copy(db, issue.copy_id):
+        db.rollback()
+        if not db.query(BookCopy.id).filter(BookCopy.id == issue.copy_id).first():
+            raise HTTPException(status_code=404, detail="Book copy not found")
+        logger.warning("Issue failed: Copy %s is not available", issue.copy_id)
         raise HTTPException(status_code=400, detail="Book copy is not available")
 
     # Create Issue
@@ -66,21 +466,67 @@ def create_issue(db: Session, issue: IssueCreate):
         return_date=issue.return_date,
         status=IssueStatus.ISSUED
     )
-    
-    # Update Copy Status
-    copy.status = BookCopyStatus.ISSUED
-    
     db.add(db_issue)
+    adjust_library_counters(db, {OPEN_ISSUES_COUNTER: 1})
     db.commit()
-    db.refresh(db_issue)
-    logger.info(f"Book Issued: Copy {issue.copy_id} to User {issue.user_id}")
-    return db_issue
+    logger.info("Book Issued: Copy %s to User %s", issue.copy_id, issue.user_id)
+    return _load_issue(db, db_issue.id)
 
-def get_issues(db: Session, current_user: User, skip: int = 0, limit: int = 100):
-    if current_user.role == "admin":
-        return db.query(Issue).offset(skip).limit(limit).all()
-    else:
-        return db.query(Issue).filter(Issue.user_id == current_user.id).offset(skip).limit(limit).all()
+# Copies a checkout tries before giving up when it keeps losing races
+CHECKOUT_ATTEMPTS = 5
+
+def checkout_book(db: Session, book_id: int, checkout: BookCheckout):
+    """Issue any available copy of a book, allocated server-side.
+
+    Candidates come from the (book_id, status) index, copies on the preferred
+    shelf first. On Postgres, FOR UPDATE SKIP LOCKED makes concurrent checkouts
+    pick different copies; elsewhere a lost conditional UPDATE simply moves on
+    to the next candidate.
+    """
+    order = [BookCopy.id]
+    if checkout.preferred_shelf:
+        order.insert(0, case((BookCopy.shelf_location == checkout.preferred_shelf, 0), else_=1))
+    candidate = (
+        select(BookCopy.id)
+        .where(BookCopy.book_id == book_id, BookCopy.status == BookCopyStatus.AVAILABLE.value)
+        .order_by(*order)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+
+    for _ in range(CHECKOUT_ATTEMPTS):
+        copy_id = db.scalar(candidate)
+        if copy_id is None:
+            break
+        if _claim_copy(db, copy_id):
+            db_issue = Issue(
+                user_id=checkout.user_id,
+                copy_id=copy_id,
+                return_date=checkout.return_date,
+                status=IssueStatus.ISSUED
+            )
+            db.add(db_issue)
+            adjust_library_counters(db, {OPEN_ISSUES_COUNTER: 1})
+            db.commit()
+            logger.info("Book Issued: Copy %s of Book %s to User %s", copy_id, book_id, checkout.user_id)
+            return _load_issue(db, db_issue.id)
+        # Another clerk got that copy first; start over from a fresh snapshot
+        db.rollback()
+
+    db.rollback()
+    if not db.query(Book.id).filter(Book.id == book_id).first():
+        raise HTTPException(status_code=404, detail="Book not found")
+    logger.warning("Checkout failed: No available copy of Book %s", book_id)
+    raise HTTPException(status_code=400, detail="No available copies for this book")
+
+def get_issues(
+    db: Session, current_user: Principal, skip: int = 0, limit: int = 100, cursor: str = None,
+    view: ListView = ListView.FULL,
+):
+    query = _issue_list(db, view)
+    if current_user.role != "admin":
+        query = query.filter(Issue.user_id == current_user.id)
+    return paginate(query, Issue.id, skip, limit, cursor)
 
 def return_book(db: Session, issue_id: int):
     db_issue = db.query(Issue).filter(Issue.id == issue_id).first()
@@ -90,20 +536,116 @@ def return_book(db: Session, issue_id: int):
     if db_issue.status == IssueStatus.RETURNED:
          raise HTTPException(status_code=400, detail="Book already returned")
 
-    # Update Issue
-    db_issue.status = IssueStatus.RETURNED
-    db_issue.actual_return_date = datetime.utcnow()
-    
-    # Calculate Fine (Simple Logic: 10 units per day overdue)
-    if db_issue.return_date and db_issue.actual_return_date > db_issue.return_date:
-        overdue_duration = db_issue.actual_return_date - db_issue.return_date
-        db_issue.fine_amount = overdue_duration.days * 10.0
+    actual_return_date = datetime.utcnow()
     
-    # Update Copy Status
-    copy = db.query(BookCopy).filter(BookCopy.id == db_issue.copy_id).first()
-    if copy:
-        copy.status = BookCopyStatus.AVAILABLE
+    # Calculate Fine (Simple Logic: FINE_PER_DAY units per day overdue)
+    fine_amount = db_issue.fine_amount
+    if db_issue.return_date and actual_return_date > db_issue.return_date:
+        overdue_duration = actual_return_date - db_issue.return_date
+        fine_amount = overdue_duration.days * FINE_PER_DAY
+
+    # Close the issue only if nobody else did in the meantime
+    result = db.execute(
+        update(Issue)
+        .where(Issue.id == issue_id, Issue.status != IssueStatus.RETURNED.value)
+        .values(status=IssueStatus.RETURNED.value, actual_return_date=actual_return_date, fine_amount=fine_amount)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Book already returned")
+    adjust_library_counters(db, {OPEN_ISSUES_COUNTER: -1})
+
+    # Update Copy Status: on hold for the next request in the book's queue,
+    # or back on the shelf
+    book_id = db.scalar(select(BookCopy.book_id).where(BookCopy.id == db_issue.copy_id))
+    _release_copy(db, db_issue.copy_id, book_id, BookCopyStatus.ISSUED.value, actual_return_date)
+
+    db.commit()
+    return _load_issue(db, issue_id)
+
+# --- Overdue ---
+OPEN_ISSUE_STATUSES = (IssueStatus.ISSUED.value, IssueStatus.OVERDUE.value)
+
+def _days_overdue(db: Session, now: datetime):
+    # Whole days since the return date, as timedelta.days counts them in return_book
+    if db.get_bind().dialect.name == "sqlite":
+        return cast(func.julianday(now) - func.julianday(Issue.return_date), Integer)
+    return func.floor(func.extract("epoch", now - Issue.return_date) / 86400)
+
+def sweep_overdue(db: Session, now: datetime = None) -> int:
+    """Mark loans past their return date overdue and bring their fines up to date.
+
+    One set-based UPDATE over the (status, return_date) index. A row is only
+    written when it becomes overdue or its fine grows by another day, so
+    repeated sweeps cost as much as the loans that actually changed.
+    """
+    now = now or datetime.utcnow()
+    fine = _days_overdue(db, now) * FINE_PER_DAY
+    result = db.execute(
+        update(Issue)
+        .where(
+            Issue.status.in_(OPEN_ISSUE_STATUSES),
+            Issue.return_date < now,
+            or_(Issue.status == IssueStatus.ISSUED.value, Issue.fine_amount < fine),
+        )
+        .values(status=IssueStatus.OVERDUE.value, fine_amount=fine)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    if result.rowcount:
+        logger.info("Overdue sweep: %d loans updated", result.rowcount)
+    return result.rowcount
+
+def get_overdue_issues(db: Session, skip: int = 0, limit: int = 100, cursor: str = None, view: ListView = ListView.FULL):
+    # Open loans past due, including ones the sweeper has not flagged yet
+    query = _issue_list(db, view).filter(
+        Issue.status.in_(OPEN_ISSUE_STATUSES),
+        Issue.return_date < datetime.utcnow(),
+    )
+    return paginate(query, Issue.id, skip, limit, cursor)
+
+# --- Library counters ---
+def reconcile_library_counters(db: Session, dry_run: bool = False) -> dict:
+    """Recount the library-wide counters from book_copies and issues and repair drift.
+
+    Returns {counter: (counted, actual)} for the counters that were wrong. The
+    correction goes into shard 0, and missing shard rows are recreated.
+    """
+    actual = dict.fromkeys(LIBRARY_COUNTERS, 0)
+    for status, count in db.execute(select(BookCopy.status, func.count()).group_by(BookCopy.status)):
+        actual[copies_counter(status)] = count
+    actual[OPEN_ISSUES_COUNTER] = db.scalar(
+        select(func.count()).select_from(Issue).where(Issue.status.in_(OPEN_ISSUE_STATUSES))
+    )
+    rows = set(db.execute(select(LibraryCounter.name, LibraryCounter.shard)).all())
+    counted = dict(db.execute(
+        select(LibraryCounter.name, func.sum(LibraryCounter.value)).group_by(LibraryCounter.name)
+    ).all())
+    drifted = {
+        name: (counted.get(name) or 0, total)
+        for name, total in actual.items()
+        if (counted.get(name) or 0) != total
+    }
+    if dry_run:
+        return drifted
 
+    missing = [
+        {"name": name, "shard": shard, "value": 0}
+        for name in actual
+        for shard in range(LIBRARY_COUNTER_SHARDS)
+        if (name, shard) not in rows
+    ]
+    if missing:
+        db.execute(insert(LibraryCounter), missing)
+    for name, (current, total) in drifted.items():
+        db.execute(
+            update(LibraryCounter)
+            .where(LibraryCounter.name == name, LibraryCounter.shard == 0)
+            .values(value=LibraryCounter.value + (total - current))
+            .execution_options(synchronize_session=False)
+        )
     db.commit()
-    db.refresh(db_issue)
-    return db_issue
+    if drifted:
+        logger.warning("Library counters repaired: %s", ", ".join(sorted(drifted)))
+    return drifted
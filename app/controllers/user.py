@@ -1,20 +1,37 @@
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from app.database import run_db
 from app.models.user import User
-from app.schemas.user import UserCreate
-from app.utils import get_password_hash, verify_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
-from datetime import timedelta
+from app.models.token import RefreshToken, RevokedToken
+from app.schemas.user import UserCreate, UserUpdate
+from app.core.pagination import paginate
+from app.core.principals import principal_cache
+from app.core.revocation import revocation_set
+from app.utils import (
+    get_password_hash, verify_password, verify_password_async, create_access_token,
+    ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS,
+)
+from datetime import datetime, timedelta
+import hashlib
 import logging
+import secrets
+import uuid
 
 logger = logging.getLogger("app")
 
-def create_user(db: Session, user: UserCreate):
+# A spent refresh token presented again this soon is a client race (two tabs
+# refreshing at once), not theft: it is refused without revoking the family
+REFRESH_REUSE_GRACE_SECONDS = 10
+
+def create_user(db: Session, user: UserCreate, hashed_password: str = None):
     db_user = db.query(User).filter(User.email == user.email).first()
     if db_user:
-        logger.warning(f"Registration attempt failed: Email {user.email} already exists")
+        logger.warning("Registration attempt failed: Email %s already exists", user.email)
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(user.password)
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     db_user = User(
         email=user.email,
         hashed_password=hashed_password,
@@ -24,14 +41,35 @@ def create_user(db: Session, user: UserCreate):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
-    logger.info(f"User created: {db_user.email} (Role: {db_user.role})")
+    logger.info("User created: %s (Role: %s)", db_user.email, db_user.role)
     return db_user
 
 def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(User).offset(skip).limit(limit).all()
+def update_user(db: Session, user_id: int, user_update: UserUpdate):
+    db_user = db.query(User).filter(User.id == user_id).first()
+    if not db_user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    # A null field means "leave as is"; neither column may be NULL
+    changes = user_update.model_dump(exclude_unset=True, exclude_none=True)
+    for field, value in changes.items():
+        setattr(db_user, field, value)
+    # Tokens carry the role and active flag, so the ones already issued must
+    # go; refreshing (which reads the user again) gets up-to-date ones
+    cutoff = _revoke_access_tokens(db, db_user.id) if changes else None
+    db.commit()
+    db.refresh(db_user)
+    if cutoff:
+        revocation_set.add_user(db_user.id, *cutoff)
+    # Role and active flag are part of the cached principal
+    principal_cache.invalidate(db_user.email)
+    logger.info("User updated: %s (Role: %s, Active: %s)", db_user.email, db_user.role, db_user.is_active)
+    return db_user
+
+def get_users(db: Session, skip: int = 0, limit: int = 100, cursor: str = None):
+    return paginate(db.query(User), User.id, skip, limit, cursor)
 
 def authenticate_user(db: Session, username: str, password: str):
     user = get_user_by_email(db, username)
@@ -41,9 +79,122 @@ def authenticate_user(db: Session, username: str, password: str):
         return False
     return user
 
+async def authenticate_user_async(db: Session, username: str, password: str):
+    # Same as authenticate_user, but safe to await from the event loop: the
+    # lookup goes through run_db and bcrypt runs in the bounded hash pool.
+    user = await run_db(db, get_user_by_email, username)
+    if not user:
+        return False
+    if not await verify_password_async(password, user.hashed_password):
+        return False
+    return user
+
 def create_user_token(user: User):
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    # Everything a Principal holds, so authenticating a request needs no lookup
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={
+            "sub": user.email,
+            "uid": user.id,
+            "role": user.role,
+            "active": user.is_active,
+            "created": user.created_at.isoformat(),
+        },
+        expires_delta=access_token_expires,
     )
     return {"access_token": access_token, "token_type": "bearer"}
+
+def _revoke_access_tokens(db: Session, user_id: int):
+    """Stage a cut-off revoking every access token issued to the user so far.
+
+    Returns (revoked_at, expires_at) for revocation_set.add_user, to be
+    called once the transaction commits.
+    """
+    revoked_at = datetime.utcnow()
+    expires_at = revoked_at + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    db.add(RevokedToken(user_id=user_id, revoked_at=revoked_at, expires_at=expires_at))
+    return revoked_at, expires_at
+
+def _hash_refresh_token(token: str) -> str:
+    # Refresh tokens are 256 random bits, so a fast hash is enough to keep a
+    # database leak from handing them out
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def issue_user_tokens(db: Session, user: User, family_id: str = None):
+    """Access token plus a refresh token; a login starts a new family."""
+    tokens = create_user_token(user)
+    refresh_token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        token_hash=_hash_refresh_token(refresh_token),
+        family_id=family_id or uuid.uuid4().hex,
+        user_id=user.id,
+        expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    db.commit()
+    tokens["refresh_token"] = refresh_token
+    return tokens
+
+def _revoke_refresh_family(db: Session, family_id: str, now: datetime):
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    )
+
+def refresh_user_tokens(db: Session, refresh_token: str):
+    """Spend a refresh token for a new access token and its successor.
+
+    Costs a few indexed queries instead of a bcrypt verify. A token that was
+    already spent is being replayed: the whole family and the user's access
+    tokens are revoked, so whoever holds the copy is locked out too.
+    """
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    db_token = db.query(RefreshToken).filter(RefreshToken.token_hash == _hash_refresh_token(refresh_token)).first()
+    now = datetime.utcnow()
+    if db_token is None or db_token.revoked_at is not None or db_token.expires_at <= now:
+        raise invalid
+    # Conditional update: of two concurrent refreshes with the same token, one wins
+    spent = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == db_token.id, RefreshToken.used_at.is_(None))
+        .values(used_at=now)
+    ).rowcount
+    if not spent:
+        db.rollback()
+        db.refresh(db_token)
+        if db_token.used_at is not None and now - db_token.used_at < timedelta(seconds=REFRESH_REUSE_GRACE_SECONDS):
+            raise invalid
+        _revoke_refresh_family(db, db_token.family_id, now)
+        cutoff = _revoke_access_tokens(db, db_token.user_id)
+        db.commit()
+        revocation_set.add_user(db_token.user_id, *cutoff)
+        logger.warning("Refresh token reused for user %d; revoked its sessions", db_token.user_id)
+        raise invalid
+    user = db.query(User).filter(User.id == db_token.user_id).first()
+    if user is None or not user.is_active:
+        db.rollback()
+        raise invalid
+    return issue_user_tokens(db, user, db_token.family_id)
+
+def revoke_refresh_token(db: Session, refresh_token: str, user_id: int):
+    """Revoke the family of `refresh_token` (logout), if it belongs to `user_id`."""
+    db_token = db.query(RefreshToken).filter(RefreshToken.token_hash == _hash_refresh_token(refresh_token)).first()
+    if db_token is not None and db_token.user_id == user_id:
+        _revoke_refresh_family(db, db_token.family_id, datetime.utcnow())
+        db.commit()
+
+def revoke_token(db: Session, claims: dict):
+    """Revoke the access token with these (verified) claims until it expires."""
+    if "jti" not in claims or "uid" not in claims:
+        # Issued before tokens were named; it can only run out
+        return
+    expires_at = datetime.utcfromtimestamp(claims["exp"])
+    if db.query(RevokedToken.id).filter(RevokedToken.jti == claims["jti"]).first() is None:
+        db.add(RevokedToken(jti=claims["jti"], user_id=claims["uid"], expires_at=expires_at))
+        db.commit()
+    revocation_set.add_token(claims["jti"], expires_at)
+    logger.info("Token revoked for %s", claims.get("sub"))
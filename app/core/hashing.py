@@ -0,0 +1,78 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from app.core.metrics import Histogram
+
+load_dotenv()
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_duration_seconds",
+    "Time spent in bcrypt per call, by operation (hash or verify).",
+    ("operation",),
+    buckets=(0.05, 0.1, 0.15, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0),
+)
+
+class PasswordHashPool:
+    """Bounded worker pool for password hashing and verification.
+
+    bcrypt costs 100-300 ms of CPU per call and releases the GIL while it runs,
+    so a small thread pool keeps it off the event loop without letting a login
+    burst occupy every worker thread the server has. Callers queue up behind
+    `max_workers` running jobs; `stats()` exposes the queue depth.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._max_queued = 0
+
+    def _run(self, fn, *args):
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            PASSWORD_HASH_SECONDS.labels(getattr(fn, "__name__", "call")).observe(time.perf_counter() - started)
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+
+    def submit(self, fn, *args):
+        with self._lock:
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+        return self._executor.submit(self._run, fn, *args)
+
+    def run(self, fn, *args):
+        """Run `fn` on the pool and block the calling thread until it finishes."""
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn, *args):
+        """Run `fn` on the pool without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "queued": self._queued,
+                "active": self._active,
+                "completed": self._completed,
+                "max_queued": self._max_queued,
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+hash_pool = PasswordHashPool(PASSWORD_HASH_WORKERS)
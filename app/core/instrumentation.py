@@ -0,0 +1,257 @@
+import logging
+import os
+import time
+from contextvars import ContextVar
+from sqlalchemy import event, func, select
+from dotenv import load_dotenv
+from app.core.cache import TTLCache
+from app.core.hashing import hash_pool
+from app.core.metrics import Counter, Gauge, Histogram, REGISTRY
+from app.database import SessionLocal, engine, read_engine, replica_engine, async_engine, async_replica_engine
+from app.models.book import BookCopyStatus
+from app.models.counters import LibraryCounter, OPEN_ISSUES_COUNTER, copies_counter
+
+load_dotenv()
+
+# Seconds the business gauges (copies by status, open issues) are served from cache
+BUSINESS_METRICS_TTL = float(os.getenv("BUSINESS_METRICS_TTL", 30))
+# Profile every request; otherwise only admin requests sending SQL_PROFILE_HEADER
+SQL_PROFILE = os.getenv("SQL_PROFILE", "false").lower() in ("1", "true", "yes")
+SQL_PROFILE_HEADER = "X-SQL-Profile"
+# Slowest statements listed in the Server-Timing header
+SQL_PROFILE_TOP = int(os.getenv("SQL_PROFILE_TOP", 5))
+# Statements slower than this are logged with parameters and plan (0 disables)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 500))
+
+slow_query_logger = logging.getLogger("app.slow_query")
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template, method and status.",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template and method.",
+    ("method", "route"),
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "SQL statements executed while handling one HTTP request.",
+    ("route",), buckets=(0, 1, 2, 3, 4, 5, 8, 13, 21, 34, 55, 89),
+)
+DB_QUERY_SECONDS_PER_REQUEST = Histogram(
+    "db_query_duration_seconds_per_request", "Total SQL execution time of one HTTP request.",
+    ("route",),
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a connection from the pool.",
+    ("engine",), buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_connections_checked_out", "Connections currently checked out of the pool.", ("engine",),
+)
+PASSWORD_HASH_POOL_JOBS = Gauge(
+    "password_hash_pool_jobs", "bcrypt jobs waiting for or running on the hash pool.", ("state",),
+)
+LIBRARY_BOOK_COPIES = Gauge("library_book_copies", "Book copies by status.", ("status",))
+LIBRARY_OPEN_ISSUES = Gauge("library_open_issues", "Issues not returned yet (issued or overdue).")
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class QueryStats:
+    __slots__ = ("count", "duration", "profile", "statements", "admin")
+
+    def __init__(self, profile: bool = False):
+        self.count = 0
+        self.duration = 0.0
+        # (seconds, statement) of every statement, only while profiling
+        self.profile = profile
+        self.statements = []
+        self.admin = False
+
+
+# Statements of the current request. Set by the middleware; the threadpool and
+# run_sync both run controllers in a copy of the request's context, so they
+# share the same QueryStats object.
+_query_stats: ContextVar = ContextVar("query_stats", default=None)
+
+
+def begin_request(request) -> QueryStats:
+    profile = SQL_PROFILE or request.headers.get(SQL_PROFILE_HEADER, "").lower() in ("1", "true", "yes")
+    stats = QueryStats(profile)
+    _query_stats.set(stats)
+    return stats
+
+
+def note_principal(principal):
+    """Called once the request is authenticated; header profiling is for admins only."""
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.admin = principal.role == "admin"
+
+
+def _timing_desc(statement: str) -> str:
+    return " ".join(statement.split())[:120].replace('"', "'").replace("\\", "/")
+
+
+def server_timing(stats: QueryStats):
+    """Server-Timing header value for a profiled request, or None if it may not see it."""
+    if not stats.profile or not (SQL_PROFILE or stats.admin):
+        return None
+    entries = [f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} statements"']
+    slowest = sorted(stats.statements, key=lambda item: item[0], reverse=True)[:SQL_PROFILE_TOP]
+    for rank, (seconds, statement) in enumerate(slowest, start=1):
+        entries.append(f'sql{rank};dur={seconds * 1000:.2f};desc="{_timing_desc(statement)}"')
+    return ", ".join(entries)
+
+
+def record_request(request, status_code: int, duration: float, stats: QueryStats):
+    route = request.scope.get("route")
+    # Route templates, not raw paths, keep the label set bounded
+    template = route.path if route is not None else UNMATCHED_ROUTE
+    HTTP_REQUESTS.labels(request.method, template, status_code).inc()
+    HTTP_REQUEST_SECONDS.labels(request.method, template).observe(duration)
+    DB_QUERIES_PER_REQUEST.labels(template).observe(stats.count)
+    DB_QUERY_SECONDS_PER_REQUEST.labels(template).observe(stats.duration)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if conn.info.get("explaining"):
+        return
+    elapsed = time.perf_counter() - conn.info["query_started"]
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += elapsed
+        if stats.profile:
+            stats.statements.append((elapsed, statement))
+    if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+        _log_slow_query(conn, statement, parameters, executemany, elapsed)
+
+
+# Statements EXPLAIN accepts everywhere; DDL, transaction control and the
+# like are logged without a plan
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE")
+
+
+def _explain(conn, statement, parameters):
+    words = statement.split(None, 1)
+    if not words or words[0].upper() not in _EXPLAINABLE:
+        return None
+    sqlite = conn.dialect.name == "sqlite"
+    prefix = "EXPLAIN QUERY PLAN " if sqlite else "EXPLAIN "
+    conn.info["explaining"] = True
+    try:
+        if not sqlite and conn.in_transaction():
+            # On PostgreSQL a failed statement aborts the whole transaction;
+            # the savepoint confines a failed EXPLAIN to itself
+            with conn.begin_nested():
+                rows = conn.exec_driver_sql(prefix + statement, parameters).all()
+        else:
+            rows = conn.exec_driver_sql(prefix + statement, parameters).all()
+    except Exception as exc:
+        return [f"EXPLAIN failed: {exc}"]
+    finally:
+        conn.info["explaining"] = False
+    # SQLite returns (id, parent, notused, detail); PostgreSQL one text column
+    return [str(row[-1]) for row in rows]
+
+
+def _log_slow_query(conn, statement, parameters, executemany, elapsed):
+    plan = None if executemany else _explain(conn, statement, parameters)
+    slow_query_logger.warning(
+        "Slow query (%.1fms): %s", elapsed * 1000, " ".join(statement.split())[:500],
+        extra={
+            "duration_ms": round(elapsed * 1000, 2),
+            "statement": statement,
+            "parameters": repr(parameters)[:1000],
+            "plan": plan,
+        },
+    )
+
+
+def _time_checkouts(sync_engine, label: str):
+    # The pool has no event that fires before a checkout starts waiting, so
+    # its `connect` is wrapped instead
+    pool = sync_engine.pool
+    connect = pool.connect
+    wait = DB_POOL_CHECKOUT_SECONDS.labels(label)
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            wait.observe(time.perf_counter() - started)
+
+    pool.connect = timed_connect
+
+
+def instrument_engine(sync_engine, label: str):
+    """Time statements per request and pool checkouts of `sync_engine`.
+
+    Engine.dispose() replaces the pool, so the checkout timing is installed
+    again on the new pool from the engine's `engine_disposed` event.
+    """
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "engine_disposed", lambda disposed: _time_checkouts(disposed, label))
+    _time_checkouts(sync_engine, label)
+
+    def collect_checked_out():
+        pool = sync_engine.pool
+        DB_POOL_CHECKED_OUT.labels(label).set(pool.checkedout() if hasattr(pool, "checkedout") else 0)
+
+    REGISTRY.add_collector(collect_checked_out)
+
+
+_library_counts_cache = TTLCache(maxsize=1, ttl=BUSINESS_METRICS_TTL)
+
+
+def library_counts():
+    """Copies by status and open issues, read at most every BUSINESS_METRICS_TTL seconds.
+
+    The totals come from `library_counters`, which the controllers keep in
+    step with every change, so a read sums a few dozen rows however large
+    book_copies and issues grow.
+    """
+    counts = _library_counts_cache.get("library")
+    if counts is None:
+        db = SessionLocal()
+        try:
+            counts = dict(db.execute(
+                select(LibraryCounter.name, func.sum(LibraryCounter.value)).group_by(LibraryCounter.name)
+            ).all())
+        finally:
+            db.close()
+        _library_counts_cache.set("library", counts)
+    return counts
+
+
+def collect_library_metrics():
+    counts = library_counts()
+    for status in BookCopyStatus:
+        LIBRARY_BOOK_COPIES.labels(status.value).set(counts.get(copies_counter(status.value)) or 0)
+    LIBRARY_OPEN_ISSUES.labels().set(counts.get(OPEN_ISSUES_COUNTER) or 0)
+
+
+def collect_hash_pool_metrics():
+    stats = hash_pool.stats()
+    PASSWORD_HASH_POOL_JOBS.labels("queued").set(stats["queued"])
+    PASSWORD_HASH_POOL_JOBS.labels("active").set(stats["active"])
+
+
+instrument_engine(engine, "sync")
+if read_engine is not engine:
+    instrument_engine(read_engine, "sync_read")
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine, "async")
+if replica_engine is not None:
+    instrument_engine(replica_engine, "replica")
+if async_replica_engine is not None:
+    instrument_engine(async_replica_engine.sync_engine, "async_replica")
+REGISTRY.add_collector(collect_hash_pool_metrics)
+REGISTRY.add_collector(collect_library_metrics)
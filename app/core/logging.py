@@ -1,5 +1,144 @@
+import atexit
+import json
 import logging
+import logging.config
+import logging.handlers
+import os
+import pickle
+import queue
+import random
+import socketserver
+import struct
 import sys
+import threading
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LOG_FILE = os.getenv("LOG_FILE", "app.log")
+# Rotate app.log when it reaches LOG_MAX_BYTES or is LOG_ROTATE_SECONDS old (0 disables either)
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+LOG_ROTATE_SECONDS = int(os.getenv("LOG_ROTATE_SECONDS", 24 * 60 * 60))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 5))
+# Records the listener writes between two flushes of the file handler
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", 256))
+# Fraction of successful requests that get an access line; warnings and errors are always kept
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", 1.0))
+# "host:port" of a LogCollector. When set, this process ships its "app" records
+# there instead of writing the console and app.log itself (set by app.serve
+# for its workers, so several processes never write the same file).
+LOG_COLLECTOR = os.getenv("LOG_COLLECTOR", "")
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRS = set(logging.makeLogRecord({}).__dict__) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with `extra=` fields as top-level keys."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "name": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a random `rate` fraction of records below WARNING."""
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or self.rate >= 1 or random.random() < self.rate
+
+
+class RotatingBatchFileHandler(logging.handlers.RotatingFileHandler):
+    """File handler that rotates on size or age and does not flush per record.
+
+    Meant to sit behind a BatchingQueueListener, which flushes it once per
+    batch, so a burst of records becomes a few large writes.
+    """
+
+    def __init__(self, filename, maxBytes=0, backupCount=0, interval=0, encoding=None):
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding, delay=True)
+        self.interval = interval
+        self.size = 0
+        self.rollover_at = time.time() + interval if interval else None
+
+    def doRollover(self):
+        super().doRollover()
+        self.size = 0
+        if self.interval:
+            self.rollover_at = time.time() + self.interval
+
+    def emit(self, record):
+        try:
+            msg = self.format(record) + self.terminator
+            if self.stream is None:
+                self.stream = self._open()
+                self.size = self.stream.seek(0, os.SEEK_END)
+            if (self.maxBytes and self.size and self.size + len(msg) > self.maxBytes) or (
+                self.rollover_at is not None and time.time() >= self.rollover_at
+            ):
+                self.doRollover()
+                self.stream = self._open()
+            self.stream.write(msg)
+            self.size += len(msg)
+        except Exception:
+            self.handleError(record)
+
+
+class LocalQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler for a listener in the same process.
+
+    Only the message is merged on the calling thread; formatting, tracebacks
+    and I/O happen on the listener thread.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that drains up to `batch_size` records, then flushes its handlers once."""
+
+    def __init__(self, queue, *handlers, respect_handler_level=False, batch_size=LOG_BATCH_SIZE):
+        super().__init__(queue, *handlers, respect_handler_level=respect_handler_level)
+        self.batch_size = batch_size
+
+    def _monitor(self):
+        q = self.queue
+        while True:
+            batch = [self.dequeue(True)]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+            stop = False
+            for record in batch:
+                if record is self._sentinel:
+                    stop = True
+                    continue
+                self.handle(record)
+            for handler in self.handlers:
+                handler.flush()
+            if stop:
+                break
+
 
 # Logging Configuration
 LOGGING_CONFIG = {
@@ -11,10 +150,16 @@ LOGGING_CONFIG = {
             "datefmt": "%Y-%m-%d %H:%M:%S",
         },
         "json": {
-            "format": '{"time": "%(asctime)s", "level": "%(levelname)s", "name": "%(name)s", "message": "%(message)s"}',
+            "()": JsonFormatter,
             "datefmt": "%Y-%m-%d %H:%M:%S",
         },
     },
+    "filters": {
+        "access_sampling": {
+            "()": SamplingFilter,
+            "rate": ACCESS_LOG_SAMPLE_RATE,
+        },
+    },
     "handlers": {
         "console": {
             "level": "INFO",
@@ -25,8 +170,11 @@ LOGGING_CONFIG = {
         "file": {
             "level": "INFO",
             "formatter": "json",
-            "class": "logging.FileHandler",
-            "filename": "app.log",
+            "()": RotatingBatchFileHandler,
+            "filename": LOG_FILE,
+            "maxBytes": LOG_MAX_BYTES,
+            "backupCount": LOG_BACKUP_COUNT,
+            "interval": LOG_ROTATE_SECONDS,
         },
     },
     "loggers": {
@@ -35,6 +183,10 @@ LOGGING_CONFIG = {
             "level": "INFO",
             "propagate": False,
         },
+        # Per-request lines from the log_requests middleware; propagates to "app"
+        "app.access": {
+            "filters": ["access_sampling"],
+        },
         "uvicorn.access": {
             "handlers": ["console"],
             "level": "INFO",
@@ -43,5 +195,83 @@ LOGGING_CONFIG = {
     },
 }
 
+class _LogRecordStreamHandler(socketserver.StreamRequestHandler):
+    """Reads what a SocketHandler sends: a 4-byte length, then a pickled record dict."""
+
+    def handle(self):
+        app_logger = logging.getLogger("app")
+        while True:
+            header = self.rfile.read(4)
+            if len(header) < 4:
+                break
+            (length,) = struct.unpack(">L", header)
+            record = logging.makeLogRecord(pickle.loads(self.rfile.read(length)))
+            # Straight to the "app" handlers: the sender already applied its
+            # logger filters (access sampling), which must not run twice
+            app_logger.handle(record)
+
+
+class LogCollector(socketserver.ThreadingTCPServer):
+    """Receives log records from worker processes and writes them through this process's handlers.
+
+    Listens on the loopback interface only; the records arrive pickled, so the
+    port must not be reachable from other hosts.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port: int = 0):
+        super().__init__(("127.0.0.1", port), _LogRecordStreamHandler)
+        self._thread = None
+
+    @property
+    def address(self) -> str:
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="log-collector", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+_listener = None
+
 def setup_logging():
+    """Apply LOGGING_CONFIG, then move the "app" handlers behind a queue.
+
+    Request threads and the event loop only enqueue records; a single
+    listener thread formats them and writes them out in batches (or, with
+    LOG_COLLECTOR set, sends them to the collector).
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
     logging.config.dictConfig(LOGGING_CONFIG)
+
+    app_logger = logging.getLogger("app")
+    handlers = list(app_logger.handlers)
+    for handler in handlers:
+        app_logger.removeHandler(handler)
+    if LOG_COLLECTOR:
+        for handler in handlers:
+            handler.close()
+        host, _, port = LOG_COLLECTOR.rpartition(":")
+        handlers = [logging.handlers.SocketHandler(host, int(port))]
+    log_queue = queue.SimpleQueue()
+    app_logger.addHandler(LocalQueueHandler(log_queue))
+    _listener = BatchingQueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+def shutdown_logging():
+    """Drain the queue and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(shutdown_logging)
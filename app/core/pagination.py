@@ -0,0 +1,46 @@
+import base64
+import binascii
+import json
+from fastapi import HTTPException
+
+# Keyset pagination helpers. Cursors are opaque to clients: a base64url-encoded
+# JSON object holding the key of the last row of the previous page.
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded))["id"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return last_id
+
+def paginate(query, key_column, skip: int = 0, limit: int = 100, cursor: str = None):
+    """Apply keyset (cursor) or legacy offset pagination to a query.
+
+    With a cursor the query seeks past the last seen key, which stays cheap no
+    matter how deep the page is. Without one, `skip` is honoured as an OFFSET
+    for backward compatibility. Either way the page carries a `next_cursor`
+    so clients can switch to keyset paging from any point.
+    """
+    query = query.order_by(key_column)
+    if cursor:
+        query = query.filter(key_column > decode_cursor(cursor))
+    elif skip:
+        query = query.offset(skip)
+
+    if limit < 1:
+        return {"items": [], "next_cursor": cursor}
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(getattr(items[-1], key_column.key))
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,49 @@
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from dotenv import load_dotenv
+from app.core.cache import TTLCache
+
+load_dotenv()
+
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", 10000))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", 60))
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as seen by routes: a detached snapshot of the
+    `User` row, safe to share between requests."""
+    id: int
+    email: str
+    role: str
+    is_active: bool
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            is_active=user.is_active,
+            created_at=user.created_at,
+        )
+
+    @classmethod
+    def from_claims(cls, claims: dict):
+        """From a token issued by create_user_token; None for tokens that
+        predate those claims (they only carry the email)."""
+        if "uid" not in claims or "role" not in claims:
+            return None
+        return cls(
+            id=claims["uid"],
+            email=claims["sub"],
+            role=claims["role"],
+            is_active=claims["active"],
+            created_at=datetime.fromisoformat(claims["created"]),
+        )
+
+# Resolved principals keyed by token subject (email). Entries are dropped when
+# the user controller changes a user's role or active flag; the TTL bounds how
+# long other worker processes can serve a stale entry.
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
@@ -0,0 +1,169 @@
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from dotenv import load_dotenv
+from fastapi import HTTPException, Request, status
+from app.core.cache import TTLCache
+from app.core.metrics import Counter
+
+load_dotenv()
+
+# "attempts/seconds": a bucket holds `attempts` tokens and refills completely
+# over `seconds`, so bursts up to `attempts` pass and the sustained rate is
+# attempts/seconds. Each rule keeps one bucket per key (client IP or account).
+LOGIN_RATE_PER_IP = os.getenv("LOGIN_RATE_PER_IP", "20/60")
+LOGIN_RATE_PER_ACCOUNT = os.getenv("LOGIN_RATE_PER_ACCOUNT", "5/60")
+SIGNUP_RATE_PER_IP = os.getenv("SIGNUP_RATE_PER_IP", "10/3600")
+# Shared bucket store for every worker and instance: "memory://" or
+# "redis://host:port/db". Empty keeps the buckets in this process.
+RATE_LIMIT_URL = os.getenv("RATE_LIMIT_URL", "")
+# Keys (IPs, accounts) tracked per process by the in-memory store
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+
+RATE_LIMITED = Counter(
+    "rate_limited_requests_total",
+    "Requests refused with 429, by rate limit rule.",
+    ("rule",),
+)
+
+
+def parse_rate(value: str):
+    """"20/60" -> (20.0, 60.0)."""
+    attempts, _, seconds = value.partition("/")
+    return float(attempts), float(seconds or 1)
+
+
+class BucketStore(ABC):
+    """Where token buckets live. Implementations take one token atomically."""
+
+    @abstractmethod
+    def take(self, key: str, capacity: float, refill_per_second: float):
+        """Take a token from bucket `key`: (True, 0) or (False, seconds until one is available)."""
+
+    @abstractmethod
+    def reset(self, key: str):
+        """Refill bucket `key`."""
+
+
+class InMemoryBucketStore(BucketStore):
+    """Buckets in this process. An untouched bucket is full, so an entry is
+    only kept until it would have refilled; the LRU bounds memory under a
+    flood of distinct keys."""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS, timer=time.monotonic):
+        self._timer = timer
+        self._buckets = TTLCache(maxsize=max_keys, ttl=0, timer=timer)
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, refill_per_second):
+        now = self._timer()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+            else:
+                retry_after = (1 - tokens) / refill_per_second
+            self._buckets.ttl = max(self._buckets.ttl, capacity / refill_per_second)
+            self._buckets.set(key, (tokens, now))
+        return retry_after == 0.0, retry_after
+
+    def reset(self, key):
+        with self._lock:
+            self._buckets.invalidate(key)
+
+
+# Same algorithm as InMemoryBucketStore, run atomically inside Redis
+_REDIS_TAKE = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate))
+return tostring(retry_after)
+"""
+
+
+class RedisBucketStore(BucketStore):
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_URL points at Redis but the 'redis' package is not installed")
+        self._client = redis.Redis.from_url(url)
+        self._take = self._client.register_script(_REDIS_TAKE)
+
+    def take(self, key, capacity, refill_per_second):
+        retry_after = float(self._take(keys=[f"ratelimit:{key}"], args=[capacity, refill_per_second, time.time()]))
+        return retry_after == 0.0, retry_after
+
+    def reset(self, key):
+        self._client.delete(f"ratelimit:{key}")
+
+
+def store_from_url(url: str) -> BucketStore:
+    if not url or url.startswith("memory://"):
+        return InMemoryBucketStore()
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBucketStore(url)
+    raise ValueError(f"Unsupported RATE_LIMIT_URL: {url}")
+
+
+bucket_store = store_from_url(RATE_LIMIT_URL)
+
+
+class RateLimit:
+    """A named token-bucket rule, e.g. RateLimit("login_ip", "20/60")."""
+
+    def __init__(self, name: str, rate: str):
+        self.name = name
+        self.capacity, seconds = parse_rate(rate)
+        self.refill_per_second = self.capacity / seconds
+
+    def check(self, key: str):
+        """Spend one attempt for `key`; raises 429 with Retry-After when there is none left."""
+        if not RATE_LIMIT_ENABLED:
+            return
+        allowed, retry_after = bucket_store.take(f"{self.name}:{key}", self.capacity, self.refill_per_second)
+        if not allowed:
+            RATE_LIMITED.labels(self.name).inc()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts, try again later",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+    def reset(self, key: str):
+        """Give `key` its full allowance back, e.g. once it has proved itself."""
+        if RATE_LIMIT_ENABLED:
+            bucket_store.reset(f"{self.name}:{key}")
+
+
+login_ip_limit = RateLimit("login_ip", LOGIN_RATE_PER_IP)
+login_account_limit = RateLimit("login_account", LOGIN_RATE_PER_ACCOUNT)
+signup_ip_limit = RateLimit("signup_ip", SIGNUP_RATE_PER_IP)
+
+
+def client_ip(request: Request) -> str:
+    # Behind a reverse proxy, run uvicorn with --proxy-headers so this is the real client
+    return request.client.host if request.client else "unknown"
+
+
+def configure_store(store: BucketStore = None):
+    """Swap the bucket store (tests, benchmarks); None goes back to in-memory."""
+    global bucket_store
+    bucket_store = store or InMemoryBucketStore()
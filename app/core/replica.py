@@ -0,0 +1,47 @@
+import os
+from contextvars import ContextVar
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.metrics import Counter
+
+load_dotenv()
+
+# How far the replica may lag behind the primary. For this long after a user's
+# own write their reads stay on the primary, so they always see what they just
+# changed (read-your-writes).
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", 5))
+# Users tracked at once; the oldest writers are forgotten first
+REPLICA_STICKY_USERS = int(os.getenv("REPLICA_STICKY_USERS", 100000))
+
+READ_ROUTING = Counter(
+    "db_read_routing_total", "Read-only requests by the database they were sent to.", ("target",),
+)
+
+# Principal of the current request. Set by the auth dependency on the request's
+# task; controllers run in a copy of that context (threadpool or run_sync), so
+# commits can tell whose write they were.
+_request_principal: ContextVar = ContextVar("request_principal", default=None)
+
+_recent_writers = TTLCache(maxsize=REPLICA_STICKY_USERS, ttl=REPLICA_MAX_LAG_SECONDS)
+
+
+def note_request_principal(principal):
+    _request_principal.set(principal.id)
+
+
+def wrote_recently(principal_id: int) -> bool:
+    return _recent_writers.get(principal_id) is not None
+
+
+def mark_write(principal_id: int):
+    _recent_writers.set(principal_id, True)
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_writer(session):
+    # Read paths never commit, so a commit on the primary is a write
+    principal_id = _request_principal.get()
+    if principal_id is not None and not session.info.get("replica"):
+        mark_write(principal_id)
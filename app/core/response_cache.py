@@ -0,0 +1,275 @@
+import hashlib
+import os
+from abc import ABC, abstractmethod
+import threading
+import time
+from dotenv import load_dotenv
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.metrics import Counter
+from app.core.replica import REPLICA_MAX_LAG_SECONDS
+from app.core.serialization import dump_json
+
+load_dotenv()
+
+# Serialized responses kept in this process
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 1024))
+# Seconds an entry lives; invalidation is by version, this only bounds memory
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", 300))
+# max-age sent to clients; 0 makes them revalidate (If-None-Match) every time
+RESPONSE_CACHE_MAX_AGE = int(os.getenv("RESPONSE_CACHE_MAX_AGE", 0))
+# Shared backend behind the in-process LRU: "memory://" or "redis://host:port/db"
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "")
+
+RESPONSE_CACHE_REQUESTS = Counter(
+    "response_cache_requests_total",
+    "Response cache lookups (hit, shared_hit, miss) and 304 answers (not_modified).",
+    ("result",),
+)
+
+# How long the shared backend remembers when an entity type last changed
+BUMP_MEMORY_SECONDS = 3600
+
+# Session.info key collecting the entity types a transaction changed
+_PENDING_KEY = "response_cache_invalidate"
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+class CacheBackend(ABC):
+    """Store shared by every process serving the API (e.g. Redis).
+
+    Holds serialized entries and the per-entity version counters, so a write
+    handled by one worker invalidates what the others cached.
+    """
+
+    @abstractmethod
+    def get(self, key: str):
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float):
+        ...
+
+    def get_many(self, keys):
+        return [self.get(key) for key in keys]
+
+    @abstractmethod
+    def incr(self, key: str) -> int:
+        ...
+
+
+class InMemoryBackend(CacheBackend):
+    """Process-local stand-in for a shared backend, for tests and single-process runs."""
+
+    def __init__(self, timer=time.monotonic):
+        self._timer = timer
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self._timer():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, self._timer() + ttl if ttl else None)
+
+    def incr(self, key):
+        with self._lock:
+            value = int(self._data.get(key, (0, None))[0]) + 1
+            self._data[key] = (value, None)
+            return value
+
+
+class RedisBackend(CacheBackend):
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RESPONSE_CACHE_URL points at Redis but the 'redis' package is not installed")
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self._client.get(key)
+
+    def set(self, key, value, ttl):
+        self._client.set(key, value, ex=max(1, int(ttl)))
+
+    def get_many(self, keys):
+        return self._client.mget(keys)
+
+    def incr(self, key):
+        return self._client.incr(key)
+
+
+def backend_from_url(url: str):
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return InMemoryBackend()
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported RESPONSE_CACHE_URL: {url}")
+
+
+class ResponseCache:
+    """Serialized GET responses keyed by path, query string and entity versions.
+
+    Every cached route names the entity types it reads ("books", "authors",
+    ...). Writes bump those types' version counters, which changes the key of
+    every affected response, so stale entries are never served and simply age
+    out of the LRU. Lookups go to the in-process LRU first, then to the shared
+    backend if one is configured.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, backend: CacheBackend = None):
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.ttl = ttl
+        self.backend = backend
+        self._versions = {}
+        self._bumped_at = {}
+        self._lock = threading.Lock()
+
+    def versions(self, entities):
+        if self.backend is not None:
+            values = self.backend.get_many([f"version:{entity}" for entity in entities])
+            return tuple(int(value or 0) for value in values)
+        with self._lock:
+            return tuple(self._versions.get(entity, 0) for entity in entities)
+
+    def bump(self, *entities):
+        now = time.time()
+        for entity in entities:
+            if self.backend is not None:
+                self.backend.incr(f"version:{entity}")
+                self.backend.set(f"bumped:{entity}", str(now).encode(), BUMP_MEMORY_SECONDS)
+            else:
+                with self._lock:
+                    self._versions[entity] = self._versions.get(entity, 0) + 1
+                    self._bumped_at[entity] = now
+
+    def bumped_within(self, entities, seconds: float) -> bool:
+        """Whether any of `entities` changed in the last `seconds`."""
+        if self.backend is not None:
+            stamps = self.backend.get_many([f"bumped:{entity}" for entity in entities])
+        else:
+            with self._lock:
+                stamps = [self._bumped_at.get(entity) for entity in entities]
+        since = time.time() - seconds
+        return any(stamp is not None and float(stamp) > since for stamp in stamps)
+
+    def get(self, key: str):
+        """(etag, body) for `key`, or None."""
+        entry = self.local.get(key)
+        if entry is not None:
+            RESPONSE_CACHE_REQUESTS.labels("hit").inc()
+            return entry
+        if self.backend is not None:
+            raw = self.backend.get(f"response:{key}")
+            if raw is not None:
+                etag, body = bytes(raw).split(b"\n", 1)
+                entry = (etag.decode(), body)
+                self.local.set(key, entry)
+                RESPONSE_CACHE_REQUESTS.labels("shared_hit").inc()
+                return entry
+        RESPONSE_CACHE_REQUESTS.labels("miss").inc()
+        return None
+
+    def set(self, key: str, body: bytes):
+        etag = _etag(body)
+        entry = (etag, body)
+        self.local.set(key, entry)
+        if self.backend is not None:
+            self.backend.set(f"response:{key}", etag.encode() + b"\n" + body, self.ttl)
+        return entry
+
+    def clear(self):
+        self.local.clear()
+        with self._lock:
+            self._versions.clear()
+            self._bumped_at.clear()
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL, backend_from_url(RESPONSE_CACHE_URL))
+
+
+def configure_backend(backend: CacheBackend = None):
+    """Plug in (or remove) the shared backend; drops everything cached so far."""
+    response_cache.backend = backend
+    response_cache.clear()
+
+
+def invalidate(db: Session, *entities):
+    """Bump the versions of `entities` once `db` commits.
+
+    Bumping after the commit (not before) keeps a concurrent reader from
+    caching the old rows under the new version.
+    """
+    db.info.setdefault(_PENDING_KEY, set()).update(entities)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_after_commit(session):
+    entities = session.info.pop(_PENDING_KEY, None)
+    if entities:
+        response_cache.bump(*entities)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    return header.strip() == "*" or etag in (tag.strip() for tag in header.split(","))
+
+
+def _cache_control() -> str:
+    # The cached routes require a login, so only the client may keep a copy
+    if RESPONSE_CACHE_MAX_AGE > 0:
+        return f"private, max-age={RESPONSE_CACHE_MAX_AGE}"
+    return "private, no-cache"
+
+
+async def cached_response(request: Request, entities, response_model, produce, replica: bool = False) -> Response:
+    """Serve a GET from the response cache, or build and cache it.
+
+    `produce` is an async callable returning what the route would return; it
+    is serialized through `response_model` once per version of `entities`.
+    Answers 304 when If-None-Match carries the current ETag.
+
+    `replica` says `produce` reads from a replica. Right after a write the
+    replica may not have it yet, so such a response is served but not stored
+    under the new version.
+    """
+    versions = response_cache.versions(entities)
+    tag = ",".join(f"{entity}={version}" for entity, version in zip(entities, versions))
+    key = f"{tag}|{request.url.path}?{'&'.join(sorted(str(request.query_params).split('&')))}"
+
+    entry = response_cache.get(key)
+    if entry is None:
+        body = dump_json(response_model, await produce())
+        if replica and response_cache.bumped_within(entities, REPLICA_MAX_LAG_SECONDS):
+            entry = (_etag(body), body)
+        else:
+            entry = response_cache.set(key, body)
+    etag, body = entry
+
+    headers = {"ETag": etag, "Cache-Control": _cache_control()}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        RESPONSE_CACHE_REQUESTS.labels("not_modified").inc()
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,192 @@
+import hashlib
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from dotenv import load_dotenv
+from sqlalchemy import delete, select
+from app.core.metrics import Counter
+from app.models.token import RefreshToken, RevokedToken
+
+load_dotenv()
+
+# Seconds between incremental loads of `revoked_tokens` in each process.
+# Revocations made by this process apply at once; ones made by other
+# processes take effect within this delay.
+REVOCATION_REFRESH_SECONDS = float(os.getenv("REVOCATION_REFRESH_SECONDS", 5))
+# Revoked tokens the bloom filter is sized for at a 1% false-positive rate;
+# it is rebuilt larger if more are live at once
+REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", 100000))
+# Rows are re-read this far behind the newest one seen, so a revocation
+# committed late (or stamped by a worker with a slightly slow clock) is not skipped
+REFRESH_OVERLAP = timedelta(seconds=30)
+# Seconds between sweeps that drop entries whose tokens have expired
+PRUNE_SECONDS = 60
+
+TOKEN_CHECKS = Counter(
+    "auth_token_checks_total",
+    "Access tokens checked, by outcome (ok, revoked, invalid).",
+    ("result",),
+)
+
+
+def _epoch(value: datetime) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class BloomFilter:
+    """Fixed-size bit array answering "definitely not present" or "maybe present"."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = max(1, capacity)
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        # Double hashing: probe i is h1 + i*h2, both halves of one digest
+        digest = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=16).digest(), "little")
+        h1, h2 = digest & 0xFFFFFFFFFFFFFFFF, (digest >> 64) | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        # Absent keys usually stop at the first clear bit
+        for position in self._positions(key):
+            if not self.bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class RevocationSet:
+    """In-memory view of `revoked_tokens` for the auth dependency.
+
+    Two kinds of entries: single tokens by `jti` (logout), and per-user
+    cut-offs that revoke every token issued to a user up to a moment (role
+    or active flag changes). Nearly every check is for a token that was never
+    revoked; the bloom filter answers that from a few bit probes, and only its
+    rare "maybe" goes on to the exact dict. Entries are dropped once the tokens
+    they cover have expired.
+
+    Reads take no lock: they only look at dicts and a bytearray that writers
+    update under the lock (or swap wholesale).
+    """
+
+    def __init__(self, capacity: int = REVOCATION_BLOOM_CAPACITY):
+        self._lock = threading.Lock()
+        self._capacity = capacity
+        self._bloom = BloomFilter(capacity)
+        self._tokens = {}  # jti -> expires (epoch)
+        self._users = {}  # user_id -> (revoked before (epoch), expires (epoch))
+        self._watermark = None
+        self._refreshed_at = 0.0
+        self._refreshing = False
+        self._pruned_at = time.time()
+
+    def add_token(self, jti: str, expires_at: datetime):
+        expires = _epoch(expires_at)
+        with self._lock:
+            if jti not in self._tokens:
+                if len(self._tokens) >= self._bloom.capacity:
+                    self._rebuild(2 * len(self._tokens))
+                self._bloom.add(jti)
+            self._tokens[jti] = expires
+
+    def add_user(self, user_id: int, revoked_at: datetime, expires_at: datetime):
+        revoked_before, expires = _epoch(revoked_at), _epoch(expires_at)
+        with self._lock:
+            current = self._users.get(user_id)
+            if current is None or current[0] < revoked_before:
+                self._users[user_id] = (revoked_before, max(expires, current[1] if current else expires))
+
+    def is_revoked(self, claims: dict) -> bool:
+        jti = claims.get("jti")
+        if jti is not None and jti in self._bloom and jti in self._tokens:
+            return True
+        cutoff = self._users.get(claims.get("uid"))
+        return cutoff is not None and claims.get("iat", 0) <= cutoff[0]
+
+    def claim_refresh(self) -> bool:
+        """True (once) when a refresh is due; the caller must then run `refresh`."""
+        if self._refreshing or time.time() - self._refreshed_at < REVOCATION_REFRESH_SECONDS:
+            return False
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+            return True
+
+    def refresh(self, db):
+        """Load the rows added since the last refresh (all live rows the first time)."""
+        try:
+            now = datetime.utcnow()
+            query = select(RevokedToken.jti, RevokedToken.user_id, RevokedToken.revoked_at, RevokedToken.expires_at)
+            if self._watermark is None:
+                query = query.where(RevokedToken.expires_at > now)
+            else:
+                query = query.where(RevokedToken.revoked_at >= self._watermark - REFRESH_OVERLAP)
+            newest = self._watermark
+            for jti, user_id, revoked_at, expires_at in db.execute(query):
+                if jti is not None:
+                    self.add_token(jti, expires_at)
+                else:
+                    self.add_user(user_id, revoked_at, expires_at)
+                if newest is None or revoked_at > newest:
+                    newest = revoked_at
+            self._watermark = newest or now
+            if time.time() - self._pruned_at >= PRUNE_SECONDS:
+                self.prune()
+            self._refreshed_at = time.time()
+        finally:
+            self._refreshing = False
+
+    def _rebuild(self, capacity: int):
+        bloom = BloomFilter(max(capacity, self._capacity))
+        for jti in self._tokens:
+            bloom.add(jti)
+        self._bloom = bloom
+
+    def prune(self):
+        now = time.time()
+        with self._lock:
+            live = {jti: expires for jti, expires in self._tokens.items() if expires > now}
+            if len(live) < len(self._tokens):
+                self._tokens = live
+                # Bits cannot be cleared, so expired tokens leave with a new filter
+                self._rebuild(len(live))
+            self._users = {user_id: entry for user_id, entry in self._users.items() if entry[1] > now}
+            self._pruned_at = now
+
+    def clear(self):
+        with self._lock:
+            self._tokens = {}
+            self._users = {}
+            self._bloom = BloomFilter(self._capacity)
+            self._watermark = None
+            self._refreshed_at = 0.0
+
+    def stats(self):
+        return {
+            "tokens": len(self._tokens),
+            "users": len(self._users),
+            "bloom_bits": self._bloom.size,
+            "bloom_hashes": self._bloom.hashes,
+            "refreshed_seconds_ago": round(time.time() - self._refreshed_at, 1) if self._refreshed_at else None,
+        }
+
+
+revocation_set = RevocationSet()
+
+
+def purge_expired_tokens(db) -> int:
+    """Delete expired refresh tokens and revocations of expired tokens; scheduled job."""
+    now = datetime.utcnow()
+    purged = db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now)).rowcount
+    purged += db.execute(delete(RefreshToken).where(RefreshToken.expires_at <= now)).rowcount
+    db.commit()
+    return purged
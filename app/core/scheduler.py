@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from contextlib import suppress
+from datetime import datetime, timedelta
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, insert, or_, update
+from sqlalchemy.exc import IntegrityError
+from dotenv import load_dotenv
+from app.database import SessionLocal
+from app.models.scheduler import SchedulerLease
+
+load_dotenv()
+
+logger = logging.getLogger("app")
+
+# Seconds between overdue sweeps; 0 disables the sweeper in this process
+OVERDUE_SWEEP_SECONDS = float(os.getenv("OVERDUE_SWEEP_SECONDS", 300))
+# Seconds between hold expiry runs; 0 disables them in this process
+HOLD_EXPIRY_SECONDS = float(os.getenv("HOLD_EXPIRY_SECONDS", 60))
+# Seconds between purges of expired revoked_tokens and refresh_tokens rows; 0 disables them in this process
+REVOCATION_PURGE_SECONDS = float(os.getenv("REVOCATION_PURGE_SECONDS", 3600))
+
+# Identifies this process as a lease owner
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def acquire_lease(db, name: str, owner: str, ttl: float) -> bool:
+    """Take or renew the lease `name` for `ttl` seconds; False if another owner holds it."""
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl)
+    result = db.execute(
+        update(SchedulerLease)
+        .where(
+            SchedulerLease.name == name,
+            or_(SchedulerLease.owner == owner, SchedulerLease.expires_at < now),
+        )
+        .values(owner=owner, expires_at=expires_at)
+    )
+    if result.rowcount == 1:
+        db.commit()
+        return True
+    try:
+        db.execute(insert(SchedulerLease).values(name=name, owner=owner, expires_at=expires_at))
+        db.commit()
+        return True
+    except IntegrityError:
+        # Someone else's lease that has not expired
+        db.rollback()
+        return False
+
+
+def release_lease(db, name: str, owner: str):
+    db.execute(delete(SchedulerLease).where(SchedulerLease.name == name, SchedulerLease.owner == owner))
+    db.commit()
+
+
+class PeriodicJob:
+    """Run `job(db)` every `interval` seconds on whichever process holds its lease.
+
+    Every instance of the API starts the job; each run first takes or renews
+    the lease in `scheduler_leases`, so only one of them does the work. The
+    lease outlives a couple of intervals, so a crashed leader is replaced
+    after it expires. Jobs are sync and run in the threadpool.
+    """
+
+    def __init__(self, name: str, interval: float, job, lease_ttl: float = None):
+        self.name = name
+        self.interval = interval
+        self.job = job
+        self.lease_ttl = lease_ttl or interval * 3
+        self._task = None
+
+    def run_once(self):
+        db = SessionLocal()
+        try:
+            if not acquire_lease(db, self.name, INSTANCE_ID, self.lease_ttl):
+                return None
+            return self.job(db)
+        finally:
+            db.close()
+
+    async def _loop(self):
+        while True:
+            try:
+                await run_in_threadpool(self.run_once)
+            except Exception:
+                logger.exception("Scheduled job %s failed", self.name)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        self._task = asyncio.create_task(self._loop(), name=f"job:{self.name}")
+
+    def _release(self):
+        db = SessionLocal()
+        try:
+            release_lease(db, self.name, INSTANCE_ID)
+        finally:
+            db.close()
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        # Let another instance take over right away instead of after expiry
+        await run_in_threadpool(self._release)
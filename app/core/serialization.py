@@ -0,0 +1,28 @@
+from fastapi import Response
+from pydantic import TypeAdapter
+
+# Building a TypeAdapter compiles a validator and serializer; do it once per model
+_adapters = {}
+
+
+def type_adapter(model) -> TypeAdapter:
+    adapter = _adapters.get(model)
+    if adapter is None:
+        adapter = _adapters[model] = TypeAdapter(model)
+    return adapter
+
+
+def dump_json(model, content) -> bytes:
+    """Validate `content` (ORM objects, rows or dicts) as `model` and serialize it."""
+    adapter = type_adapter(model)
+    return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+
+def json_response(model, content, headers: dict = None) -> Response:
+    """Serialize with a model picked at request time.
+
+    For routes whose response_model is a Union (e.g. one schema per list
+    view): returning a Response skips FastAPI's validation against the
+    Union, which would try each member in turn.
+    """
+    return Response(content=dump_json(model, content), media_type="application/json", headers=headers)
@@ -1,39 +1,85 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.utils import SECRET_KEY, ALGORITHM
+from app.database import get_db, get_replica_db, is_replica, run_db
+from app.utils import decode_access_token
 from app.schemas.user import TokenData
-from app.models.user import User
+from app.controllers.user import get_user_by_email
+from app.core.principals import Principal, principal_cache
+from app.core.instrumentation import note_principal
+from app.core.replica import READ_ROUTING, note_request_principal, wrote_recently
+from app.core.revocation import TOKEN_CHECKS, revocation_set
+from app.core.tokens import TokenError
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+async def get_token_claims(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> dict:
+    """Verified, unrevoked claims of the bearer token."""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email)
-    except JWTError:
-        raise credentials_exception
-    user = db.query(User).filter(User.email == token_data.email).first()
-    if user is None:
-        raise credentials_exception
-    return user
-
-def get_current_active_user(current_user: User = Depends(get_current_user)):
+        payload = decode_access_token(token)
+    except TokenError:
+        TOKEN_CHECKS.labels("invalid").inc()
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        TOKEN_CHECKS.labels("invalid").inc()
+        raise _credentials_exception()
+    if revocation_set.claim_refresh():
+        await run_db(db, revocation_set.refresh)
+    if revocation_set.is_revoked(payload):
+        TOKEN_CHECKS.labels("revoked").inc()
+        raise _credentials_exception()
+    TOKEN_CHECKS.labels("ok").inc()
+    return payload
+
+async def get_current_user(claims: dict = Depends(get_token_claims), db: Session = Depends(get_db)) -> Principal:
+    # Current tokens carry the whole principal; older ones only the email
+    principal = Principal.from_claims(claims)
+    if principal is None:
+        principal = await _principal_from_db(db, TokenData(email=claims["sub"]))
+    note_principal(principal)
+    note_request_principal(principal)
+    return principal
+
+async def _principal_from_db(db: Session, token_data: TokenData) -> Principal:
+    principal = principal_cache.get(token_data.email)
+    if principal is None:
+        user = await run_db(db, get_user_by_email, token_data.email)
+        if user is None:
+            raise _credentials_exception()
+        principal = Principal.from_user(user)
+        principal_cache.set(token_data.email, principal)
+    return principal
+
+def get_current_active_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-def get_current_admin_user(current_user: User = Depends(get_current_active_user)):
+def get_current_admin_user(current_user: Principal = Depends(get_current_active_user)) -> Principal:
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not enough permissions")
     return current_user
+
+async def get_read_db(
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    replica: Session = Depends(get_replica_db),
+) -> Session:
+    """Session for read-only routes: the replica, unless the user just wrote.
+
+    Sessions connect lazily, so the one not picked costs nothing.
+    """
+    if not is_replica(replica):
+        return db
+    if wrote_recently(current_user.id):
+        READ_ROUTING.labels("primary").inc()
+        return db
+    READ_ROUTING.labels("replica").inc()
+    return replica
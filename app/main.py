@@ -1,38 +1,84 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine, Base
-from app.routers import auth, users, books, transactions
+from app.database import dispose_async_engines, dispose_engines, engine
+from app.migrations import run_migrations_once
+from app.routers import auth, users, books, transactions, exports, metrics
 from app.models import * # Import all models to ensure they are registered
 import logging.config
 from app.core.logging import setup_logging
+from app.core.instrumentation import begin_request, record_request, server_timing
+from app.core.scheduler import HOLD_EXPIRY_SECONDS, OVERDUE_SWEEP_SECONDS, REVOCATION_PURGE_SECONDS, PeriodicJob
+from app.core.revocation import purge_expired_tokens
+from app.controllers.transaction import expire_holds, sweep_overdue
 import time
 
 # Setup Logging
 setup_logging()
 logger = logging.getLogger("app")
+access_logger = logging.getLogger("app.access")
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create or upgrade database tables. Every worker imports this module; the
+# file lock lets only one of them run the DDL at a time.
+run_migrations_once(engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    jobs = []
+    if OVERDUE_SWEEP_SECONDS > 0:
+        jobs.append(PeriodicJob("overdue_sweeper", OVERDUE_SWEEP_SECONDS, sweep_overdue))
+    if HOLD_EXPIRY_SECONDS > 0:
+        jobs.append(PeriodicJob("hold_expiry", HOLD_EXPIRY_SECONDS, expire_holds))
+    if REVOCATION_PURGE_SECONDS > 0:
+        jobs.append(PeriodicJob("expired_token_purge", REVOCATION_PURGE_SECONDS, purge_expired_tokens))
+    for job in jobs:
+        job.start()
+    yield
+    for job in jobs:
+        await job.stop()
+    # In-flight requests have finished by now; close the pools
+    await dispose_async_engines()
+    dispose_engines()
 
 app = FastAPI(
     title="Library Management System API",
     description="Industry-level backend API for a Library Management System using FastAPI, SQLAlchemy, and SQLite.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    start_time = time.time()
+    start_time = time.perf_counter()
+    query_stats = begin_request(request)
     try:
         response = await call_next(request)
-        process_time = (time.time() - start_time) * 1000
-        formatted_process_time = "{0:.2f}".format(process_time)
-        logger.info(f"path={request.url.path} method={request.method} status={response.status_code} duration={formatted_process_time}ms")
+        elapsed = time.perf_counter() - start_time
+        record_request(request, response.status_code, elapsed, query_stats)
+        timing = server_timing(query_stats)
+        if timing:
+            response.headers["Server-Timing"] = timing
+        process_time = elapsed * 1000
+        # Failed requests at WARNING, which access-log sampling never drops
+        level = logging.WARNING if response.status_code >= 400 else logging.INFO
+        if access_logger.isEnabledFor(level):
+            path = request.scope["path"]
+            access_logger.log(
+                level, "path=%s method=%s status=%d duration=%.2fms",
+                path, request.method, response.status_code, process_time,
+                extra={"path": path, "method": request.method,
+                       "status": response.status_code, "duration_ms": round(process_time, 2)},
+            )
         return response
     except Exception as e:
-        process_time = (time.time() - start_time) * 1000
-        logger.error(f"Request failed: path={request.url.path} method={request.method} duration={process_time:.2f}ms error={str(e)}")
-        logger.critical(f"Unhandled Exception: {str(e)}", exc_info=True)
+        elapsed = time.perf_counter() - start_time
+        record_request(request, 500, elapsed, query_stats)
+        process_time = elapsed * 1000
+        access_logger.error(
+            "Request failed: path=%s method=%s duration=%.2fms error=%s",
+            request.scope["path"], request.method, process_time, e,
+        )
+        logger.critical("Unhandled Exception: %s", e, exc_info=True)
         raise e
 
 import os
@@ -61,6 +107,8 @@ app.include_router(auth.router, prefix="/auth")
 app.include_router(users.router)
 app.include_router(books.router)
 app.include_router(transactions.router)
+app.include_router(exports.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 def read_root():
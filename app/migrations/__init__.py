@@ -0,0 +1,111 @@
+"""Versioned schema migrations.
+
+Every migration is a module in this package exposing `upgrade(connection)`,
+registered in order in `MIGRATIONS`; its version is its position in the list.
+`run_migrations` applies the versions newer than the one recorded in the
+`schema_version` table, each in its own transaction. `run_migrations_once`
+wraps it in a file lock so several processes starting together (uvicorn or
+gunicorn workers) do not race on the DDL: the first one migrates, the others
+wait and then find nothing left to do.
+
+Version 1 builds the schema from the current models, so on a fresh database
+later migrations find their changes already in place. Migrations must
+therefore be idempotent (create with checkfirst, inspect before altering).
+"""
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+from dotenv import load_dotenv
+from sqlalchemy import Column, Integer, MetaData, Table, func, insert, select
+from app.migrations import (
+    v0001_initial_schema,
+    v0002_hot_filter_indexes,
+    v0003_book_copy_counters,
+    v0004_overdue_sweeper,
+    v0005_hold_queue,
+    v0006_revoked_tokens,
+    v0007_refresh_tokens,
+    v0008_library_counters,
+)
+
+load_dotenv()
+
+logger = logging.getLogger("app")
+
+# File locked while migrations run; defaults to one next to a SQLite database,
+# or in the temp directory. Processes on other hosts need a shared path.
+MIGRATION_LOCK_FILE = os.getenv("MIGRATION_LOCK_FILE", "")
+
+MIGRATIONS = [
+    v0001_initial_schema,
+    v0002_hot_filter_indexes,
+    v0003_book_copy_counters,
+    v0004_overdue_sweeper,
+    v0005_hold_queue,
+    v0006_revoked_tokens,
+    v0007_refresh_tokens,
+    v0008_library_counters,
+]
+
+# Kept out of Base.metadata so create_all never touches it
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+)
+
+def current_version(connection) -> int:
+    schema_version.create(connection, checkfirst=True)
+    return connection.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+def run_migrations(engine):
+    with engine.begin() as connection:
+        version = current_version(connection)
+    for target, migration in enumerate(MIGRATIONS, start=1):
+        if target <= version:
+            continue
+        with engine.begin() as connection:
+            migration.upgrade(connection)
+            connection.execute(insert(schema_version).values(version=target))
+        logger.info("Applied migration %04d (%s)", target, migration.__name__.rsplit(".", 1)[-1])
+
+@contextmanager
+def file_lock(path: str):
+    """Hold an exclusive lock on `path` (created if missing), blocking until it is free."""
+    with open(path, "a+b") as handle:
+        if os.name == "nt":
+            import msvcrt
+            handle.seek(0)
+            # LK_LOCK gives up after 10 seconds, so keep retrying
+            while True:
+                try:
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+def migration_lock_path(engine) -> str:
+    if MIGRATION_LOCK_FILE:
+        return MIGRATION_LOCK_FILE
+    url = engine.url
+    if url.get_backend_name() == "sqlite" and url.database and not url.database.startswith(":memory:"):
+        return os.path.abspath(url.database) + ".migrate.lock"
+    return os.path.join(tempfile.gettempdir(), "lms-migrate.lock")
+
+def run_migrations_once(engine):
+    """run_migrations under the migration file lock."""
+    with file_lock(migration_lock_path(engine)):
+        run_migrations(engine)
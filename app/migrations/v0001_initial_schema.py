@@ -0,0 +1,6 @@
+from app.database import Base
+import app.models  # noqa: F401 - register all models
+
+def upgrade(connection):
+    # Creates whatever is missing; databases that predate migrations keep their tables
+    Base.metadata.create_all(bind=connection)
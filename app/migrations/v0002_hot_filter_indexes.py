@@ -0,0 +1,18 @@
+from sqlalchemy import text
+
+# Spelled out here rather than looked up on the models, so this version means
+# the same thing whatever later changes the models go through.
+# (ix_issues_status, once created here, was superseded in v0004 by
+# ix_issues_status_return_date and is no longer built.)
+INDEXES = {
+    "ix_book_copies_book_id_status": ("book_copies", ("book_id", "status")),
+    "ix_book_authors_author_id": ("book_authors", ("author_id",)),
+    "ix_issues_user_id": ("issues", ("user_id",)),
+    "ix_issues_copy_id_status": ("issues", ("copy_id", "status")),
+    "ix_issue_requests_user_id_book_id_status": ("issue_requests", ("user_id", "book_id", "status")),
+    "ix_issue_requests_book_id_status_request_time": ("issue_requests", ("book_id", "status", "request_time")),
+}
+
+def upgrade(connection):
+    for name, (table, columns) in INDEXES.items():
+        connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
@@ -0,0 +1,18 @@
+from sqlalchemy import inspect, text
+
+COUNTERS = ("total_copies", "available_copies", "issued_copies")
+
+# Recount every book from book_copies (served by ix_book_copies_book_id_status)
+BACKFILL = """
+UPDATE books SET
+    total_copies = (SELECT count(*) FROM book_copies c WHERE c.book_id = books.id),
+    available_copies = (SELECT count(*) FROM book_copies c WHERE c.book_id = books.id AND c.status = 'available'),
+    issued_copies = (SELECT count(*) FROM book_copies c WHERE c.book_id = books.id AND c.status = 'issued')
+"""
+
+def upgrade(connection):
+    existing = {column["name"] for column in inspect(connection).get_columns("books")}
+    for name in COUNTERS:
+        if name not in existing:
+            connection.execute(text(f"ALTER TABLE books ADD COLUMN {name} INTEGER NOT NULL DEFAULT 0"))
+    connection.execute(text(BACKFILL))
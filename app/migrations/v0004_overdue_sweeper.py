@@ -0,0 +1,8 @@
+from sqlalchemy import text
+from app.models.scheduler import SchedulerLease
+
+def upgrade(connection):
+    SchedulerLease.__table__.create(connection, checkfirst=True)
+    connection.execute(text("CREATE INDEX IF NOT EXISTS ix_issues_status_return_date ON issues (status, return_date)"))
+    # Superseded by (status, return_date), which serves status lookups too
+    connection.execute(text("DROP INDEX IF EXISTS ix_issues_status"))
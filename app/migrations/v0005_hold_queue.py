@@ -0,0 +1,15 @@
+from sqlalchemy import inspect, text
+
+COLUMNS = {
+    "copy_id": "INTEGER REFERENCES book_copies(id)",
+    "hold_expires_at": "TIMESTAMP",
+}
+
+def upgrade(connection):
+    existing = {column["name"] for column in inspect(connection).get_columns("issue_requests")}
+    for name, definition in COLUMNS.items():
+        if name not in existing:
+            connection.execute(text(f"ALTER TABLE issue_requests ADD COLUMN {name} {definition}"))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_issue_requests_status_hold_expires_at ON issue_requests (status, hold_expires_at)"
+    ))
@@ -0,0 +1,4 @@
+from app.models.token import RevokedToken
+
+def upgrade(connection):
+    RevokedToken.__table__.create(connection, checkfirst=True)
@@ -0,0 +1,4 @@
+from app.models.token import RefreshToken
+
+def upgrade(connection):
+    RefreshToken.__table__.create(connection, checkfirst=True)
@@ -0,0 +1,24 @@
+from sqlalchemy import delete, func, insert, select
+from app.models.book import BookCopy
+from app.models.counters import (
+    LibraryCounter, LIBRARY_COUNTERS, LIBRARY_COUNTER_SHARDS, OPEN_ISSUES_COUNTER, copies_counter,
+)
+from app.models.transaction import Issue, IssueStatus
+
+OPEN_ISSUE_STATUSES = (IssueStatus.ISSUED.value, IssueStatus.OVERDUE.value)
+
+def upgrade(connection):
+    LibraryCounter.__table__.create(connection, checkfirst=True)
+    # Backfill: the current totals go in shard 0, every other shard starts at 0
+    totals = dict.fromkeys(LIBRARY_COUNTERS, 0)
+    for status, count in connection.execute(select(BookCopy.status, func.count()).group_by(BookCopy.status)):
+        totals[copies_counter(status)] = count
+    totals[OPEN_ISSUES_COUNTER] = connection.scalar(
+        select(func.count()).select_from(Issue).where(Issue.status.in_(OPEN_ISSUE_STATUSES))
+    )
+    connection.execute(delete(LibraryCounter))
+    connection.execute(insert(LibraryCounter), [
+        {"name": name, "shard": shard, "value": total if shard == 0 else 0}
+        for name, total in totals.items()
+        for shard in range(LIBRARY_COUNTER_SHARDS)
+    ])
@@ -1,3 +1,7 @@
 from .user import User
 from .book import Book, Author, Publisher, BookCopy, book_authors
 from .transaction import Issue, IssueRequest
+from .scheduler import SchedulerLease
+from .token import RevokedToken, RefreshToken
+from .counters import LibraryCounter
+from . import search
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Table, DateTime, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, Table, DateTime, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -10,6 +10,8 @@ book_authors = Table(
     Base.metadata,
     Column("book_id", Integer, ForeignKey("books.id"), primary_key=True),
     Column("author_id", Integer, ForeignKey("authors.id"), primary_key=True),
+    # The primary key covers book -> authors; this covers author -> books
+    Index("ix_book_authors_author_id", "author_id"),
 )
 
 class Publisher(Base):
@@ -36,6 +38,11 @@ class Book(Base):
     title = Column(String, index=True, nullable=False)
     publication_year = Column(Integer)
     publisher_id = Column(Integer, ForeignKey("publishers.id"))
+    # Denormalized from book_copies; kept in step by every controller that adds
+    # copies or changes their status, repaired by reconcile_copy_counters
+    total_copies = Column(Integer, nullable=False, default=0, server_default="0")
+    available_copies = Column(Integer, nullable=False, default=0, server_default="0")
+    issued_copies = Column(Integer, nullable=False, default=0, server_default="0")
 
     publisher = relationship("Publisher", back_populates="books")
     authors = relationship("Author", secondary=book_authors, back_populates="books")
@@ -45,11 +52,16 @@ class Book(Base):
 class BookCopyStatus(str, enum.Enum):
     AVAILABLE = "available"
     ISSUED = "issued"
+    ON_HOLD = "on_hold"  # Returned and kept for the head of the book's hold queue
     MAINTENANCE = "maintenance"
     LOST = "lost"
 
 class BookCopy(Base):
     __tablename__ = "book_copies"
+    __table_args__ = (
+        # Copy allocation: "an available copy of book X"
+        Index("ix_book_copies_book_id_status", "book_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     book_id = Column(Integer, ForeignKey("books.id"), nullable=False)
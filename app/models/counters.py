@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String
+from app.database import Base
+from app.models.book import BookCopyStatus
+
+# Writers add to one shard picked at random and readers sum the shards, so
+# concurrent checkouts and returns rarely wait on the same row lock
+LIBRARY_COUNTER_SHARDS = 8
+OPEN_ISSUES_COUNTER = "open_issues"
+
+def copies_counter(status: str) -> str:
+    return f"copies:{status}"
+
+LIBRARY_COUNTERS = tuple(copies_counter(status.value) for status in BookCopyStatus) + (OPEN_ISSUES_COUNTER,)
+
+class LibraryCounter(Base):
+    """Library-wide totals (copies by status, open issues), kept in step by the
+    controllers that change them and summed over shards for /metrics."""
+    __tablename__ = "library_counters"
+
+    name = Column(String, primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    value = Column(Integer, nullable=False, default=0, server_default="0")
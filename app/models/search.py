@@ -0,0 +1,118 @@
+from contextlib import contextmanager
+from sqlalchemy import bindparam, event, text
+from app.database import Base
+
+# Full-text catalog index (SQLite FTS5). One row per book, rowid = books.id,
+# holding the searchable text of the book and its authors and publisher.
+# Triggers on books, book_authors, authors and publishers keep it in sync, so
+# every write path (ORM, bulk Core inserts, raw SQL) is covered.
+#
+# Bulk loaders can skip the per-row insert triggers by putting a row in
+# books_fts_pause for the duration of their transaction and indexing the new
+# books in one statement before commit (see `suspended_search_sync`). SQLite
+# allows a single writer, so no other connection ever sees the pause row.
+
+FTS_TABLE = "books_fts"
+FTS_PAUSE_TABLE = "books_fts_pause"
+_SYNC_ENABLED = f"WHEN NOT EXISTS (SELECT 1 FROM {FTS_PAUSE_TABLE})"
+
+# Column order matters: highlight() and bm25() address columns by index.
+FTS_COLUMNS = ("title", "authors", "publisher", "isbn")
+
+_INDEX_BOOKS = """
+INSERT INTO books_fts(rowid, title, authors, publisher, isbn)
+SELECT b.id, b.title,
+       (SELECT group_concat(a.name, ' ') FROM book_authors ba
+        JOIN authors a ON a.id = ba.author_id WHERE ba.book_id = b.id),
+       (SELECT p.name FROM publishers p WHERE p.id = b.publisher_id),
+       b.isbn
+FROM books b WHERE {where};
+"""
+
+_REINDEX_BOOKS = "DELETE FROM books_fts WHERE rowid IN ({ids});" + _INDEX_BOOKS
+
+FTS_TRIGGERS = (
+    "books_fts_ai", "books_fts_au", "books_fts_ad",
+    "book_authors_fts_ai", "book_authors_fts_ad",
+    "authors_fts_au", "publishers_fts_au",
+)
+
+FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, authors, publisher, isbn,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )""",
+    f"CREATE TABLE IF NOT EXISTS {FTS_PAUSE_TABLE} (id INTEGER PRIMARY KEY)",
+    """CREATE TRIGGER books_fts_ai AFTER INSERT ON books """ + _SYNC_ENABLED + """ BEGIN
+    """ + _INDEX_BOOKS.format(where="b.id = NEW.id") + """
+    END""",
+    """CREATE TRIGGER books_fts_au AFTER UPDATE OF title, isbn, publisher_id ON books BEGIN
+    """ + _REINDEX_BOOKS.format(ids="OLD.id", where="b.id = NEW.id") + """
+    END""",
+    """CREATE TRIGGER books_fts_ad AFTER DELETE ON books BEGIN
+        DELETE FROM books_fts WHERE rowid = OLD.id;
+    END""",
+    """CREATE TRIGGER book_authors_fts_ai AFTER INSERT ON book_authors """ + _SYNC_ENABLED + """ BEGIN
+    """ + _REINDEX_BOOKS.format(ids="NEW.book_id", where="b.id = NEW.book_id") + """
+    END""",
+    """CREATE TRIGGER book_authors_fts_ad AFTER DELETE ON book_authors BEGIN
+    """ + _REINDEX_BOOKS.format(ids="OLD.book_id", where="b.id = OLD.book_id") + """
+    END""",
+    """CREATE TRIGGER authors_fts_au AFTER UPDATE OF name ON authors BEGIN
+    """ + _REINDEX_BOOKS.format(
+        ids="SELECT book_id FROM book_authors WHERE author_id = NEW.id",
+        where="b.id IN (SELECT book_id FROM book_authors WHERE author_id = NEW.id)",
+    ) + """
+    END""",
+    """CREATE TRIGGER publishers_fts_au AFTER UPDATE OF name ON publishers BEGIN
+    """ + _REINDEX_BOOKS.format(
+        ids="SELECT id FROM books WHERE publisher_id = NEW.id",
+        where="b.publisher_id = NEW.id",
+    ) + """
+    END""",
+]
+
+def fts_available(connection) -> bool:
+    return connection.dialect.name == "sqlite"
+
+_INDEX_BOOK_IDS = text(_INDEX_BOOKS.format(where="b.id IN :book_ids")).bindparams(
+    bindparam("book_ids", expanding=True)
+)
+
+@contextmanager
+def suspended_search_sync(connection, book_ids):
+    """Disable the per-row insert triggers inside the current transaction.
+
+    The caller appends the ids of the books it inserted to `book_ids`; they are
+    indexed in one set-based statement on exit. Must run inside a transaction
+    that is committed or rolled back as a whole.
+    """
+    connection.execute(text(f"INSERT INTO {FTS_PAUSE_TABLE} (id) VALUES (1)"))
+    yield
+    if book_ids:
+        connection.execute(_INDEX_BOOK_IDS, {"book_ids": list(book_ids)})
+    connection.execute(text(f"DELETE FROM {FTS_PAUSE_TABLE}"))
+
+def rebuild_search_index(connection):
+    """Repopulate the full-text index from the catalog tables."""
+    connection.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    connection.execute(text(_INDEX_BOOKS.format(where="1")))
+    connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"))
+
+@event.listens_for(Base.metadata, "after_create")
+def create_search_index(target, connection, **kw):
+    if not fts_available(connection):
+        return
+    existed = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE},
+    ).first()
+    # Triggers are recreated so their definitions always follow this module
+    for name in FTS_TRIGGERS:
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+    for statement in FTS_DDL:
+        connection.execute(text(statement))
+    # Databases created before the index existed get it populated once
+    if not existed:
+        rebuild_search_index(connection)
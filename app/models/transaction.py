@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -14,9 +14,19 @@ class RequestStatus(str, enum.Enum):
     APPROVED = "approved"
     REJECTED = "rejected"
     FULFILLED = "fulfilled"
+    READY = "ready"  # A copy is on hold for this request until hold_expires_at
+    EXPIRED = "expired"  # The hold ran out before the copy was picked up
 
 class Issue(Base):
     __tablename__ = "issues"
+    __table_args__ = (
+        # A member's loans, in id order for keyset pagination
+        Index("ix_issues_user_id", "user_id"),
+        # Open issues of a copy
+        Index("ix_issues_copy_id_status", "copy_id", "status"),
+        # Open issues past their due date (overdue sweep and listing)
+        Index("ix_issues_status_return_date", "status", "return_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -32,12 +42,23 @@ class Issue(Base):
 
 class IssueRequest(Base):
     __tablename__ = "issue_requests"
+    __table_args__ = (
+        # A member's requests and the duplicate pending-request check
+        Index("ix_issue_requests_user_id_book_id_status", "user_id", "book_id", "status"),
+        # Pending requests of a book in arrival order
+        Index("ix_issue_requests_book_id_status_request_time", "book_id", "status", "request_time"),
+        # Holds running out (hold expiry job)
+        Index("ix_issue_requests_status_hold_expires_at", "status", "hold_expires_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     book_id = Column(Integer, ForeignKey("books.id"), nullable=False)
     status = Column(String, default=RequestStatus.PENDING.value)
     request_time = Column(DateTime, default=datetime.utcnow)
+    # The copy held for this request while it is ready for pickup
+    copy_id = Column(Integer, ForeignKey("book_copies.id"), nullable=True)
+    hold_expires_at = Column(DateTime, nullable=True)
 
     user = relationship("app.models.user.User", back_populates="requests")
     book = relationship("app.models.book.Book", back_populates="requests")
@@ -1,21 +1,64 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.controllers.user import authenticate_user, create_user_token
-from app.schemas.user import Token
+from typing import Optional
+from app.database import get_db, run_db
+from app.controllers.user import (
+    authenticate_user_async, issue_user_tokens, refresh_user_tokens, revoke_refresh_token, revoke_token,
+)
+from app.core.hashing import hash_pool
+from app.core.rate_limit import client_ip, login_account_limit, login_ip_limit
+from app.core.principals import principal_cache
+from app.core.revocation import revocation_set
+from app.dependencies import get_current_admin_user, get_token_claims
+from app.schemas.user import LogoutRequest, RefreshRequest, Token
 
 router = APIRouter(
     tags=["Authentication"]
 )
 
 @router.post("/token", response_model=Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = authenticate_user(db, form_data.username, form_data.password)
+async def login_for_access_token(
+    request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+):
+    # Before bcrypt, so a password-guessing burst costs a dict lookup per attempt.
+    # The account bucket counts attempts from every IP, so spreading guesses
+    # over many clients does not get around it.
+    account = form_data.username.lower()
+    login_ip_limit.check(client_ip(request))
+    login_account_limit.check(account)
+    user = await authenticate_user_async(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return create_user_token(user)
+    # The owner's own typos stop counting once they get the password right
+    login_account_limit.reset(account)
+    return await run_db(db, issue_user_tokens, user)
+
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(body: RefreshRequest, db: Session = Depends(get_db)):
+    return await run_db(db, refresh_user_tokens, body.refresh_token)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    body: Optional[LogoutRequest] = None, claims: dict = Depends(get_token_claims), db: Session = Depends(get_db)
+):
+    await run_db(db, revoke_token, claims)
+    if body is not None and body.refresh_token and "uid" in claims:
+        await run_db(db, revoke_refresh_token, body.refresh_token, claims["uid"])
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.get("/hash-pool", dependencies=[Depends(get_current_admin_user)])
+def read_hash_pool_stats():
+    return hash_pool.stats()
+
+@router.get("/principal-cache", dependencies=[Depends(get_current_admin_user)])
+def read_principal_cache_stats():
+    return principal_cache.stats()
+
+@router.get("/revocations", dependencies=[Depends(get_current_admin_user)])
+def read_revocation_stats():
+    return revocation_set.stats()
@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Body, Depends, Query, Request
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from typing import Any, Dict, List, Optional, Union
+from app.database import get_db, is_replica, run_db
 from app.schemas.book import (
-    BookCreate, BookRead, 
+    BookCreate, BookRead, BookSummary, BookSearchHit,
     AuthorCreate, AuthorRead, 
     PublisherCreate, PublisherRead, 
-    BookCopyCreate, BookCopyRead
+    BookCopyCreate, BookCopyRead, BookCopySummary,
+    BookImportResult
 )
+from app.schemas.pagination import ListView, Page
+from app.core.response_cache import cached_response
+from app.core.serialization import json_response
 from app.controllers.book import (
     create_publisher as create_publisher_ctrl,
     get_publishers as get_publishers_ctrl,
@@ -16,10 +20,12 @@ from app.controllers.book import (
     create_book as create_book_ctrl,
     get_books as get_books_ctrl,
     get_book as get_book_ctrl,
+    search_books as search_books_ctrl,
+    import_books as import_books_ctrl,
     create_copy as create_copy_ctrl,
     get_all_copies as get_all_copies_ctrl
 )
-from app.dependencies import get_current_admin_user, get_current_active_user
+from app.dependencies import get_current_admin_user, get_current_active_user, get_read_db
 
 router = APIRouter(
     tags=["Books"]
@@ -27,40 +33,91 @@ router = APIRouter(
 
 # --- Publishers ---
 @router.post("/publishers/", response_model=PublisherRead, dependencies=[Depends(get_current_admin_user)])
-def create_publisher(publisher: PublisherCreate, db: Session = Depends(get_db)):
-    return create_publisher_ctrl(db, publisher)
+async def create_publisher(publisher: PublisherCreate, db: Session = Depends(get_db)):
+    return await run_db(db, create_publisher_ctrl, publisher)
 
-@router.get("/publishers/", response_model=List[PublisherRead], dependencies=[Depends(get_current_active_user)])
-def read_publishers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_publishers_ctrl(db, skip, limit)
+@router.get("/publishers/", response_model=Page[PublisherRead], dependencies=[Depends(get_current_active_user)])
+async def read_publishers(
+    request: Request, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+):
+    return await cached_response(
+        request, ("publishers",), Page[PublisherRead],
+        lambda: run_db(db, get_publishers_ctrl, skip, limit, cursor), replica=is_replica(db),
+    )
 
 # --- Authors ---
 @router.post("/authors/", response_model=AuthorRead, dependencies=[Depends(get_current_admin_user)])
-def create_author(author: AuthorCreate, db: Session = Depends(get_db)):
-    return create_author_ctrl(db, author)
+async def create_author(author: AuthorCreate, db: Session = Depends(get_db)):
+    return await run_db(db, create_author_ctrl, author)
 
-@router.get("/authors/", response_model=List[AuthorRead], dependencies=[Depends(get_current_active_user)])
-def read_authors(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_authors_ctrl(db, skip, limit)
+@router.get("/authors/", response_model=Page[AuthorRead], dependencies=[Depends(get_current_active_user)])
+async def read_authors(
+    request: Request, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+):
+    return await cached_response(
+        request, ("authors",), Page[AuthorRead],
+        lambda: run_db(db, get_authors_ctrl, skip, limit, cursor), replica=is_replica(db),
+    )
 
 # --- Books ---
 @router.post("/books/", response_model=BookRead, dependencies=[Depends(get_current_admin_user)])
-def create_book(book: BookCreate, db: Session = Depends(get_db)):
-    return create_book_ctrl(db, book)
+async def create_book(book: BookCreate, db: Session = Depends(get_db)):
+    return await run_db(db, create_book_ctrl, book)
 
-@router.get("/books/", response_model=List[BookRead], dependencies=[Depends(get_current_active_user)])
-def read_books(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_books_ctrl(db, skip, limit)
+@router.post("/books/bulk", response_model=BookImportResult, dependencies=[Depends(get_current_admin_user)])
+async def import_books(
+    records: List[Dict[str, Any]] = Body(..., description="Records shaped like BookImportRecord; invalid rows are reported, not rejected"),
+    batch_size: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(get_db),
+):
+    return await run_db(db, import_books_ctrl, records, batch_size)
+
+@router.get(
+    "/books/", response_model=Union[Page[BookRead], Page[BookSummary]], dependencies=[Depends(get_current_active_user)]
+)
+async def read_books(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    available: Optional[bool] = Query(None, description="Only books with (true) or without (false) an available copy"),
+    view: ListView = ListView.FULL,
+    db: Session = Depends(get_read_db),
+):
+    # Full books embed their publisher and authors
+    return await cached_response(
+        request, ("books", "publishers", "authors"),
+        Page[BookSummary] if view == ListView.SUMMARY else Page[BookRead],
+        lambda: run_db(db, get_books_ctrl, skip, limit, cursor, available, view), replica=is_replica(db),
+    )
+
+@router.get("/books/search", response_model=List[BookSearchHit], dependencies=[Depends(get_current_active_user)])
+async def search_books(
+    q: str = Query(..., min_length=1), limit: int = Query(20, ge=1, le=100), db: Session = Depends(get_read_db)
+):
+    return await run_db(db, search_books_ctrl, q, limit)
 
 @router.get("/books/{book_id}", response_model=BookRead, dependencies=[Depends(get_current_active_user)])
-def read_book(book_id: int, db: Session = Depends(get_db)):
-    return get_book_ctrl(db, book_id)
+async def read_book(request: Request, book_id: int, db: Session = Depends(get_read_db)):
+    return await cached_response(
+        request, ("books", "publishers", "authors"), BookRead,
+        lambda: run_db(db, get_book_ctrl, book_id), replica=is_replica(db),
+    )
 
 # --- Copies ---
 @router.post("/copies/", response_model=BookCopyRead, dependencies=[Depends(get_current_admin_user)])
-def create_copy(copy: BookCopyCreate, db: Session = Depends(get_db)):
-    return create_copy_ctrl(db, copy)
+async def create_copy(copy: BookCopyCreate, db: Session = Depends(get_db)):
+    return await run_db(db, create_copy_ctrl, copy)
 
-@router.get("/copies/", response_model=List[BookCopyRead], dependencies=[Depends(get_current_active_user)])
-def read_all_copies(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_all_copies_ctrl(db, skip, limit)
+@router.get(
+    "/copies/", response_model=Union[Page[BookCopyRead], Page[BookCopySummary]],
+    dependencies=[Depends(get_current_active_user)],
+)
+async def read_all_copies(
+    skip: int = 0, limit: int = 100, cursor: Optional[str] = None, view: ListView = ListView.FULL,
+    db: Session = Depends(get_read_db),
+):
+    page = await run_db(db, get_all_copies_ctrl, skip, limit, cursor, view)
+    return json_response(Page[BookCopySummary] if view == ListView.SUMMARY else Page[BookCopyRead], page)
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import Optional
+from app.schemas.export import ExportFormat, ExportTable
+from app.controllers.export import export_statement, iter_export
+from app.dependencies import get_current_admin_user
+
+router = APIRouter(
+    prefix="/export",
+    tags=["Export"],
+    dependencies=[Depends(get_current_admin_user)],
+)
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+@router.get("/{table}")
+async def export_table(
+    table: ExportTable,
+    format: ExportFormat = ExportFormat.NDJSON,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    status: Optional[str] = None,
+):
+    # Built up front so a bad filter is a 400, not a broken stream
+    statement = export_statement(table, since, until, status)
+    return StreamingResponse(
+        iter_export(statement, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table.value}.{format.value}"'},
+    )
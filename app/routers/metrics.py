@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+from app.core.metrics import CONTENT_TYPE, REGISTRY
+
+router = APIRouter(
+    tags=["Monitoring"]
+)
+
+# Sync on purpose: collectors may query the database, so scrapes run in the threadpool
+@router.get("/metrics", include_in_schema=False)
+def read_metrics():
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -1,21 +1,29 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from typing import Optional, Union
+from app.database import get_db, run_db
 from app.schemas.transaction import (
-    IssueCreate, IssueRead, IssueUpdate,
-    IssueRequestCreate, IssueRequestRead, IssueRequestUpdate
+    IssueCreate, IssueRead, IssueSummary, IssueUpdate, BookCheckout,
+    IssueRequestCreate, IssueRequestRead, IssueRequestSummary, IssueRequestUpdate,
+    IssueRequestBulkUpdate, IssueRequestBulkResult,
+    RequestQueuePosition
 )
+from app.schemas.pagination import ListView, Page
+from app.core.serialization import json_response
 from app.controllers.transaction import (
     create_request as create_request_ctrl,
     get_requests as get_requests_ctrl,
     update_request_status as update_request_status_ctrl,
+    bulk_update_requests as bulk_update_requests_ctrl,
+    get_queue_position as get_queue_position_ctrl,
     create_issue as create_issue_ctrl,
+    checkout_book as checkout_book_ctrl,
     get_issues as get_issues_ctrl,
+    get_overdue_issues as get_overdue_issues_ctrl,
     return_book as return_book_ctrl
 )
-from app.dependencies import get_current_active_user, get_current_admin_user
-from app.models.user import User
+from app.dependencies import get_current_active_user, get_current_admin_user, get_read_db
+from app.core.principals import Principal
 
 router = APIRouter(
     tags=["Transactions"]
@@ -23,40 +31,77 @@ router = APIRouter(
 
 # --- Issue Requests ---
 @router.post("/requests/", response_model=IssueRequestRead)
-def create_request(
+async def create_request(
     request: IssueRequestCreate, 
     db: Session = Depends(get_db), 
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
-    return create_request_ctrl(db, request, current_user)
+    return await run_db(db, create_request_ctrl, request, current_user)
 
-@router.get("/requests/", response_model=List[IssueRequestRead])
-def read_requests(
+@router.get("/requests/", response_model=Union[Page[IssueRequestRead], Page[IssueRequestSummary]])
+async def read_requests(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    cursor: Optional[str] = None,
+    view: ListView = ListView.FULL,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
-    return get_requests_ctrl(db, current_user, skip, limit)
+    page = await run_db(db, get_requests_ctrl, current_user, skip, limit, cursor, view)
+    return json_response(Page[IssueRequestSummary] if view == ListView.SUMMARY else Page[IssueRequestRead], page)
+
+# Declared before /requests/{request_id} so "bulk" is not taken for an id
+@router.put("/requests/bulk", response_model=IssueRequestBulkResult, dependencies=[Depends(get_current_admin_user)])
+async def bulk_update_requests(bulk: IssueRequestBulkUpdate, db: Session = Depends(get_db)):
+    return await run_db(db, bulk_update_requests_ctrl, bulk)
 
 @router.put("/requests/{request_id}", response_model=IssueRequestRead, dependencies=[Depends(get_current_admin_user)])
-def update_request_status(request_id: int, status_update: IssueRequestUpdate, db: Session = Depends(get_db)):
-    return update_request_status_ctrl(db, request_id, status_update)
+async def update_request_status(request_id: int, status_update: IssueRequestUpdate, db: Session = Depends(get_db)):
+    return await run_db(db, update_request_status_ctrl, request_id, status_update)
+
+@router.get("/requests/{request_id}/position", response_model=RequestQueuePosition)
+async def read_queue_position(
+    request_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    return await run_db(db, get_queue_position_ctrl, request_id, current_user)
 
 # --- Issues ---
 @router.post("/issues/", response_model=IssueRead, dependencies=[Depends(get_current_admin_user)])
-def create_issue(issue: IssueCreate, db: Session = Depends(get_db)):
-    return create_issue_ctrl(db, issue)
+async def create_issue(issue: IssueCreate, db: Session = Depends(get_db)):
+    return await run_db(db, create_issue_ctrl, issue)
 
-@router.get("/issues/", response_model=List[IssueRead])
-def read_issues(
+@router.post("/books/{book_id}/checkout", response_model=IssueRead, dependencies=[Depends(get_current_admin_user)])
+async def checkout_book(book_id: int, checkout: BookCheckout, db: Session = Depends(get_db)):
+    return await run_db(db, checkout_book_ctrl, book_id, checkout)
+
+@router.get("/issues/", response_model=Union[Page[IssueRead], Page[IssueSummary]])
+async def read_issues(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    cursor: Optional[str] = None,
+    view: ListView = ListView.FULL,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    page = await run_db(db, get_issues_ctrl, current_user, skip, limit, cursor, view)
+    return json_response(Page[IssueSummary] if view == ListView.SUMMARY else Page[IssueRead], page)
+
+@router.get(
+    "/issues/overdue", response_model=Union[Page[IssueRead], Page[IssueSummary]],
+    dependencies=[Depends(get_current_admin_user)],
+)
+async def read_overdue_issues(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    view: ListView = ListView.FULL,
+    db: Session = Depends(get_read_db)
 ):
-    return get_issues_ctrl(db, current_user, skip, limit)
+    page = await run_db(db, get_overdue_issues_ctrl, skip, limit, cursor, view)
+    return json_response(Page[IssueSummary] if view == ListView.SUMMARY else Page[IssueRead], page)
 
 @router.post("/issues/{issue_id}/return", response_model=IssueRead, dependencies=[Depends(get_current_admin_user)])
-def return_book(issue_id: int, db: Session = Depends(get_db)):
-    return return_book_ctrl(db, issue_id)
+async def return_book(issue_id: int, db: Session = Depends(get_db)):
+    return await run_db(db, return_book_ctrl, issue_id)
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app.models.user import User
-from app.schemas.user import UserCreate, UserRead
-from app.controllers.user import create_user as create_user_ctrl, get_users as get_users_ctrl, get_user_by_email
+from typing import Optional
+from app.database import get_db, run_db
+from app.core.principals import Principal
+from app.schemas.user import UserCreate, UserRead, UserUpdate
+from app.schemas.pagination import Page
+from app.controllers.user import create_user as create_user_ctrl, get_users as get_users_ctrl, update_user as update_user_ctrl, get_user_by_email
+from app.utils import get_password_hash_async
+from app.core.rate_limit import client_ip, signup_ip_limit
 from app.dependencies import get_current_user, get_current_admin_user
 
 router = APIRouter(
@@ -13,13 +16,20 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=UserRead)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    return create_user_ctrl(db, user)
+async def create_user(request: Request, user: UserCreate, db: Session = Depends(get_db)):
+    signup_ip_limit.check(client_ip(request))
+    # Hash on the hash pool first so bcrypt never holds the session or the event loop
+    hashed_password = await get_password_hash_async(user.password)
+    return await run_db(db, create_user_ctrl, user, hashed_password)
 
 @router.get("/me", response_model=UserRead)
-def read_users_me(current_user: User = Depends(get_current_user)):
+async def read_users_me(current_user: Principal = Depends(get_current_user)):
     return current_user
 
-@router.get("/", response_model=List[UserRead], dependencies=[Depends(get_current_admin_user)])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_users_ctrl(db, skip, limit)
+@router.get("/", response_model=Page[UserRead], dependencies=[Depends(get_current_admin_user)])
+async def read_users(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: Session = Depends(get_db)):
+    return await run_db(db, get_users_ctrl, skip, limit, cursor)
+
+@router.put("/{user_id}", response_model=UserRead, dependencies=[Depends(get_current_admin_user)])
+async def update_user(user_id: int, user_update: UserUpdate, db: Session = Depends(get_db)):
+    return await run_db(db, update_user_ctrl, user_id, user_update)
@@ -1,11 +1,14 @@
-from .user import UserCreate, UserRead, Token, TokenData, UserRole
+from .user import UserCreate, UserRead, UserUpdate, Token, TokenData, RefreshRequest, LogoutRequest, UserRole
 from .book import (
-    BookCreate, BookRead, 
+    BookCreate, BookRead, BookSummary, BookSearchHit,
     AuthorCreate, AuthorRead, 
     PublisherCreate, PublisherRead, 
-    BookCopyCreate, BookCopyRead
+    BookCopyCreate, BookCopyRead, BookCopySummary,
+    BookImportRecord, BookImportResult
 )
 from .transaction import (
-    IssueCreate, IssueRead, IssueUpdate,
-    IssueRequestCreate, IssueRequestRead, IssueRequestUpdate
+    IssueCreate, IssueRead, IssueSummary, IssueUpdate, BookCheckout,
+    IssueRequestCreate, IssueRequestRead, IssueRequestSummary, IssueRequestUpdate
 )
+from .pagination import ListView, Page
+from .export import ExportTable, ExportFormat
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 from datetime import datetime
 from app.models.book import BookCopyStatus
 
@@ -41,12 +41,54 @@ class BookCreate(BookBase):
 
 class BookRead(BookBase):
     id: int
+    # Bulk-imported books may have no publisher
+    publisher_id: Optional[int] = None
+    total_copies: int = 0
+    available_copies: int = 0
+    issued_copies: int = 0
     publisher: Optional[PublisherRead] = None
     authors: List[AuthorRead] = []
     
     class Config:
         from_attributes = True
 
+class BookSummary(BaseModel):
+    id: int
+    isbn: str
+    title: str
+    publication_year: Optional[int] = None
+    publisher_id: Optional[int] = None
+    available_copies: int = 0
+
+    class Config:
+        from_attributes = True
+
+class BookSearchHit(BaseModel):
+    book: BookRead
+    score: float
+    highlights: Dict[str, str] = {}
+
+# --- Bulk Import ---
+class BookImportRecord(BaseModel):
+    isbn: str = Field(..., min_length=1)
+    title: str = Field(..., min_length=1)
+    publication_year: Optional[int] = None
+    publisher: Optional[str] = None
+    authors: List[str] = []
+    copies: int = Field(0, ge=0)
+    shelf_location: Optional[str] = None
+
+class BookImportError(BaseModel):
+    row: int
+    isbn: Optional[str] = None
+    error: str
+
+class BookImportResult(BaseModel):
+    received: int
+    inserted: int
+    copies_created: int
+    errors: List[BookImportError] = []
+
 # --- BookCopy ---
 class BookCopyBase(BaseModel):
     book_id: int
@@ -63,3 +105,13 @@ class BookCopyRead(BookCopyBase):
     
     class Config:
         from_attributes = True
+
+class BookCopySummary(BaseModel):
+    id: int
+    book_id: int
+    shelf_location: Optional[str] = None
+    status: BookCopyStatus
+    book_title: str
+
+    class Config:
+        from_attributes = True
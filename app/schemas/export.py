@@ -0,0 +1,11 @@
+import enum
+
+class ExportTable(str, enum.Enum):
+    BOOKS = "books"
+    COPIES = "copies"
+    ISSUES = "issues"
+    USERS = "users"
+
+class ExportFormat(str, enum.Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
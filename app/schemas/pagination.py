@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+import enum
+
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+class ListView(str, enum.Enum):
+    # Flat rows with the ids and labels a table needs
+    SUMMARY = "summary"
+    # Rows with their related objects embedded (the default)
+    FULL = "full"
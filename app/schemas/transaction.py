@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
+import enum
 from datetime import datetime
 from app.models.transaction import IssueStatus, RequestStatus
 from app.schemas.book import BookCopyRead, BookRead
@@ -15,17 +16,67 @@ class IssueRequestCreate(IssueRequestBase):
 class IssueRequestUpdate(BaseModel):
     status: RequestStatus
 
+class RequestBulkAction(str, enum.Enum):
+    APPROVE = "approve"
+    REJECT = "reject"
+    FULFILL = "fulfill"
+
+# Most requests one bulk call may change
+BULK_REQUEST_LIMIT = 1000
+
+class IssueRequestBulkUpdate(BaseModel):
+    request_ids: List[int] = Field(..., min_length=1, max_length=BULK_REQUEST_LIMIT)
+    action: RequestBulkAction
+    # Due date of the issues created by "fulfill"
+    return_date: Optional[datetime] = None
+
+class IssueRequestBulkItem(BaseModel):
+    request_id: int
+    ok: bool
+    status: Optional[RequestStatus] = None
+    issue_id: Optional[int] = None
+    copy_id: Optional[int] = None
+    detail: Optional[str] = None
+
+class IssueRequestBulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    items: List[IssueRequestBulkItem]
+
 class IssueRequestRead(IssueRequestBase):
     id: int
     user_id: int
     status: RequestStatus
     request_time: datetime
+    copy_id: Optional[int] = None
+    hold_expires_at: Optional[datetime] = None
     book: BookRead
     user: UserRead
 
     class Config:
         from_attributes = True
 
+class IssueRequestSummary(IssueRequestBase):
+    id: int
+    user_id: int
+    status: RequestStatus
+    request_time: datetime
+    copy_id: Optional[int] = None
+    hold_expires_at: Optional[datetime] = None
+    book_title: str
+    user_email: str
+
+    class Config:
+        from_attributes = True
+
+class RequestQueuePosition(BaseModel):
+    request_id: int
+    book_id: int
+    status: RequestStatus
+    # 1 = gets the next copy returned; None once the request left the queue
+    position: Optional[int] = None
+    hold_expires_at: Optional[datetime] = None
+
 # --- Issue ---
 class IssueBase(BaseModel):
     copy_id: int
@@ -35,6 +86,11 @@ class IssueBase(BaseModel):
 class IssueCreate(IssueBase):
     pass # status is default ISSUED
 
+class BookCheckout(BaseModel):
+    user_id: int
+    return_date: Optional[datetime] = None
+    preferred_shelf: Optional[str] = None
+
 class IssueUpdate(BaseModel):
     status: Optional[IssueStatus] = None
     actual_return_date: Optional[datetime] = None
@@ -51,3 +107,16 @@ class IssueRead(IssueBase):
 
     class Config:
         from_attributes = True
+
+class IssueSummary(IssueBase):
+    id: int
+    issue_date: datetime
+    actual_return_date: Optional[datetime] = None
+    status: IssueStatus
+    fine_amount: float
+    book_id: int
+    book_title: str
+    user_email: str
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,101 @@
+"""Multi-process server for the API.
+
+Runs the one-time startup work in this (supervisor) process, then starts
+--workers uvicorn worker processes:
+
+- Migrations are applied here, under the migration file lock, before any
+  worker exists; the workers still take the lock on import but find nothing
+  to do.
+- Workers do not open app.log. They send their log records to a collector
+  thread in this process, which writes the console and app.log on their
+  behalf, so rotation and batching work as with a single process.
+- DB_POOL_BUDGET (or --pool-budget), when set, is the number of database
+  connections the whole deployment may hold per pool. It is divided between
+  the workers (DB_POOL_SIZE and SQLITE_READ_POOL_SIZE, no overflow), so adding
+  workers does not multiply the connections opened against the database.
+- The response cache must be shared for its invalidation to reach every
+  worker. Without a Redis RESPONSE_CACHE_URL, a write handled by one worker
+  would leave the others serving their old entries, so with more than one
+  worker the cache is turned off instead.
+- On SIGINT/SIGTERM each worker stops accepting connections, finishes its
+  in-flight requests (up to --graceful-timeout seconds), stops its periodic
+  jobs and closes its pools.
+
+Usage:
+    python -m app.serve [--workers 4] [--host 0.0.0.0] [--port 8000] [--pool-budget 20]
+"""
+import argparse
+import logging
+import os
+import uvicorn
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger("app")
+
+
+def worker_pool_size(budget: int, workers: int) -> int:
+    return max(1, budget // workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", 1)))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--pool-budget", type=int, default=int(os.getenv("DB_POOL_BUDGET", 0)),
+                        help="Database connections per pool across all workers (0: each worker uses DB_POOL_SIZE)")
+    parser.add_argument("--graceful-timeout", type=float, default=30,
+                        help="Seconds a stopping worker waits for in-flight requests")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    if args.pool_budget:
+        size = str(worker_pool_size(args.pool_budget, args.workers))
+        os.environ.update(DB_POOL_SIZE=size, DB_MAX_OVERFLOW="0", SQLITE_READ_POOL_SIZE=size)
+
+    shared_cache = os.getenv("RESPONSE_CACHE_URL", "").startswith(("redis://", "rediss://"))
+    if args.workers > 1 and not shared_cache:
+        # Inherited by the worker processes: no per-worker entries or versions
+        os.environ.update(RESPONSE_CACHE_SIZE="0", RESPONSE_CACHE_URL="")
+
+    # Imported after the pool settings so this process's engine honours them too
+    from app.core.logging import LogCollector, setup_logging
+    from app.database import dispose_engines, engine
+    from app.migrations import run_migrations_once
+
+    setup_logging()
+    run_migrations_once(engine)
+    dispose_engines()
+
+    collector = None
+    if args.workers > 1:
+        collector = LogCollector()
+        collector.start()
+        # Inherited by the worker processes
+        os.environ["LOG_COLLECTOR"] = collector.address
+    if args.workers > 1 and not shared_cache:
+        logger.warning("Response cache disabled: %d workers need a shared RESPONSE_CACHE_URL (redis://)", args.workers)
+    logger.info(
+        "Serving on %s:%d with %d worker(s), pool size per worker %s",
+        args.host, args.port, args.workers, os.getenv("DB_POOL_SIZE", "default"),
+    )
+    try:
+        uvicorn.run(
+            "app.main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            timeout_graceful_shutdown=args.graceful_timeout,
+            log_level=args.log_level,
+        )
+    finally:
+        # The workers have exited, so nothing more will arrive
+        if collector is not None:
+            collector.stop()
+        logger.info("Server stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import jwt
 import os
+import time
+import uuid
 from dotenv import load_dotenv
+from app.core.hashing import hash_pool
+from app.core.tokens import make_codec
 
 load_dotenv()
 
@@ -11,14 +14,25 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY", "09d25e094faa6ca2556c818166b7a9563b93f7099f6f0f4caa6cf63b88e8d3e7")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 14))
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+token_codec = make_codec(SECRET_KEY, ALGORITHM)
+
+# bcrypt work always goes through the bounded hash pool; the *_async variants
+# are for callers running on the event loop.
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return hash_pool.run(pwd_context.verify, plain_password, hashed_password)
+
+async def verify_password_async(plain_password, hashed_password):
+    return await hash_pool.run_async(pwd_context.verify, plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return hash_pool.run(pwd_context.hash, password)
+
+async def get_password_hash_async(password):
+    return await hash_pool.run_async(pwd_context.hash, password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -26,6 +40,12 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    # jti names the token for revocation; a fractional iat orders it against
+    # "revoke everything this user was issued so far"
+    to_encode.update({"exp": expire, "iat": time.time(), "jti": uuid.uuid4().hex})
+    encoded_jwt = token_codec.encode(to_encode)
     return encoded_jwt
+
+def decode_access_token(token: str) -> dict:
+    """Verified claims of `token`; raises TokenError."""
+    return token_codec.decode(token)
@@ -1,9 +1,10 @@
-from app.database import SessionLocal, engine, Base
+from app.database import SessionLocal, engine
+from app.migrations import run_migrations
 from app.models.user import User, UserRole
 from app.utils import get_password_hash
 
 # Ensure tables exist
-Base.metadata.create_all(bind=engine)
+run_migrations(engine)
 
 def create_debug_user():
     db = SessionLocal()
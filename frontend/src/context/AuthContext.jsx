@@ -18,6 +18,7 @@ export const AuthProvider = ({ children }) => {
                 } catch (error) {
                     console.error("Auth check failed", error);
                     localStorage.removeItem('token');
+                    localStorage.removeItem('refreshToken');
                 }
             }
             setLoading(false);
@@ -35,8 +36,9 @@ export const AuthProvider = ({ children }) => {
                 headers: { 'Content-Type': 'application/x-www-form-urlencoded' }
             });
 
-            const { access_token } = response.data;
+            const { access_token, refresh_token } = response.data;
             localStorage.setItem('token', access_token);
+            localStorage.setItem('refreshToken', refresh_token);
 
             // Fetch user details immediately
             const userResponse = await api.get('/users/me');
@@ -60,8 +62,15 @@ export const AuthProvider = ({ children }) => {
         }
     };
 
-    const logout = () => {
+    const logout = async () => {
+        // Revoke the token server-side; it is dropped locally either way
+        try {
+            await api.post('/auth/logout', { refresh_token: localStorage.getItem('refreshToken') });
+        } catch (error) {
+            console.error("Logout request failed", error);
+        }
         localStorage.removeItem('token');
+        localStorage.removeItem('refreshToken');
         setUser(null);
         toast.success('Logged out');
     };
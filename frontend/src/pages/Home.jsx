@@ -19,7 +19,7 @@ const Home = () => {
             const fetchBooks = async () => {
                 try {
                     const response = await api.get('/books/');
-                    setBooks(response.data);
+                    setBooks(response.data.items);
                 } catch (error) {
                     console.error("Failed to fetch books", error);
                 } finally {
@@ -159,6 +159,9 @@ const Home = () => {
                                         {book.publication_year}
                                     </span>
                                     <p className="mt-1 truncate text-sm text-gray-500">ISBN: {book.isbn}</p>
+                                    <p className="mt-1 text-sm text-gray-500">
+                                        {book.available_copies} of {book.total_copies} copies available
+                                    </p>
                                     <div className="mt-2 text-sm text-gray-600 italic">
                                         By {book.authors && book.authors.map(a => a.name).join(", ")}
                                     </div>
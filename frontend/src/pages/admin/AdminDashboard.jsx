@@ -9,18 +9,20 @@ const AdminDashboard = () => {
     const [issues, setIssues] = useState([]);
     const [books, setBooks] = useState([]);
     const [loading, setLoading] = useState(true);
+    const [selected, setSelected] = useState([]);
 
     const fetchData = async () => {
         setLoading(true);
         try {
             const [reqRes, issueRes, bookRes] = await Promise.all([
-                api.get('/requests/'),
-                api.get('/issues/'),
-                api.get('/books/')
+                api.get('/requests/?view=summary'),
+                api.get('/issues/?view=summary'),
+                api.get('/books/?view=summary')
             ]);
-            setRequests(reqRes.data);
-            setIssues(issueRes.data);
-            setBooks(bookRes.data);
+            setRequests(reqRes.data.items);
+            setIssues(issueRes.data.items);
+            setBooks(bookRes.data.items);
+            setSelected([]);
         } catch (error) {
             console.error("Fetch error", error);
             toast.error("Failed to load admin data");
@@ -33,32 +35,41 @@ const AdminDashboard = () => {
         fetchData();
     }, []);
 
-    const handleApprove = async (request) => {
-        try {
-            const copiesRes = await api.get('/copies/');
-            const availableCopy = copiesRes.data.find(c => c.book_id === request.book_id && c.status === 'available');
-
-            if (!availableCopy) {
-                toast.error("No available copies for this book.");
-                return;
-            }
+    // Requests still open: waiting in a hold queue or ready for pickup
+    const pendingRequests = requests.filter(r => ['pending', 'approved', 'ready'].includes(r.status));
 
-            const issueData = {
-                copy_id: availableCopy.id,
-                user_id: request.user_id,
-                return_date: new Date(Date.now() + 7 * 24 * 60 * 60 * 1000).toISOString()
-            };
+    const toggleSelected = (requestId) => {
+        setSelected(prev => prev.includes(requestId) ? prev.filter(id => id !== requestId) : [...prev, requestId]);
+    };
 
-            await api.post('/issues/', issueData);
-            await api.put(`/requests/${request.id}`, { status: 'approved' });
+    const toggleAll = () => {
+        setSelected(selected.length === pendingRequests.length ? [] : pendingRequests.map(r => r.id));
+    };
 
-            toast.success("Request approved and book issued");
+    // One call for any number of requests; "fulfill" issues a copy to each (oldest request first)
+    const handleBulk = async (requestIds, action) => {
+        try {
+            const response = await api.put('/requests/bulk', {
+                request_ids: requestIds,
+                action,
+                return_date: new Date(Date.now() + 7 * 24 * 60 * 60 * 1000).toISOString()
+            });
+            const { succeeded, failed, items } = response.data;
+            if (succeeded) {
+                toast.success(action === 'fulfill' ? `${succeeded} request(s) fulfilled and issued` : `${succeeded} request(s) rejected`);
+            }
+            if (failed) {
+                const reason = items.find(item => !item.ok)?.detail;
+                toast.error(`${failed} request(s) not updated: ${reason}`);
+            }
             fetchData();
         } catch (error) {
-            toast.error("Failed to approve request: " + (error.response?.data?.detail || error.message));
+            toast.error("Failed to update requests: " + (error.response?.data?.detail || error.message));
         }
     };
 
+    const handleApprove = (request) => handleBulk([request.id], 'fulfill');
+
     const handleReturn = async (issueId) => {
         try {
             await api.post(`/issues/${issueId}/return`);
@@ -117,10 +128,36 @@ const AdminDashboard = () => {
                 <div className="mt-4">
                     {/* REQUESTS TABLE */}
                     {activeTab === 'requests' && (
+                        <div className="space-y-4">
+                        {selected.length > 0 && (
+                            <div className="flex items-center justify-end gap-x-3">
+                                <span className="text-sm text-gray-500">{selected.length} selected</span>
+                                <button
+                                    onClick={() => handleBulk(selected, 'fulfill')}
+                                    className="inline-flex items-center rounded-md bg-green-600 px-3 py-2 text-sm font-semibold text-white shadow-sm hover:bg-green-500"
+                                >
+                                    Fulfill selected <CheckCircle className="ml-1 h-4 w-4" />
+                                </button>
+                                <button
+                                    onClick={() => handleBulk(selected, 'reject')}
+                                    className="inline-flex items-center rounded-md bg-white px-3 py-2 text-sm font-semibold text-red-600 shadow-sm ring-1 ring-inset ring-gray-300 hover:bg-gray-50"
+                                >
+                                    Reject selected <XCircle className="ml-1 h-4 w-4" />
+                                </button>
+                            </div>
+                        )}
                         <div className="overflow-hidden shadow ring-1 ring-black ring-opacity-5 sm:rounded-lg">
                             <table className="min-w-full divide-y divide-gray-300">
                                 <thead className="bg-gray-50">
                                     <tr>
+                                        <th scope="col" className="py-3.5 pl-4 sm:pl-6">
+                                            <input
+                                                type="checkbox"
+                                                className="h-4 w-4 rounded border-gray-300 text-indigo-600"
+                                                checked={pendingRequests.length > 0 && selected.length === pendingRequests.length}
+                                                onChange={toggleAll}
+                                            />
+                                        </th>
                                         <th scope="col" className="py-3.5 pl-4 pr-3 text-left text-sm font-semibold text-gray-900 sm:pl-6">Request ID</th>
                                         <th scope="col" className="px-3 py-3.5 text-left text-sm font-semibold text-gray-900">User ID</th>
                                         <th scope="col" className="px-3 py-3.5 text-left text-sm font-semibold text-gray-900">Book ID</th>
@@ -131,17 +168,25 @@ const AdminDashboard = () => {
                                     </tr>
                                 </thead>
                                 <tbody className="divide-y divide-gray-200 bg-white">
-                                    {requests.filter(r => r.status === 'pending').length === 0 && (
-                                        <tr><td colSpan="5" className="p-8 text-center text-gray-500">No pending requests found.</td></tr>
+                                    {pendingRequests.length === 0 && (
+                                        <tr><td colSpan="6" className="p-8 text-center text-gray-500">No pending requests found.</td></tr>
                                     )}
-                                    {requests.filter(r => r.status === 'pending').map((req) => (
+                                    {pendingRequests.map((req) => (
                                         <tr key={req.id}>
+                                            <td className="py-4 pl-4 sm:pl-6">
+                                                <input
+                                                    type="checkbox"
+                                                    className="h-4 w-4 rounded border-gray-300 text-indigo-600"
+                                                    checked={selected.includes(req.id)}
+                                                    onChange={() => toggleSelected(req.id)}
+                                                />
+                                            </td>
                                             <td className="whitespace-nowrap py-4 pl-4 pr-3 text-sm font-medium text-gray-900 sm:pl-6">{req.id}</td>
                                             <td className="whitespace-nowrap px-3 py-4 text-sm text-gray-500">{req.user_id}</td>
                                             <td className="whitespace-nowrap px-3 py-4 text-sm text-gray-500">{req.book_id}</td>
                                             <td className="whitespace-nowrap px-3 py-4 text-sm text-gray-500">
-                                                <span className="inline-flex rounded-full bg-yellow-100 px-2 text-xs font-semibold leading-5 text-yellow-800">
-                                                    Pending
+                                                <span className={`inline-flex rounded-full px-2 text-xs font-semibold leading-5 capitalize ${req.status === 'ready' ? 'bg-green-100 text-green-800' : 'bg-yellow-100 text-yellow-800'}`}>
+                                                    {req.status === 'ready' ? 'Ready for pickup' : req.status}
                                                 </span>
                                             </td>
                                             <td className="relative whitespace-nowrap py-4 pl-3 pr-4 text-right text-sm font-medium sm:pr-6">
@@ -157,6 +202,7 @@ const AdminDashboard = () => {
                                 </tbody>
                             </table>
                         </div>
+                        </div>
                     )}
 
                     {/* ISSUES TABLE */}
@@ -5,17 +5,23 @@ import { Clock, BookOpen, Calendar, AlertCircle } from 'lucide-react';
 const UserDashboard = () => {
     const [issues, setIssues] = useState([]);
     const [requests, setRequests] = useState([]);
+    const [positions, setPositions] = useState({});
     const [loading, setLoading] = useState(true);
 
     useEffect(() => {
         const fetchData = async () => {
             try {
                 const [issuesRes, requestsRes] = await Promise.all([
-                    api.get('/issues/'),
-                    api.get('/requests/')
+                    api.get('/issues/?view=summary'),
+                    api.get('/requests/?view=summary')
                 ]);
-                setIssues(issuesRes.data);
-                setRequests(requestsRes.data);
+                setIssues(issuesRes.data.items);
+                setRequests(requestsRes.data.items);
+
+                // Place in the hold queue of every request still waiting for a copy
+                const waiting = requestsRes.data.items.filter(r => r.status === 'pending' || r.status === 'approved');
+                const positionRes = await Promise.all(waiting.map(r => api.get(`/requests/${r.id}/position`)));
+                setPositions(Object.fromEntries(positionRes.map(res => [res.data.request_id, res.data.position])));
             } catch (error) {
                 console.error("Failed to fetch dashboard data", error);
             } finally {
@@ -90,7 +96,7 @@ const UserDashboard = () => {
                                             <div className="ml-2 flex-shrink-0 flex">
                                                 <p className={`px-2 inline-flex text-xs leading-5 font-semibold rounded-full 
                             ${req.status === 'pending' ? 'bg-yellow-100 text-yellow-800' :
-                                                        req.status === 'approved' ? 'bg-green-100 text-green-800' : 'bg-red-100 text-red-800'}`}>
+                                                        req.status === 'approved' || req.status === 'ready' ? 'bg-green-100 text-green-800' : 'bg-red-100 text-red-800'}`}>
                                                     {req.status}
                                                 </p>
                                             </div>
@@ -98,8 +104,18 @@ const UserDashboard = () => {
                                         <div className="mt-2 sm:flex sm:justify-between">
                                             <div className="sm:flex">
                                                 <p className="flex items-center text-sm text-gray-500">
-                                                    Requested on: {req.created_at ? new Date(req.created_at).toLocaleDateString() : 'N/A'}
+                                                    Requested on: {req.request_time ? new Date(req.request_time).toLocaleDateString() : 'N/A'}
                                                 </p>
+                                                {positions[req.id] && (
+                                                    <p className="mt-2 flex items-center text-sm text-gray-500 sm:mt-0 sm:ml-6">
+                                                        Position in queue: {positions[req.id]}
+                                                    </p>
+                                                )}
+                                                {req.status === 'ready' && (
+                                                    <p className="mt-2 flex items-center text-sm font-medium text-green-700 sm:mt-0 sm:ml-6">
+                                                        Ready for pickup until {new Date(req.hold_expires_at).toLocaleDateString()}
+                                                    </p>
+                                                )}
                                             </div>
                                         </div>
                                     </div>
@@ -21,4 +21,52 @@ api.interceptors.request.use(
     }
 );
 
+// One refresh at a time: requests failing together wait for the same one,
+// since a refresh token can only be spent once
+let refreshing = null;
+
+const refreshTokens = async () => {
+    const refreshToken = localStorage.getItem('refreshToken');
+    if (!refreshToken) {
+        throw new Error('No refresh token');
+    }
+    let response;
+    try {
+        response = await axios.post(`${api.defaults.baseURL}/auth/refresh`, { refresh_token: refreshToken });
+    } catch (error) {
+        // Another tab may have spent it first; its successor is already stored
+        const latest = localStorage.getItem('refreshToken');
+        if (latest && latest !== refreshToken) {
+            return;
+        }
+        throw error;
+    }
+    localStorage.setItem('token', response.data.access_token);
+    localStorage.setItem('refreshToken', response.data.refresh_token);
+};
+
+// On 401, refresh the access token and retry the request once
+api.interceptors.response.use(
+    (response) => response,
+    async (error) => {
+        const original = error.config;
+        const isAuthCall = original && original.url && original.url.startsWith('/auth/');
+        if (error.response && error.response.status === 401 && original && !original._retried && !isAuthCall) {
+            original._retried = true;
+            try {
+                refreshing = refreshing || refreshTokens();
+                await refreshing;
+            } catch (refreshError) {
+                localStorage.removeItem('token');
+                localStorage.removeItem('refreshToken');
+                return Promise.reject(error);
+            } finally {
+                refreshing = null;
+            }
+            return api(original);
+        }
+        return Promise.reject(error);
+    }
+);
+
 export default api;
@@ -0,0 +1,115 @@
+"""Benchmark: per-request cost of authenticating a bearer token.
+
+Three measurements:
+
+1. Token verification alone: `jose.jwt.decode` (what every request used to
+   run) against the HS256 fast path in app.core.tokens, in microseconds per
+   token.
+2. The revocation check with --revoked tokens and users revoked: a token
+   nobody revoked (the bloom filter answers) and a revoked one (exact lookup).
+3. End to end through the ASGI app: `GET /auth/hash-pool`, an admin-only
+   route that does no work of its own, with an old-style token (email only,
+   so the principal comes from the cache or a `users` query) and a current
+   token (principal in the claims). Reports requests/sec and SQL statements
+   per request; the no-auth `GET /` is the baseline.
+
+Usage:
+    python scripts/bench_auth.py [--iterations 100000] [--requests 3000] [--revoked 50000]
+"""
+import sys
+import os
+import argparse
+import tempfile
+import time
+import uuid
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench_auth.db')}"
+os.environ.setdefault("ACCESS_LOG_SAMPLE_RATE", "0")
+os.environ.setdefault("OVERDUE_SWEEP_SECONDS", "0")
+os.environ.setdefault("HOLD_EXPIRY_SECONDS", "0")
+
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import event
+from app.database import engine, read_engine
+from app.main import app
+from app.core.principals import principal_cache
+from app.core.revocation import RevocationSet
+from app.utils import ALGORITHM, SECRET_KEY, decode_access_token
+
+
+def per_call_us(fn, arg, iterations: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        fn(arg)
+    return (time.perf_counter() - t0) / iterations * 1e6
+
+
+def run_requests(client, path, headers, requests):
+    t0 = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(path, headers=headers)
+        assert response.status_code == 200, response.status_code
+    return requests / (time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--revoked", type=int, default=50000)
+    args = parser.parse_args()
+
+    statements = [0]
+    for bind in {engine, read_engine}:
+        event.listen(bind, "before_cursor_execute", lambda *a: statements.__setitem__(0, statements[0] + 1))
+
+    with TestClient(app) as client:
+        credentials = {"username": "bench@example.com", "password": "benchpassword"}
+        client.post("/users/", json={"email": credentials["username"], "password": credentials["password"],
+                                     "role": "admin"})
+        token = client.post("/auth/token", data=credentials).json()["access_token"]
+        claims = decode_access_token(token)
+        legacy_token = jwt.encode({"sub": credentials["username"], "exp": claims["exp"]}, SECRET_KEY,
+                                  algorithm=ALGORITHM)
+
+        print(f"{'verify':<28} {'us/token':>9}")
+        for name, fn in (
+            ("jose.jwt.decode", lambda t: jwt.decode(t, SECRET_KEY, algorithms=[ALGORITHM])),
+            ("fast path", decode_access_token),
+        ):
+            print(f"{name:<28} {per_call_us(fn, token, args.iterations):>9.2f}")
+
+        revocations = RevocationSet()
+        expires_at = datetime.utcnow() + timedelta(minutes=30)
+        for n in range(args.revoked):
+            revocations.add_token(uuid.uuid4().hex, expires_at)
+            revocations.add_user(1_000_000 + n, datetime.utcnow(), expires_at)
+        revoked_jti = uuid.uuid4().hex
+        revocations.add_token(revoked_jti, expires_at)
+        print(f"\n{f'revocation check ({args.revoked:,} revoked)':<40} {'us/check':>9}")
+        for name, checked in (("not revoked", claims), ("revoked", {**claims, "jti": revoked_jti})):
+            print(f"{name:<40} {per_call_us(revocations.is_revoked, checked, args.iterations):>9.2f}")
+
+        print(f"\n{'request':<28} {'req/s':>9} {'stmts/req':>10}")
+        cases = (
+            ("GET / (no auth)", "/", {}, None),
+            ("email-only token, cached", "/auth/hash-pool", {"Authorization": f"Bearer {legacy_token}"}, False),
+            ("email-only token, no cache", "/auth/hash-pool", {"Authorization": f"Bearer {legacy_token}"}, True),
+            ("token with claims", "/auth/hash-pool", {"Authorization": f"Bearer {token}"}, False),
+        )
+        for name, path, headers, no_cache in cases:
+            # A zero-sized cache keeps nothing, so every request queries users
+            principal_cache.maxsize = 0 if no_cache else 10000
+            principal_cache.clear()
+            client.get(path, headers=headers)
+            statements[0] = 0
+            rate = run_requests(client, path, headers, args.requests)
+            print(f"{name:<28} {rate:>9.0f} {statements[0] / args.requests:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Benchmark: fulfilling requests one at a time vs PUT /requests/bulk.
+
+Seeds a throwaway SQLite database with N pending requests spread over a set of
+books, each with enough available copies, then fulfills them twice on fresh
+data: once the way the admin dashboard used to (a checkout plus a request
+status update per request) and once through `bulk_update_requests` in batches.
+Reports requests/sec and statements issued per request.
+
+Usage:
+    python scripts/bench_bulk_requests.py [--requests 5000] [--books 100] [--batch 500]
+"""
+import sys
+import os
+import argparse
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench_bulk_requests.db')}"
+
+from datetime import datetime, timedelta
+from sqlalchemy import delete, event, func, insert, select, update
+from app.database import SessionLocal, engine, read_engine
+from app.migrations import run_migrations
+from app.models import *  # noqa: F401,F403 - register all models
+from app.models.transaction import RequestStatus
+from app.schemas.transaction import BookCheckout, IssueRequestBulkUpdate, IssueRequestUpdate, RequestBulkAction
+from app.controllers.transaction import bulk_update_requests, checkout_book, update_request_status
+
+BATCH = 50_000
+
+
+def seed(requests: int, books: int):
+    run_migrations(engine)
+    now = datetime.utcnow()
+    copies_per_book = -(-requests // books)
+    with engine.begin() as conn:
+        conn.execute(insert(Publisher), [{"id": 1, "name": "Bench Publisher"}])
+        conn.execute(insert(User), [
+            {"id": i, "email": f"member{i}@example.com", "hashed_password": "x", "role": "member", "is_active": True}
+            for i in range(1, 1001)
+        ])
+        conn.execute(insert(Book), [
+            {"id": i, "isbn": f"isbn-{i}", "title": f"Book {i}", "publisher_id": 1,
+             "total_copies": copies_per_book, "available_copies": copies_per_book}
+            for i in range(1, books + 1)
+        ])
+        conn.execute(insert(BookCopy), [
+            {"book_id": (i % books) + 1, "status": "available", "created_at": now}
+            for i in range(copies_per_book * books)
+        ])
+        for start in range(0, requests, BATCH):
+            conn.execute(insert(IssueRequest), [
+                {"user_id": (i % 1000) + 1, "book_id": (i % books) + 1, "status": "pending",
+                 "request_time": now + timedelta(microseconds=i)}
+                for i in range(start, min(start + BATCH, requests))
+            ])
+
+
+def reset():
+    """Put every copy back on the shelf and every request back in the queue."""
+    with engine.begin() as conn:
+        conn.execute(delete(Issue))
+        conn.execute(update(BookCopy).values(status="available"))
+        conn.execute(update(IssueRequest).values(status="pending"))
+        conn.execute(update(Book).values(available_copies=Book.total_copies, issued_copies=0))
+
+
+def pending_requests():
+    with engine.connect() as conn:
+        return conn.execute(
+            select(IssueRequest.id, IssueRequest.user_id, IssueRequest.book_id).order_by(IssueRequest.id)
+        ).all()
+
+
+def one_by_one(rows, batch):
+    db = SessionLocal()
+    try:
+        for request_id, user_id, book_id in rows:
+            checkout_book(db, book_id, BookCheckout(user_id=user_id))
+            update_request_status(db, request_id, IssueRequestUpdate(status=RequestStatus.FULFILLED))
+            db.expunge_all()
+    finally:
+        db.close()
+
+
+def in_bulk(rows, batch):
+    db = SessionLocal()
+    try:
+        for start in range(0, len(rows), batch):
+            ids = [row[0] for row in rows[start:start + batch]]
+            result = bulk_update_requests(db, IssueRequestBulkUpdate(request_ids=ids, action=RequestBulkAction.FULFILL))
+            assert result["failed"] == 0, result
+            db.expunge_all()
+    finally:
+        db.close()
+
+
+def check_counters():
+    with engine.connect() as conn:
+        issued = conn.scalar(select(func.count()).select_from(BookCopy).where(BookCopy.status == "issued"))
+        counted = conn.scalar(select(func.sum(Book.issued_copies)))
+        fulfilled = conn.scalar(
+            select(func.count()).select_from(IssueRequest).where(IssueRequest.status == "fulfilled")
+        )
+    return issued, counted, fulfilled
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--books", type=int, default=100)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"Seeding {args.requests:,} requests over {args.books} books ...")
+    seed(args.requests, args.books)
+    rows = pending_requests()
+
+    statements = [0]
+    for bind in {engine, read_engine}:
+        event.listen(bind, "before_cursor_execute", lambda *a: statements.__setitem__(0, statements[0] + 1))
+
+    print(f"\n{'path':<12} {'requests':>9} {'seconds':>9} {'req/s':>9} {'stmts/req':>10}  issued/counted/fulfilled")
+    for name, run in (("one-by-one", one_by_one), ("bulk", in_bulk)):
+        reset()
+        statements[0] = 0
+        t0 = time.perf_counter()
+        run(rows, args.batch)
+        elapsed = time.perf_counter() - t0
+        print(
+            f"{name:<12} {len(rows):>9,} {elapsed:>9.2f} {len(rows) / elapsed:>9.0f} "
+            f"{statements[0] / len(rows):>10.2f}  {'/'.join(str(n) for n in check_counters())}"
+        )
+
+
+if __name__ == "__main__":
+    main()
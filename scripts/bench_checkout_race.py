@@ -0,0 +1,160 @@
+"""Concurrency stress test: many clerks fighting over few copies.
+
+Seeds a throwaway SQLite database with a handful of copies, then runs N
+threads that repeatedly issue a random copy through `create_issue` and return
+it through `return_book`, each thread on its own session. Every successful
+checkout is checked against an in-memory ledger, and the database is checked
+at the end for copies with more than one open issue and for book copy
+counters that disagree with the copies. Prints throughput, the number of
+double issues and the counter drift, which must all be zero.
+
+`--legacy` runs the old read-check-write checkout for comparison.
+
+Usage:
+    python scripts/bench_checkout_race.py [--threads 16] [--copies 4] [--seconds 10] [--legacy]
+"""
+import sys
+import os
+import argparse
+import logging
+import random
+import tempfile
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench_checkout.db')}"
+
+from fastapi import HTTPException
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
+from app.database import SessionLocal, engine, Base
+from app.models import *  # noqa: F401,F403 - register all models
+from app.models.book import BookCopyStatus
+from app.models.transaction import IssueStatus
+from app.schemas.transaction import IssueCreate
+from app.controllers.transaction import create_issue, return_book
+from app.controllers.book import reconcile_copy_counters
+
+
+def legacy_create_issue(db, issue: IssueCreate):
+    # The pre-conditional-UPDATE checkout: check in Python, then write
+    copy = db.query(BookCopy).filter(BookCopy.id == issue.copy_id).first()
+    if copy.status != BookCopyStatus.AVAILABLE:
+        raise HTTPException(status_code=400, detail="Book copy is not available")
+    db_issue = Issue(user_id=issue.user_id, copy_id=issue.copy_id, status=IssueStatus.ISSUED)
+    copy.status = BookCopyStatus.ISSUED
+    db.add(db_issue)
+    db.commit()
+    db.refresh(db_issue)
+    return db_issue
+
+
+class Ledger:
+    """Which thread holds which copy, according to successful checkouts."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.holders = {}
+        self.double_issues = 0
+
+    def hold(self, copy_id, who):
+        with self.lock:
+            if copy_id in self.holders:
+                self.double_issues += 1
+            self.holders[copy_id] = who
+
+    def release(self, copy_id, who):
+        with self.lock:
+            if self.holders.get(copy_id) == who:
+                del self.holders[copy_id]
+
+
+def seed(copies: int, users: int):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(Publisher(id=1, name="Bench Publisher"))
+    db.add(Book(id=1, isbn="bench-1", title="Contended Book", publisher_id=1,
+                total_copies=copies, available_copies=copies))
+    db.add_all([User(id=i, email=f"clerk{i}@example.com", hashed_password="x") for i in range(1, users + 1)])
+    db.add_all([BookCopy(id=i, book_id=1) for i in range(1, copies + 1)])
+    db.commit()
+    db.close()
+
+
+def clerk(n, args, ledger, stats, deadline):
+    rng = random.Random(n)
+    checkout = legacy_create_issue if args.legacy else create_issue
+    while time.monotonic() < deadline:
+        copy_id = rng.randint(1, args.copies)
+        db = SessionLocal()
+        try:
+            issue = checkout(db, IssueCreate(copy_id=copy_id, user_id=n + 1))
+            issue_id = issue.id
+            ledger.hold(copy_id, n)
+            stats["issued"][n] += 1
+            time.sleep(args.hold)
+            ledger.release(copy_id, n)
+            return_book(db, issue_id)
+            stats["returned"][n] += 1
+        except HTTPException:
+            db.rollback()
+            stats["conflicts"][n] += 1
+        except OperationalError:
+            # "database is locked" under SQLite write contention
+            db.rollback()
+            stats["locked"][n] += 1
+        finally:
+            db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--copies", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--hold", type=float, default=0.001, help="seconds a copy stays issued")
+    parser.add_argument("--legacy", action="store_true", help="use the old read-check-write checkout")
+    args = parser.parse_args()
+
+    # Lost races are logged as warnings by the controller; keep the report readable
+    logging.getLogger("app").setLevel(logging.ERROR)
+    seed(args.copies, args.threads)
+    ledger = Ledger()
+    stats = {key: [0] * args.threads for key in ("issued", "returned", "conflicts", "locked")}
+    deadline = time.monotonic() + args.seconds
+    threads = [threading.Thread(target=clerk, args=(n, args, ledger, stats, deadline)) for n in range(args.threads)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    db = SessionLocal()
+    open_per_copy = (
+        db.query(Issue.copy_id, func.count())
+        .filter(Issue.status == IssueStatus.ISSUED.value)
+        .group_by(Issue.copy_id)
+        .having(func.count() > 1)
+        .all()
+    )
+    drifted = reconcile_copy_counters(db, dry_run=True)
+    db.close()
+
+    totals = {key: sum(values) for key, values in stats.items()}
+    attempts = totals["issued"] + totals["conflicts"] + totals["locked"]
+    print(f"mode: {'legacy read-check-write' if args.legacy else 'conditional UPDATE'}")
+    print(f"{args.threads} threads, {args.copies} copies, {elapsed:.1f}s")
+    print(f"checkouts: {totals['issued']} ({totals['issued'] / elapsed:.1f}/s), returns: {totals['returned']}")
+    print(f"attempts: {attempts} ({attempts / elapsed:.1f}/s), conflicts: {totals['conflicts']}, lock errors: {totals['locked']}")
+    print(f"double issues seen by clerks: {ledger.double_issues}")
+    print(f"copies with >1 open issue in the database: {len(open_per_copy)}")
+    print(f"books with drifted copy counters: {len(drifted)}")
+    if ledger.double_issues or open_per_copy or drifted:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
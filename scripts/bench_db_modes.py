@@ -0,0 +1,130 @@
+"""Load test: DB_MODE=sync vs DB_MODE=async side by side.
+
+For each mode, starts the API with uvicorn on its own throwaway SQLite
+database, seeds a small catalog through the API, then runs a fixed number of
+concurrent clients against the catalog read endpoints (`GET /books/` and
+`GET /books/{id}`) for a fixed time. Prints requests/sec and latency
+percentiles per mode. Use a concurrency above the threadpool size (40) to see
+the sync mode queue.
+
+Usage:
+    python scripts/bench_db_modes.py [--concurrency 100] [--seconds 10] [--books 200] [--port 8124]
+"""
+import sys
+import os
+import argparse
+import random
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ("sync", "async")
+
+
+def start_server(port: int, mode: str):
+    tmpdir = tempfile.mkdtemp()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(tmpdir, f'bench_{mode}.db')}",
+        DB_MODE=mode,
+        PYTHONPATH=ROOT,
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=tmpdir, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(50):
+        try:
+            requests.get(base_url)
+            return proc, base_url
+        except requests.exceptions.ConnectionError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("Server failed to start")
+
+
+def seed(base_url: str, books: int):
+    credentials = {"username": "bench@example.com", "password": "benchpassword"}
+    requests.post(f"{base_url}/users/", json={
+        "email": credentials["username"], "password": credentials["password"], "role": "admin"
+    })
+    token = requests.post(f"{base_url}/auth/token", data=credentials).json()["access_token"]
+    session = requests.Session()
+    session.headers["Authorization"] = f"Bearer {token}"
+    publisher_id = session.post(f"{base_url}/publishers/", json={"name": "Bench Publisher"}).json()["id"]
+    author_id = session.post(f"{base_url}/authors/", json={"name": "Bench Author"}).json()["id"]
+    session.post(f"{base_url}/books/bulk", json=[
+        {"isbn": f"bench-{i}", "title": f"Bench Book {i}", "publisher": "Bench Publisher",
+         "authors": ["Bench Author"], "copies": 2}
+        for i in range(books)
+    ])
+    book_ids = [book["id"] for book in session.get(f"{base_url}/books/", params={"limit": books}).json()["items"]]
+    return token, book_ids
+
+
+def client(base_url: str, token: str, book_ids: list, deadline: float, samples: list, errors: list, seed_value: int):
+    rng = random.Random(seed_value)
+    session = requests.Session()
+    session.headers["Authorization"] = f"Bearer {token}"
+    while time.monotonic() < deadline:
+        if rng.random() < 0.5:
+            url = f"{base_url}/books/"
+            params = {"limit": 20}
+        else:
+            url = f"{base_url}/books/{rng.choice(book_ids)}"
+            params = None
+        t0 = time.perf_counter()
+        response = session.get(url, params=params)
+        samples.append((time.perf_counter() - t0) * 1000)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+
+
+def run(mode: str, args):
+    proc, base_url = start_server(args.port, mode)
+    try:
+        token, book_ids = seed(base_url, args.books)
+        samples, errors = [], []
+        deadline = time.monotonic() + args.seconds
+        clients = [
+            threading.Thread(target=client, args=(base_url, token, book_ids, deadline, samples, errors, n))
+            for n in range(args.concurrency)
+        ]
+        t0 = time.perf_counter()
+        for c in clients:
+            c.start()
+        for c in clients:
+            c.join()
+        elapsed = time.perf_counter() - t0
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    samples.sort()
+    p99 = samples[max(0, int(len(samples) * 0.99) - 1)]
+    print(f"{mode:<6} {len(samples):>8} {len(samples) / elapsed:>9.1f} {statistics.median(samples):>9.1f} "
+          f"{p99:>9.1f} {samples[-1]:>9.1f} {len(errors):>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--books", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8124)
+    args = parser.parse_args()
+
+    print(f"{args.concurrency} clients, {args.seconds:.0f}s per mode\n")
+    print(f"{'mode':<6} {'requests':>8} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+    for mode in MODES:
+        run(mode, args)
+
+
+if __name__ == "__main__":
+    main()
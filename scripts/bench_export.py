@@ -0,0 +1,119 @@
+"""Benchmark: pulling the loans table page by page vs streaming /export/issues.
+
+Seeds a throwaway SQLite database with N loans, then reads all of them three
+ways: the old reporting loop (GET /issues/?skip=...&limit=... until empty,
+each page a materialized list serialized through Page[IssueRead]), the NDJSON
+export and the CSV export (the generators /export/issues streams). Reports
+wall time, bytes produced and peak Python memory (tracemalloc) for each, and
+runs the NDJSON export over a tenth of the table too: its peak memory should
+not grow with the row count.
+
+Usage:
+    python scripts/bench_export.py [--loans 100000] [--page-size 1000]
+"""
+import sys
+import os
+import argparse
+import tempfile
+import time
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench_export.db')}"
+
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.database import SessionLocal, engine
+from app.migrations import run_migrations
+from app.models import *  # noqa: F401,F403 - register all models
+from app.core.principals import Principal
+from app.core.serialization import dump_json
+from app.schemas.export import ExportFormat, ExportTable
+from app.schemas.pagination import Page
+from app.schemas.transaction import IssueRead
+from app.controllers.export import export_statement, iter_export
+from app.controllers.transaction import get_issues
+
+BATCH = 50_000
+MEMBERS = 1000
+COPIES = 10_000
+
+
+def seed(loans: int):
+    run_migrations(engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Publisher), [{"id": 1, "name": "Bench Publisher"}])
+        conn.execute(insert(User), [
+            {"id": i, "email": f"member{i}@example.com", "hashed_password": "x",
+             "role": "admin" if i == 1 else "member", "is_active": True, "created_at": now}
+            for i in range(1, MEMBERS + 1)
+        ])
+        conn.execute(insert(Book), [
+            {"id": i, "isbn": f"isbn-{i}", "title": f"Book {i}", "publisher_id": 1} for i in range(1, COPIES + 1)
+        ])
+        conn.execute(insert(BookCopy), [
+            {"id": i, "book_id": i, "status": "available", "created_at": now} for i in range(1, COPIES + 1)
+        ])
+        for start in range(0, loans, BATCH):
+            conn.execute(insert(Issue), [
+                {"user_id": i % MEMBERS + 1, "copy_id": i % COPIES + 1,
+                 "issue_date": now - timedelta(days=400) + timedelta(seconds=i),
+                 "return_date": now - timedelta(days=386) + timedelta(seconds=i),
+                 "actual_return_date": now - timedelta(days=390) + timedelta(seconds=i),
+                 "status": "returned", "fine_amount": 0.0}
+                for i in range(start, min(start + BATCH, loans))
+            ])
+    return now - timedelta(days=400)
+
+
+def paged(admin, page_size: int) -> int:
+    produced, skip = 0, 0
+    while True:
+        db = SessionLocal()
+        try:
+            page = get_issues(db, admin, skip=skip, limit=page_size)
+            produced += len(dump_json(Page[IssueRead], page))
+        finally:
+            db.close()
+        if not page["items"]:
+            return produced
+        skip += page_size
+
+
+def exported(fmt: ExportFormat, since: datetime = None) -> int:
+    return sum(len(chunk) for chunk in iter_export(export_statement(ExportTable.ISSUES, since=since), fmt))
+
+
+def measure(label: str, fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    produced = fn()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<30} {elapsed:>9.2f} {produced / 1e6:>10.1f} {peak / 1e6:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--loans", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"Seeding {args.loans:,} loans ...")
+    first_issue = seed(args.loans)
+    admin = Principal(id=1, email="member1@example.com", role="admin", is_active=True, created_at=datetime.utcnow())
+    # Loans are issued one second apart; this keeps the last tenth
+    last_tenth = first_issue + timedelta(seconds=args.loans - args.loans // 10)
+
+    print(f"\n{'path':<30} {'seconds':>9} {'MB out':>10} {'peak MB':>10}")
+    measure(f"paged skip/limit={args.page_size}", lambda: paged(admin, args.page_size))
+    measure("export ndjson", lambda: exported(ExportFormat.NDJSON))
+    measure("export csv", lambda: exported(ExportFormat.CSV))
+    measure("export ndjson (1/10 of rows)", lambda: exported(ExportFormat.NDJSON, since=last_tenth))
+
+
+if __name__ == "__main__":
+    main()
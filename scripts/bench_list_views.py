@@ -0,0 +1,140 @@
+"""Benchmark: payload size and cost of view=full vs view=summary list pages.
+
+Seeds a throwaway SQLite database with a catalog, loans and requests, then
+fetches pages of /books/, /copies/, /issues/ and /requests/ through their
+controllers in both views, the way the routers do: the controller call
+(query), then validation and JSON serialization through the page schema.
+Prints payload bytes per page and median query and serialization time.
+
+Usage:
+    python scripts/bench_list_views.py [--rows 5000] [--page-size 100] [--pages 50]
+"""
+import sys
+import os
+import argparse
+import statistics
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench_list_views.db')}"
+
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.database import SessionLocal, engine
+from app.migrations import run_migrations
+from app.models import *  # noqa: F401,F403 - register all models
+from app.core.principals import Principal
+from app.core.serialization import dump_json
+from app.schemas.book import BookRead, BookSummary, BookCopyRead, BookCopySummary
+from app.schemas.transaction import IssueRead, IssueSummary, IssueRequestRead, IssueRequestSummary
+from app.schemas.pagination import ListView, Page
+from app.controllers.book import get_all_copies, get_books
+from app.controllers.transaction import get_issues, get_requests
+
+MEMBERS = 1000
+AUTHORS = 500
+
+
+def seed(rows: int):
+    run_migrations(engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Publisher), [{"id": i, "name": f"Publisher {i}"} for i in range(1, 51)])
+        conn.execute(insert(Author), [{"id": i, "name": f"Author {i}"} for i in range(1, AUTHORS + 1)])
+        conn.execute(insert(User), [
+            {"id": i, "email": f"member{i}@example.com", "hashed_password": "x",
+             "role": "admin" if i == 1 else "member", "is_active": True, "created_at": now}
+            for i in range(1, MEMBERS + 1)
+        ])
+        conn.execute(insert(Book), [
+            {"id": i, "isbn": f"isbn-{i}", "title": f"Book {i}", "publication_year": 1950 + i % 70,
+             "publisher_id": i % 50 + 1, "total_copies": 1, "issued_copies": 1}
+            for i in range(1, rows + 1)
+        ])
+        conn.execute(insert(book_authors), [
+            {"book_id": i, "author_id": a} for i in range(1, rows + 1) for a in {i % AUTHORS + 1, (i * 7) % AUTHORS + 1}
+        ])
+        conn.execute(insert(BookCopy), [
+            {"id": i, "book_id": i, "status": "issued", "shelf_location": f"S{i % 40}", "created_at": now}
+            for i in range(1, rows + 1)
+        ])
+        conn.execute(insert(Issue), [
+            {"user_id": i % MEMBERS + 1, "copy_id": i, "issue_date": now - timedelta(days=3),
+             "return_date": now + timedelta(days=11), "status": "issued", "fine_amount": 0.0}
+            for i in range(1, rows + 1)
+        ])
+        conn.execute(insert(IssueRequest), [
+            {"user_id": (i + 1) % MEMBERS + 1, "book_id": i, "status": "pending", "request_time": now}
+            for i in range(1, rows + 1)
+        ])
+
+
+def measure(call, schema, pages: int):
+    """Walk `pages` pages by cursor; (bytes per page, query ms, serialize ms)."""
+    sizes, query_times, dump_times = [], [], []
+    cursor = None
+    db = SessionLocal()
+    try:
+        for _ in range(pages):
+            t0 = time.perf_counter()
+            page = call(db, cursor)
+            t1 = time.perf_counter()
+            body = dump_json(schema, page)
+            t2 = time.perf_counter()
+            sizes.append(len(body))
+            query_times.append(t1 - t0)
+            dump_times.append(t2 - t1)
+            db.expunge_all()
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+    finally:
+        db.close()
+    return statistics.mean(sizes), statistics.median(query_times) * 1000, statistics.median(dump_times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"Seeding {args.rows:,} books, copies, loans and requests ...")
+    seed(args.rows)
+    admin = Principal(id=1, email="member1@example.com", role="admin", is_active=True, created_at=datetime.utcnow())
+    size = args.page_size
+
+    endpoints = {
+        "/books/": (
+            lambda view: lambda db, cursor: get_books(db, limit=size, cursor=cursor, view=view),
+            Page[BookRead], Page[BookSummary],
+        ),
+        "/copies/": (
+            lambda view: lambda db, cursor: get_all_copies(db, limit=size, cursor=cursor, view=view),
+            Page[BookCopyRead], Page[BookCopySummary],
+        ),
+        "/issues/": (
+            lambda view: lambda db, cursor: get_issues(db, admin, limit=size, cursor=cursor, view=view),
+            Page[IssueRead], Page[IssueSummary],
+        ),
+        "/requests/": (
+            lambda view: lambda db, cursor: get_requests(db, admin, limit=size, cursor=cursor, view=view),
+            Page[IssueRequestRead], Page[IssueRequestSummary],
+        ),
+    }
+
+    print(f"\n{'endpoint':<11} {'view':<8} {'bytes/page':>11} {'query ms':>9} {'serialize ms':>13} {'total ms':>9}")
+    for path, (call, full_schema, summary_schema) in endpoints.items():
+        for view, schema in ((ListView.FULL, full_schema), (ListView.SUMMARY, summary_schema)):
+            nbytes, query_ms, dump_ms = measure(call(view), schema, args.pages)
+            print(
+                f"{path:<11} {view.value:<8} {nbytes:>11,.0f} {query_ms:>9.2f} {dump_ms:>13.2f} "
+                f"{query_ms + dump_ms:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
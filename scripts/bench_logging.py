@@ -0,0 +1,133 @@
+"""Benchmark: per-request cost of the log_requests middleware.
+
+Calls the middleware directly with a canned response, so the number is the
+logging overhead a request pays on the event loop. Compares the old setup
+(f-strings, StreamHandler + unbuffered FileHandler written inline) with the
+queue pipeline, with and without access-line sampling. Console output goes to
+os.devnull and app.log to a temporary directory in every mode. The request
+metrics and query stats the middleware also records are switched off, so the
+queue modes time logging alone, like the legacy one.
+
+Usage:
+    python scripts/bench_logging.py [--requests 20000] [--sample-rate 0.1]
+"""
+import sys
+import os
+import argparse
+import asyncio
+import logging
+import logging.config
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp()
+os.chdir(_tmpdir)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench_logging.db')}"
+
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+import app.main
+from app.main import log_requests
+from app.core import logging as app_logging
+from app.core.instrumentation import QueryStats
+
+DEVNULL = open(os.devnull, "w")
+
+# The configuration before the queue pipeline
+LEGACY_CONFIG = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "standard": {
+            "format": "%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+            "datefmt": "%Y-%m-%d %H:%M:%S",
+        },
+        "json": {
+            "format": '{"time": "%(asctime)s", "level": "%(levelname)s", "name": "%(name)s", "message": "%(message)s"}',
+            "datefmt": "%Y-%m-%d %H:%M:%S",
+        },
+    },
+    "handlers": {
+        "console": {"level": "INFO", "formatter": "standard", "class": "logging.StreamHandler", "stream": DEVNULL},
+        "file": {"level": "INFO", "formatter": "json", "class": "logging.FileHandler", "filename": "legacy.log"},
+    },
+    "loggers": {
+        "app": {"handlers": ["console", "file"], "level": "INFO", "propagate": False},
+    },
+}
+
+legacy_logger = logging.getLogger("app")
+
+
+async def legacy_log_requests(request, call_next):
+    start_time = time.time()
+    response = await call_next(request)
+    process_time = (time.time() - start_time) * 1000
+    formatted_process_time = "{0:.2f}".format(process_time)
+    legacy_logger.info(f"path={request.url.path} method={request.method} status={response.status_code} duration={formatted_process_time}ms")
+    return response
+
+
+async def call_next(request):
+    return PlainTextResponse("ok")
+
+
+def make_request():
+    return Request({
+        "type": "http", "method": "GET", "path": "/books/", "root_path": "", "scheme": "http",
+        "query_string": b"", "headers": [], "server": ("testserver", 80),
+    })
+
+
+async def measure(middleware, count: int):
+    t0 = time.perf_counter()
+    for _ in range(count):
+        await middleware(make_request(), call_next)
+    return (time.perf_counter() - t0) / count * 1e6
+
+
+def disable_metrics():
+    # log_requests looks these up in app.main at call time
+    app.main.begin_request = lambda request: QueryStats(False)
+    app.main.record_request = lambda request, status_code, duration, stats: None
+    app.main.server_timing = lambda stats: None
+
+
+def use_queue_pipeline(sample_rate: float):
+    app_logging.setup_logging()
+    for handler in app_logging._listener.handlers:
+        if isinstance(handler, logging.StreamHandler) and not isinstance(handler, logging.FileHandler):
+            handler.setStream(DEVNULL)
+    for log_filter in logging.getLogger("app.access").filters:
+        log_filter.rate = sample_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--sample-rate", type=float, default=0.1)
+    args = parser.parse_args()
+
+    disable_metrics()
+    results = []
+
+    app_logging.shutdown_logging()
+    logging.config.dictConfig(LEGACY_CONFIG)
+    results.append(("legacy (inline handlers)", asyncio.run(measure(legacy_log_requests, args.requests)), 0.0))
+
+    for label, rate in (("queue pipeline", 1.0), (f"queue, {args.sample_rate:.0%} sampled", args.sample_rate)):
+        use_queue_pipeline(rate)
+        per_request = asyncio.run(measure(log_requests, args.requests))
+        t0 = time.perf_counter()
+        app_logging.shutdown_logging()
+        results.append((label, per_request, time.perf_counter() - t0))
+
+    print(f"{args.requests:,} requests per mode\n")
+    print(f"{'mode':<26} {'us/request':>11} {'drain s':>8}")
+    for label, per_request, drain in results:
+        print(f"{label:<26} {per_request:>11.1f} {drain:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Load test: non-auth endpoint latency during a login storm.
+
+Starts the API with uvicorn on a throwaway SQLite database, registers one
+user, then probes `GET /` continuously. The probe runs alone for a baseline
+window and then alongside a burst of concurrent `/auth/token` logins. With
+bcrypt on the hash pool the probe latency should stay flat during the storm.
+
+Usage:
+    python scripts/bench_login_storm.py [--logins 200] [--concurrency 20] [--port 8123]
+"""
+import sys
+import os
+import argparse
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(port: int):
+    tmpdir = tempfile.mkdtemp()
+    # The storm is one account from one IP; the login rate limit would refuse most of it
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(tmpdir, 'bench_login.db')}",
+        RATE_LIMIT_ENABLED="false",
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=tmpdir, env=dict(env, PYTHONPATH=ROOT),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(50):
+        try:
+            requests.get(base_url)
+            return proc, base_url
+        except requests.exceptions.ConnectionError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("Server failed to start")
+
+
+def probe(base_url: str, stop: threading.Event, samples: list):
+    session = requests.Session()
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        session.get(f"{base_url}/")
+        samples.append((time.perf_counter() - t0) * 1000)
+        time.sleep(0.01)
+
+
+def login_worker(base_url: str, count: int, credentials: dict, failures: list):
+    session = requests.Session()
+    for _ in range(count):
+        if session.post(f"{base_url}/auth/token", data=credentials).status_code != 200:
+            failures.append(1)
+
+
+def summarize(label: str, samples: list):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<10} n={len(samples):<5} p50={statistics.median(samples):7.2f}ms "
+          f"p95={p95:7.2f}ms max={samples[-1]:7.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--baseline", type=float, default=2.0, help="seconds of probing before the storm")
+    parser.add_argument("--port", type=int, default=8123)
+    args = parser.parse_args()
+
+    proc, base_url = start_server(args.port)
+    try:
+        credentials = {"username": "storm@example.com", "password": "stormpassword"}
+        requests.post(f"{base_url}/users/", json={"email": credentials["username"], "password": credentials["password"]})
+
+        baseline, storm = [], []
+        stop = threading.Event()
+        prober = threading.Thread(target=probe, args=(base_url, stop, baseline))
+        prober.start()
+        time.sleep(args.baseline)
+        stop.set()
+        prober.join()
+
+        stop = threading.Event()
+        prober = threading.Thread(target=probe, args=(base_url, stop, storm))
+        failures = []
+        per_worker = max(1, args.logins // args.concurrency)
+        workers = [
+            threading.Thread(target=login_worker, args=(base_url, per_worker, credentials, failures))
+            for _ in range(args.concurrency)
+        ]
+        prober.start()
+        t0 = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - t0
+        stop.set()
+        prober.join()
+
+        logins = per_worker * args.concurrency
+        print(f"{logins} logins in {elapsed:.2f}s ({logins / elapsed:.1f}/s), {len(failures)} failed\n")
+        print("GET / latency")
+        summarize("baseline", baseline)
+        summarize("storm", storm)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+if __name__ == "__main__":
+    main()
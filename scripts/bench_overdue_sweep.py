@@ -0,0 +1,145 @@
+"""Benchmark: overdue sweep over a large loans table.
+
+Seeds a throwaway SQLite database with N issues (5,000,000 by default): most
+returned, the open ones spread between not yet due and up to a month late.
+Then times the first sweep (flags every late loan), an immediate re-sweep
+(nothing changed, should touch no rows), a sweep a day later (only fines grow)
+and the first pages of /issues/overdue, and prints the UPDATE's query plan.
+
+Usage:
+    python scripts/bench_overdue_sweep.py [--loans 5000000] [--open-ratio 0.1]
+"""
+import sys
+import os
+import argparse
+import random
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench_overdue_sweep.db')}"
+
+from datetime import datetime, timedelta
+from sqlalchemy import insert, or_, update
+from app.database import SessionLocal, engine
+from app.migrations import run_migrations
+from app.models import *  # noqa: F401,F403 - register all models
+from app.controllers.transaction import OPEN_ISSUE_STATUSES, _days_overdue, get_overdue_issues, sweep_overdue
+
+BATCH = 50_000
+COPIES = 10_000
+
+
+def seed(loans: int, open_ratio: float):
+    run_migrations(engine)
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Publisher), [{"id": 1, "name": "Bench Publisher"}])
+        conn.execute(insert(User), [
+            {"id": 1, "email": "member@example.com", "hashed_password": "x", "role": "member", "is_active": True},
+        ])
+        conn.execute(insert(Book), [
+            {"id": i, "isbn": f"isbn-{i}", "title": f"Book {i}", "publisher_id": 1} for i in range(1, 101)
+        ])
+        conn.execute(insert(BookCopy), [
+            {"id": i, "book_id": (i % 100) + 1, "status": "issued", "created_at": now} for i in range(1, COPIES + 1)
+        ])
+        open_loans = 0
+        for start in range(0, loans, BATCH):
+            rows = []
+            for i in range(start, min(start + BATCH, loans)):
+                issue_date = now - timedelta(days=rng.randint(1, 60))
+                return_date = issue_date + timedelta(days=14)
+                if rng.random() < open_ratio:
+                    status, actual = "issued", None
+                    open_loans += 1
+                else:
+                    status, actual = "returned", return_date - timedelta(days=rng.randint(0, 10))
+                rows.append({
+                    "user_id": 1, "copy_id": (i % COPIES) + 1, "issue_date": issue_date,
+                    "return_date": return_date, "actual_return_date": actual,
+                    "status": status, "fine_amount": 0.0,
+                })
+            conn.execute(insert(Issue), rows)
+    return open_loans
+
+
+def timed(label: str, fn):
+    t0 = time.perf_counter()
+    result = fn()
+    print(f"{label:<28} {(time.perf_counter() - t0) * 1000:>10.1f} ms   {result}")
+    return result
+
+
+def sweep(now: datetime):
+    db = SessionLocal()
+    try:
+        return f"{sweep_overdue(db, now):,} rows"
+    finally:
+        db.close()
+
+
+def overdue_pages(pages: int, page_size: int):
+    db = SessionLocal()
+    cursor, seen = None, 0
+    try:
+        for _ in range(pages):
+            page = get_overdue_issues(db, limit=page_size, cursor=cursor)
+            seen += len(page["items"])
+            db.expunge_all()
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+    finally:
+        db.close()
+    return f"{seen:,} issues"
+
+
+def print_plan(now: datetime):
+    db = SessionLocal()
+    try:
+        fine = _days_overdue(db, now) * 10.0
+        statement = (
+            update(Issue)
+            .where(
+                Issue.status.in_(OPEN_ISSUE_STATUSES),
+                Issue.return_date < now,
+                or_(Issue.status == "issued", Issue.fine_amount < fine),
+            )
+            .values(status="overdue", fine_amount=fine)
+        )
+        compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+        with engine.connect() as conn:
+            for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").all():
+                print(f"  {row[-1]}")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--loans", type=int, default=5_000_000)
+    parser.add_argument("--open-ratio", type=float, default=0.1)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"Seeding {args.loans:,} loans ...")
+    t0 = time.perf_counter()
+    open_loans = seed(args.loans, args.open_ratio)
+    print(f"Seeded in {time.perf_counter() - t0:.1f}s ({open_loans:,} open)\n")
+
+    now = datetime.utcnow()
+    print("Sweep plan:")
+    print_plan(now)
+    print()
+    timed("first sweep", lambda: sweep(now))
+    timed("re-sweep (no change)", lambda: sweep(now))
+    timed("sweep one day later", lambda: sweep(now + timedelta(days=1)))
+    timed(f"overdue list ({args.pages} pages)", lambda: overdue_pages(args.pages, args.page_size))
+
+
+if __name__ == "__main__":
+    main()
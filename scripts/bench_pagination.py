@@ -0,0 +1,101 @@
+"""Benchmark: offset vs keyset (cursor) pagination over the issues table.
+
+Seeds a throwaway SQLite database with N issues (1,000,000 by default) and
+pages through all of them through `get_issues`, once with `skip` (OFFSET) and
+once with `cursor`, reporting total time and the latency of early vs deep
+pages.
+
+Usage:
+    python scripts/bench_pagination.py [--rows 1000000] [--page-size 1000]
+"""
+import sys
+import os
+import argparse
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench_pagination.db')}"
+
+from datetime import datetime
+from sqlalchemy import insert
+from app.database import SessionLocal, engine, Base
+from app.models import *  # noqa: F401,F403 - register all models
+from app.controllers.transaction import get_issues
+
+BATCH = 50_000
+
+
+def seed(rows: int):
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Publisher), [{"id": 1, "name": "Bench Publisher"}])
+        conn.execute(insert(Author), [{"id": 1, "name": "Bench Author"}])
+        conn.execute(insert(User), [
+            {"id": 1, "email": "admin@example.com", "hashed_password": "x", "role": "admin", "is_active": True},
+            {"id": 2, "email": "member@example.com", "hashed_password": "x", "role": "member", "is_active": True},
+        ])
+        conn.execute(insert(Book), [
+            {"id": i, "isbn": f"isbn-{i}", "title": f"Book {i}", "publisher_id": 1} for i in range(1, 101)
+        ])
+        conn.execute(insert(book_authors), [{"book_id": i, "author_id": 1} for i in range(1, 101)])
+        conn.execute(insert(BookCopy), [
+            {"id": i, "book_id": (i % 100) + 1, "status": "issued", "created_at": now} for i in range(1, 1001)
+        ])
+        for start in range(0, rows, BATCH):
+            conn.execute(insert(Issue), [
+                {"user_id": 2, "copy_id": (i % 1000) + 1, "issue_date": now, "status": "issued", "fine_amount": 0.0}
+                for i in range(start, min(start + BATCH, rows))
+            ])
+
+
+def walk(mode: str, page_size: int):
+    db = SessionLocal()
+    admin = db.get(User, 1)
+    page_times = []
+    skip, cursor, seen = 0, None, 0
+    started = time.perf_counter()
+    try:
+        while True:
+            t0 = time.perf_counter()
+            if mode == "offset":
+                page = get_issues(db, admin, skip=skip, limit=page_size)
+            else:
+                page = get_issues(db, admin, limit=page_size, cursor=cursor)
+            page_times.append(time.perf_counter() - t0)
+            seen += len(page["items"])
+            db.expunge_all()
+            if not page["next_cursor"]:
+                break
+            skip += page_size
+            cursor = page["next_cursor"]
+    finally:
+        db.close()
+    total = time.perf_counter() - started
+    return seen, total, page_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"Seeding {args.rows:,} issues ...")
+    t0 = time.perf_counter()
+    seed(args.rows)
+    print(f"Seeded in {time.perf_counter() - t0:.1f}s\n")
+
+    print(f"{'mode':<8} {'rows':>10} {'total s':>9} {'first ms':>9} {'last ms':>9} {'pages':>7}")
+    for mode in ("offset", "cursor"):
+        seen, total, page_times = walk(mode, args.page_size)
+        print(
+            f"{mode:<8} {seen:>10,} {total:>9.2f} {page_times[0] * 1000:>9.1f} "
+            f"{page_times[-1] * 1000:>9.1f} {len(page_times):>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
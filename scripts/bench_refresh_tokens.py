@@ -0,0 +1,103 @@
+"""Benchmark: password-hash work saved by refresh tokens and the login rate limit.
+
+Runs the API in-process on a throwaway SQLite database and measures:
+
+1. Renewing a session: `POST /auth/token` (a bcrypt verify) against
+   `POST /auth/refresh` (a few indexed queries), in wall and CPU
+   milliseconds per call, and the bcrypt hashes each one runs.
+2. A working day (--hours) of 30-minute access tokens per user: logging in
+   again at every expiry against one login followed by refreshes. Reports the
+   bcrypt CPU seconds per 1000 users.
+3. A password-guessing burst: --attempts wrong passwords for one account
+   from one IP, with the rate limiter off and on. Reports how many bcrypt
+   verifies ran and the CPU the burst cost.
+
+Usage:
+    python scripts/bench_refresh_tokens.py [--renewals 200] [--hours 8] [--attempts 300]
+"""
+import sys
+import os
+import argparse
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench_refresh_tokens.db')}"
+os.environ.setdefault("ACCESS_LOG_SAMPLE_RATE", "0")
+os.environ.setdefault("OVERDUE_SWEEP_SECONDS", "0")
+os.environ.setdefault("HOLD_EXPIRY_SECONDS", "0")
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core import rate_limit
+from app.core.hashing import hash_pool
+from app.utils import ACCESS_TOKEN_EXPIRE_MINUTES
+
+CREDENTIALS = {"username": "bench@example.com", "password": "benchpassword"}
+
+
+def measure(fn, calls: int):
+    """(wall ms per call, CPU ms per call, bcrypt hashes per call)."""
+    hashes = hash_pool.stats()["completed"]
+    wall, cpu = time.perf_counter(), time.process_time()
+    for _ in range(calls):
+        fn()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return wall / calls * 1000, cpu / calls * 1000, (hash_pool.stats()["completed"] - hashes) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--renewals", type=int, default=200)
+    parser.add_argument("--hours", type=float, default=8)
+    parser.add_argument("--attempts", type=int, default=300)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        client.post("/users/", json={"email": CREDENTIALS["username"], "password": CREDENTIALS["password"]})
+        rate_limit.RATE_LIMIT_ENABLED = False
+
+        def login():
+            response = client.post("/auth/token", data=CREDENTIALS)
+            assert response.status_code == 200, response.status_code
+
+        refresh_token = [client.post("/auth/token", data=CREDENTIALS).json()["refresh_token"]]
+
+        def refresh():
+            response = client.post("/auth/refresh", json={"refresh_token": refresh_token[0]})
+            assert response.status_code == 200, response.status_code
+            refresh_token[0] = response.json()["refresh_token"]
+
+        print(f"{'renewal':<16} {'wall ms':>9} {'CPU ms':>9} {'hashes':>7}")
+        costs = {}
+        for name, fn in (("login", login), ("refresh", refresh)):
+            costs[name] = measure(fn, args.renewals)
+            wall, cpu, hashes = costs[name]
+            print(f"{name:<16} {wall:>9.2f} {cpu:>9.2f} {hashes:>7.2f}")
+
+        renewals = int(args.hours * 60 // ACCESS_TOKEN_EXPIRE_MINUTES)
+        relogin = renewals * costs["login"][1]
+        with_refresh = costs["login"][1] + (renewals - 1) * costs["refresh"][1]
+        print(f"\n{args.hours:g}h day, {renewals} access tokens per user, CPU seconds per 1000 users:")
+        print(f"  log in at every expiry   {relogin:>8.1f}")
+        print(f"  log in once, refresh     {with_refresh:>8.1f}  ({relogin / with_refresh:.1f}x less)")
+
+        print(f"\n{'burst':<16} {'attempts':>8} {'401':>6} {'429':>6} {'hashes':>7} {'CPU s':>7}")
+        for enabled in (False, True):
+            rate_limit.RATE_LIMIT_ENABLED = enabled
+            rate_limit.configure_store()
+            hashes = hash_pool.stats()["completed"]
+            cpu = time.process_time()
+            codes = [
+                client.post("/auth/token", data={**CREDENTIALS, "password": f"guess-{n}"}).status_code
+                for n in range(args.attempts)
+            ]
+            print(
+                f"{'limiter ' + ('on' if enabled else 'off'):<16} {args.attempts:>8} {codes.count(401):>6} "
+                f"{codes.count(429):>6} {hash_pool.stats()['completed'] - hashes:>7} {time.process_time() - cpu:>7.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark: catalog reads with and without the response cache.
+
+Seeds a throwaway SQLite database with a catalog, then requests `GET /books/`
+(a page of --page-size books) and `GET /books/{id}` through the ASGI app in
+three ways: with the cache disabled (every request queries and serializes),
+cached (200 served from the LRU) and revalidated (the client sends the ETag
+back and gets 304). Prints requests/sec and median latency for each.
+
+Usage:
+    python scripts/bench_response_cache.py [--books 2000] [--page-size 100] [--requests 2000]
+"""
+import sys
+import os
+import argparse
+import statistics
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench_response_cache.db')}"
+os.environ.setdefault("ACCESS_LOG_SAMPLE_RATE", "0")
+os.environ.setdefault("OVERDUE_SWEEP_SECONDS", "0")
+os.environ.setdefault("HOLD_EXPIRY_SECONDS", "0")
+
+from datetime import datetime
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from app.database import engine
+from app.main import app
+from app.models import *  # noqa: F401,F403 - register all models
+from app.core.response_cache import response_cache, RESPONSE_CACHE_SIZE
+
+
+def seed(books: int):
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Publisher), [{"id": i, "name": f"Publisher {i}"} for i in range(1, 51)])
+        conn.execute(insert(Author), [{"id": i, "name": f"Author {i}"} for i in range(1, 501)])
+        conn.execute(insert(Book), [
+            {"id": i, "isbn": f"isbn-{i}", "title": f"Book {i}", "publication_year": 1950 + i % 70,
+             "publisher_id": i % 50 + 1, "total_copies": 2, "available_copies": 2}
+            for i in range(1, books + 1)
+        ])
+        conn.execute(insert(book_authors), [
+            {"book_id": i, "author_id": a} for i in range(1, books + 1) for a in {i % 500 + 1, (i * 7) % 500 + 1}
+        ])
+        conn.execute(insert(BookCopy), [
+            {"book_id": i, "status": "available", "created_at": now} for i in range(1, books + 1) for _ in range(2)
+        ])
+
+
+def run(client, headers, path, requests, etag=None):
+    latencies = []
+    expected = 304 if etag else 200
+    request_headers = {**headers, "If-None-Match": etag} if etag else headers
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        response = client.get(path, headers=request_headers)
+        latencies.append(time.perf_counter() - t0)
+        assert response.status_code == expected, response.status_code
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        seed(args.books)
+        credentials = {"username": "bench@example.com", "password": "benchpassword"}
+        client.post("/users/", json={"email": credentials["username"], "password": credentials["password"]})
+        token = client.post("/auth/token", data=credentials).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        print(f"{'endpoint':<22} {'mode':<12} {'req/s':>8} {'p50 ms':>8}")
+        for path in (f"/books/?limit={args.page_size}", f"/books/{args.books // 2}"):
+            for mode in ("uncached", "cached", "revalidated"):
+                # A zero-sized LRU evicts every entry as soon as it is stored
+                response_cache.local.maxsize = 0 if mode == "uncached" else RESPONSE_CACHE_SIZE
+                etag = client.get(path, headers=headers).headers["etag"] if mode == "revalidated" else None
+                t0 = time.perf_counter()
+                latencies = run(client, headers, path, args.requests, etag)
+                elapsed = time.perf_counter() - t0
+                print(
+                    f"{path.split('?')[0]:<22} {mode:<12} {args.requests / elapsed:>8.0f} "
+                    f"{statistics.median(latencies) * 1000:>8.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark: full-text catalog search on a large catalog.
+
+Seeds a throwaway SQLite database with N books (500,000 by default) and
+random titles, authors and publishers. Index maintenance happens in the FTS
+triggers during the seed. Then it times `search_books` for a set of queries
+and compares it with a naive LIKE scan.
+
+Usage:
+    python scripts/bench_search.py [--books 500000] [--repeat 20]
+"""
+import sys
+import os
+import argparse
+import random
+import statistics
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench_search.db')}"
+
+from sqlalchemy import insert, or_
+from app.database import SessionLocal, engine, Base
+from app.models import *  # noqa: F401,F403 - register all models
+from app.controllers.book import search_books
+
+BATCH = 20_000
+WORDS = (
+    "river night garden shadow empire silent winter python data history ocean "
+    "machine learning stars city ghost kingdom secret storm light dark journey "
+    "memory code fire glass mountain island war peace dream letters"
+).split()
+SURNAMES = "smith garcia tanaka okafor novak ivanova silva kowalski nguyen haddad".split()
+QUERIES = ["python", "pyth", "silent river", "tanaka", "garc kingdom", "978-1-00012", "penguin"]
+
+
+def seed(books: int):
+    rng = random.Random(42)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Publisher), [
+            {"id": i + 1, "name": name} for i, name in enumerate(["Penguin", "Orbit", "Tor", "Vintage", "O'Reilly"])
+        ])
+        conn.execute(insert(Author), [
+            {"id": i + 1, "name": f"{rng.choice(WORDS).title()} {rng.choice(SURNAMES).title()}"} for i in range(5000)
+        ])
+        for start in range(0, books, BATCH):
+            ids = range(start + 1, min(start + BATCH, books) + 1)
+            conn.execute(insert(Book), [
+                {
+                    "id": i,
+                    "isbn": f"978-1-{i:08d}",
+                    "title": " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))).title(),
+                    "publisher_id": rng.randint(1, 5),
+                }
+                for i in ids
+            ])
+            conn.execute(insert(book_authors), [{"book_id": i, "author_id": rng.randint(1, 5000)} for i in ids])
+
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"Seeding {args.books:,} books (FTS kept in sync by triggers) ...")
+    t0 = time.perf_counter()
+    seed(args.books)
+    print(f"Seeded in {time.perf_counter() - t0:.1f}s\n")
+
+    db = SessionLocal()
+    print(f"{'query':<16} {'hits':>5} {'fts p50':>9} {'fts max':>9} {'LIKE p50':>9}")
+    for q in QUERIES:
+        hits = len(search_books(db, q))
+        fts_p50, fts_max = timed(lambda: search_books(db, q), args.repeat)
+        pattern = f"%{q}%"
+        like_p50, _ = timed(
+            lambda: db.query(Book.id).filter(or_(Book.title.ilike(pattern), Book.isbn.ilike(pattern))).limit(20).all(),
+            max(1, args.repeat // 4),
+        )
+        print(f"{q:<16} {hits:>5} {fts_p50:>8.2f}ms {fts_max:>8.2f}ms {like_p50:>8.2f}ms")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Benchmark: mixed read/write load under each SQLite profile.
+
+For every configuration below, seeds a throwaway SQLite database and runs N
+threads for a fixed time, each on its own sessions. A thread mostly reads a
+page of /books/ (get_books), and with probability --write-ratio checks out a
+copy and returns it instead (checkout_book + return_book: two write
+transactions). Prints reads/s, writes/s, p50/p99 latency of each and the
+number of "database is locked" errors.
+
+  legacy              rollback journal, driver defaults, one pool
+  production-shared   production pragmas (WAL etc.), one pool for everything
+  production          production pragmas plus the single-writer connection
+
+Each configuration runs in a fresh interpreter because the engines are built
+at import time from SQLITE_PROFILE / SQLITE_SINGLE_WRITER.
+
+Usage:
+    python scripts/bench_sqlite_profiles.py [--threads 16] [--seconds 10] [--write-ratio 0.2] [--books 200]
+"""
+import sys
+import os
+import argparse
+import json
+import subprocess
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench_sqlite_profiles.db')}"
+
+CONFIGURATIONS = {
+    "legacy": {"SQLITE_PROFILE": "legacy"},
+    "production-shared": {"SQLITE_PROFILE": "production", "SQLITE_SINGLE_WRITER": "false"},
+    "production": {"SQLITE_PROFILE": "production"},
+}
+
+
+def percentile(values, pct):
+    return sorted(values)[min(len(values) - 1, int(len(values) * pct))] if values else 0.0
+
+
+def run_workload(args):
+    """Child process: seed, hammer, print one JSON line of results."""
+    import logging
+    import random
+    import threading
+    import time
+    from fastapi import HTTPException
+    from sqlalchemy import insert
+    from sqlalchemy.exc import OperationalError
+    from app.database import SessionLocal, engine
+    from app.migrations import run_migrations
+    from app.models import Author, Book, BookCopy, Publisher, User, book_authors
+    from app.schemas.transaction import BookCheckout
+    from app.controllers.book import get_books, reconcile_copy_counters
+    from app.controllers.transaction import checkout_book, return_book
+
+    # Lost races are logged as warnings by the controllers
+    logging.getLogger("app").setLevel(logging.ERROR)
+    run_migrations(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Publisher), [{"id": 1, "name": "Bench Publisher"}])
+        conn.execute(insert(Author), [{"id": i, "name": f"Author {i}"} for i in range(1, 51)])
+        conn.execute(insert(User), [
+            {"id": i, "email": f"clerk{i}@example.com", "hashed_password": "x", "role": "member", "is_active": True}
+            for i in range(1, args.threads + 1)
+        ])
+        conn.execute(insert(Book), [
+            {"id": i, "isbn": f"isbn-{i}", "title": f"Book {i}", "publisher_id": 1,
+             "total_copies": 2, "available_copies": 2}
+            for i in range(1, args.books + 1)
+        ])
+        conn.execute(insert(book_authors), [{"book_id": i, "author_id": i % 50 + 1} for i in range(1, args.books + 1)])
+        conn.execute(insert(BookCopy), [
+            {"book_id": i, "status": "available"} for i in range(1, args.books + 1) for _ in range(2)
+        ])
+
+    latencies = {"read": [], "write": []}
+    errors = {"locked": 0, "conflicts": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.seconds
+
+    def worker(n):
+        rng = random.Random(n)
+        local = {"read": [], "write": []}
+        locked = conflicts = 0
+        while time.monotonic() < deadline:
+            kind = "write" if rng.random() < args.write_ratio else "read"
+            db = SessionLocal()
+            t0 = time.perf_counter()
+            try:
+                if kind == "read":
+                    get_books(db, skip=rng.randrange(0, args.books - 20), limit=20)
+                else:
+                    issue = checkout_book(db, rng.randint(1, args.books), BookCheckout(user_id=n + 1))
+                    return_book(db, issue.id)
+                local[kind].append(time.perf_counter() - t0)
+            except HTTPException:
+                db.rollback()
+                conflicts += 1
+            except OperationalError:
+                # "database is locked"
+                db.rollback()
+                locked += 1
+            finally:
+                db.close()
+        with lock:
+            for key in local:
+                latencies[key].extend(local[key])
+            errors["locked"] += locked
+            errors["conflicts"] += conflicts
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.threads)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    db = SessionLocal()
+    drifted = len(reconcile_copy_counters(db, dry_run=True))
+    db.close()
+    print(json.dumps({
+        "reads_per_s": len(latencies["read"]) / elapsed,
+        "writes_per_s": len(latencies["write"]) / elapsed,
+        "read_p50": percentile(latencies["read"], 0.5) * 1000,
+        "read_p99": percentile(latencies["read"], 0.99) * 1000,
+        "write_p50": percentile(latencies["write"], 0.5) * 1000,
+        "write_p99": percentile(latencies["write"], 0.99) * 1000,
+        "locked": errors["locked"],
+        "drifted": drifted,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--books", type=int, default=200)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.books <= 20:
+        # Reads page through the catalog 20 books at a time
+        parser.error("--books must be more than 20")
+
+    if args.child:
+        run_workload(args)
+        return
+
+    print(f"{args.threads} threads, {args.seconds:.0f}s each, {args.write_ratio:.0%} writes\n")
+    print(
+        f"{'profile':<19} {'reads/s':>8} {'writes/s':>9} {'read p50':>9} {'read p99':>9} "
+        f"{'write p50':>10} {'write p99':>10} {'locked':>7}"
+    )
+    for name, env in CONFIGURATIONS.items():
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", *sys.argv[1:]],
+            env={**os.environ, "ACCESS_LOG_SAMPLE_RATE": "0", **env},
+            capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{name:<19} {result['reads_per_s']:>8.0f} {result['writes_per_s']:>9.0f} "
+            f"{result['read_p50']:>9.2f} {result['read_p99']:>9.2f} "
+            f"{result['write_p50']:>10.2f} {result['write_p99']:>10.2f} {result['locked']:>7}"
+            + (f"  ({result['drifted']} books drifted)" if result["drifted"] else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
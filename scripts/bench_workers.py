@@ -0,0 +1,166 @@
+"""Load test: throughput of `python -m app.serve` from 1 to N worker processes.
+
+For each worker count, starts the server on its own throwaway SQLite database
+(response cache off, so every request reaches the database), seeds a small
+catalog through the API, then runs --concurrency clients against
+`GET /books/` and `GET /books/{id}` for a fixed time. The clients are spread
+over several processes so the load generator is not held back by its own GIL.
+Prints requests/sec and latency percentiles per worker count, and checks that
+the log collector wrote one access line per request into the single app.log.
+
+Scaling is bounded by the cores available: on a machine with fewer cores
+than workers (plus the client processes) the extra workers only add context
+switches.
+
+Usage:
+    python scripts/bench_workers.py [--workers 1,2,4] [--concurrency 64] [--seconds 10] [--port 8125]
+"""
+import sys
+import os
+import argparse
+import multiprocessing
+import random
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(port: int, workers: int, pool_budget: int):
+    tmpdir = tempfile.mkdtemp()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(tmpdir, 'bench_workers.db')}",
+        RESPONSE_CACHE_SIZE="0",
+        PYTHONPATH=ROOT,
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--workers", str(workers), "--port", str(port),
+         "--pool-budget", str(pool_budget), "--log-level", "warning"],
+        cwd=tmpdir, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(base_url)
+            return proc, base_url, tmpdir
+        except requests.exceptions.ConnectionError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("Server failed to start")
+
+
+def seed(base_url: str, books: int):
+    credentials = {"username": "bench@example.com", "password": "benchpassword"}
+    requests.post(f"{base_url}/users/", json={
+        "email": credentials["username"], "password": credentials["password"], "role": "admin"
+    })
+    token = requests.post(f"{base_url}/auth/token", data=credentials).json()["access_token"]
+    session = requests.Session()
+    session.headers["Authorization"] = f"Bearer {token}"
+    session.post(f"{base_url}/books/bulk", json=[
+        {"isbn": f"bench-{i}", "title": f"Bench Book {i}", "publisher": "Bench Publisher",
+         "authors": ["Bench Author"], "copies": 2}
+        for i in range(books)
+    ])
+    book_ids = [book["id"] for book in session.get(f"{base_url}/books/", params={"limit": books}).json()["items"]]
+    return token, book_ids
+
+
+def client(base_url: str, token: str, book_ids: list, deadline: float, samples: list, errors: list, seed_value: int):
+    rng = random.Random(seed_value)
+    session = requests.Session()
+    session.headers["Authorization"] = f"Bearer {token}"
+    while time.time() < deadline:
+        if rng.random() < 0.5:
+            url = f"{base_url}/books/"
+            params = {"limit": 20}
+        else:
+            url = f"{base_url}/books/{rng.choice(book_ids)}"
+            params = None
+        t0 = time.perf_counter()
+        response = session.get(url, params=params)
+        samples.append((time.perf_counter() - t0) * 1000)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+
+
+def client_process(job):
+    """Run `threads` clients until `deadline` (wall clock, shared across processes)."""
+    base_url, token, book_ids, deadline, threads, first_seed = job
+    samples, errors = [], []
+    clients = [
+        threading.Thread(target=client, args=(base_url, token, book_ids, deadline, samples, errors, first_seed + n))
+        for n in range(threads)
+    ]
+    for c in clients:
+        c.start()
+    for c in clients:
+        c.join()
+    return samples, errors
+
+
+def count_access_lines(tmpdir: str) -> int:
+    with open(os.path.join(tmpdir, "app.log")) as log:
+        return sum('"name": "app.access"' in line for line in log)
+
+
+def count_access_lines_after_flush(tmpdir: str) -> int:
+    # The collector writes in batches; give the seeding requests time to land
+    time.sleep(1)
+    return count_access_lines(tmpdir)
+
+
+def run(workers: int, args, pool):
+    proc, base_url, tmpdir = start_server(args.port, workers, args.pool_budget)
+    try:
+        token, book_ids = seed(base_url, args.books)
+        logged_before = count_access_lines_after_flush(tmpdir)
+        per_process = -(-args.concurrency // args.client_processes)
+        deadline = time.time() + args.seconds
+        jobs = [
+            (base_url, token, book_ids, deadline, per_process, n * per_process)
+            for n in range(args.client_processes)
+        ]
+        t0 = time.perf_counter()
+        results = pool.map(client_process, jobs)
+        elapsed = time.perf_counter() - t0
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    samples = sorted(sample for result in results for sample in result[0])
+    errors = sum(len(result[1]) for result in results)
+    logged = count_access_lines(tmpdir) - logged_before
+    p99 = samples[max(0, int(len(samples) * 0.99) - 1)]
+    print(f"{workers:<8} {len(samples):>8} {len(samples) / elapsed:>9.1f} {statistics.median(samples):>9.1f} "
+          f"{p99:>9.1f} {errors:>7} {logged:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--client-processes", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--books", type=int, default=200)
+    parser.add_argument("--pool-budget", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8125)
+    args = parser.parse_args()
+
+    counts = [int(n) for n in args.workers.split(",")]
+    print(f"{args.concurrency} clients in {args.client_processes} processes, {args.seconds:.0f}s per run, "
+          f"{os.cpu_count()} CPUs\n")
+    print(f"{'workers':<8} {'requests':>8} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7} {'log lines':>9}")
+    with multiprocessing.Pool(args.client_processes) as pool:
+        for workers in counts:
+            run(workers, args, pool)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Hold queue workflow check.
+
+Runs the API in-process on a throwaway SQLite database and walks one hold
+through its life: a member queues for a book whose only copy is out, the
+copy comes back and is put on hold for them, and an admin fulfils the hold.
+Along the way it checks that an admin cannot mark a request ready by hand
+(a ready request must own a held copy and a pickup deadline) or send a ready
+request back to the queue (it would get its own copy again), and that the
+member can request the book again once the hold is done with. Fails with a
+non-zero exit code on the first step that goes wrong.
+
+Usage:
+    python scripts/check_hold_queue.py
+"""
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'hold_queue.db')}"
+os.environ.setdefault("ACCESS_LOG_SAMPLE_RATE", "0")
+os.environ.setdefault("OVERDUE_SWEEP_SECONDS", "0")
+os.environ.setdefault("HOLD_EXPIRY_SECONDS", "0")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from fastapi.testclient import TestClient
+from app.main import app
+
+failures = []
+
+
+def check(name: str, ok: bool, detail=None):
+    print(f"{'ok' if ok else 'FAIL':<5} {name}" + (f"  ({detail})" if not ok and detail is not None else ""))
+    if not ok:
+        failures.append(name)
+
+
+def login(client, email: str, role: str = "member"):
+    client.post("/users/", json={"email": email, "password": "checkpassword", "role": role})
+    response = client.post("/auth/token", data={"username": email, "password": "checkpassword"})
+    return response.json(), {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def user_id(client, admin, email: str) -> int:
+    users = client.get("/users/", headers=admin).json()["items"]
+    return next(user["id"] for user in users if user["email"] == email)
+
+
+def main():
+    with TestClient(app) as client:
+        _, admin = login(client, "admin@example.com", role="admin")
+        _, borrower = login(client, "borrower@example.com")
+        _, member = login(client, "member@example.com")
+
+        client.post("/books/bulk", headers=admin, json=[
+            {"isbn": "hold-1", "title": "Held Book", "publisher": "Check Publisher",
+             "authors": ["Check Author"], "copies": 1},
+        ])
+        book_id = client.get("/books/", headers=admin).json()["items"][0]["id"]
+        issue = client.post(f"/books/{book_id}/checkout", headers=admin,
+                            json={"user_id": user_id(client, admin, "borrower@example.com")}).json()
+
+        request = client.post("/requests/", headers=member, json={"book_id": book_id}).json()
+        request_id = request["id"]
+        check("request queues as pending", request["status"] == "pending", request["status"])
+
+        response = client.put(f"/requests/{request_id}", headers=admin, json={"status": "ready"})
+        check("pending request cannot be set ready", response.status_code == 400, response.status_code)
+        position = client.get(f"/requests/{request_id}/position", headers=member).json()
+        check("request stays pending at the head of the queue",
+              position["status"] == "pending" and position["position"] == 1, position)
+
+        client.post(f"/issues/{issue['id']}/return", headers=admin)
+        position = client.get(f"/requests/{request_id}/position", headers=member).json()
+        check("returned copy goes on hold for the request",
+              position["status"] == "ready" and position["hold_expires_at"] is not None, position)
+
+        response = client.put(f"/requests/{request_id}", headers=admin, json={"status": "ready"})
+        check("ready request cannot be set ready again", response.status_code == 400, response.status_code)
+        for queued in ("pending", "approved"):
+            response = client.put(f"/requests/{request_id}", headers=admin, json={"status": queued})
+            check(f"ready request cannot go back to {queued}", response.status_code == 400, response.status_code)
+        after = client.get(f"/requests/{request_id}/position", headers=member).json()
+        check("hold and pickup deadline are unchanged",
+              after["status"] == "ready" and after["hold_expires_at"] == position["hold_expires_at"], after)
+
+        response = client.put(f"/requests/{request_id}", headers=admin, json={"status": "fulfilled"})
+        check("hold is fulfilled", response.status_code == 200 and response.json()["status"] == "fulfilled",
+              response.json())
+        book = client.get(f"/books/{book_id}", headers=admin).json()
+        check("copy counters follow the held copy out",
+              (book["available_copies"], book["issued_copies"]) == (0, 1), book)
+
+        response = client.post("/requests/", headers=member, json={"book_id": book_id})
+        check("member can request the book again", response.status_code == 200, response.status_code)
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
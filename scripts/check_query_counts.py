@@ -0,0 +1,144 @@
+"""Query budget check for the list and detail controllers.
+
+Seeds a throwaway SQLite database, runs every controller the way the routers
+do (controller call + response_model serialization) and counts the SQL
+statements emitted. Fails with a non-zero exit code when an endpoint goes over
+its budget, which is what an accidental lazy load (N+1) looks like.
+
+Usage:
+    python scripts/check_query_counts.py
+"""
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'query_counts.db')}"
+
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from app.database import SessionLocal, engine, read_engine, Base
+from app.models import *  # noqa: F401,F403 - register all models
+from app.models.book import BookCopyStatus
+from app.models.transaction import IssueStatus, RequestStatus
+from app.schemas.book import BookRead, BookSummary, BookCopyRead, BookCopySummary
+from app.schemas.transaction import IssueRead, IssueSummary, IssueRequestRead, IssueRequestSummary
+from app.schemas.pagination import ListView, Page
+from app.controllers import book as book_ctrl
+from app.controllers import transaction as transaction_ctrl
+
+ROWS = 50
+
+# Statements allowed per call, independent of the number of rows returned.
+BUDGETS = {
+    "get_books": 2,
+    "get_book": 2,
+    "get_all_copies": 2,
+    "get_issues": 2,
+    "get_requests": 2,
+    # Summary views are a single column SELECT
+    "get_books (summary)": 1,
+    "get_all_copies (summary)": 1,
+    "get_issues (summary)": 1,
+    "get_requests (summary)": 1,
+}
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def seed(db):
+    publisher = Publisher(name="Seed Publisher")
+    authors = [Author(name=f"Author {i}") for i in range(ROWS)]
+    admin = User(email="admin@example.com", hashed_password="x", role="admin")
+    members = [User(email=f"member{i}@example.com", hashed_password="x") for i in range(ROWS)]
+    db.add_all([publisher, admin, *authors, *members])
+    db.flush()
+
+    books = []
+    for i in range(ROWS):
+        book = Book(isbn=f"isbn-{i}", title=f"Book {i}", publisher_id=publisher.id)
+        book.authors = [authors[i], authors[(i + 1) % ROWS]]
+        books.append(book)
+    db.add_all(books)
+    db.flush()
+
+    copies = [BookCopy(book_id=b.id, status=BookCopyStatus.ISSUED.value) for b in books]
+    db.add_all(copies)
+    db.flush()
+
+    db.add_all([
+        Issue(user_id=members[i].id, copy_id=copies[i].id, status=IssueStatus.ISSUED.value)
+        for i in range(ROWS)
+    ])
+    db.add_all([
+        IssueRequest(user_id=members[i].id, book_id=books[i].id, status=RequestStatus.PENDING.value)
+        for i in range(ROWS)
+    ])
+    db.commit()
+    return admin.id, books[0].id
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    admin_id, book_id = seed(db)
+    db.close()
+
+    checks = {
+        "get_books": (lambda db, admin: book_ctrl.get_books(db), Page[BookRead]),
+        "get_book": (lambda db, admin: book_ctrl.get_book(db, book_id), BookRead),
+        "get_all_copies": (lambda db, admin: book_ctrl.get_all_copies(db), Page[BookCopyRead]),
+        "get_issues": (lambda db, admin: transaction_ctrl.get_issues(db, admin), Page[IssueRead]),
+        "get_requests": (lambda db, admin: transaction_ctrl.get_requests(db, admin), Page[IssueRequestRead]),
+        "get_books (summary)": (
+            lambda db, admin: book_ctrl.get_books(db, view=ListView.SUMMARY), Page[BookSummary]
+        ),
+        "get_all_copies (summary)": (
+            lambda db, admin: book_ctrl.get_all_copies(db, view=ListView.SUMMARY), Page[BookCopySummary]
+        ),
+        "get_issues (summary)": (
+            lambda db, admin: transaction_ctrl.get_issues(db, admin, view=ListView.SUMMARY), Page[IssueSummary]
+        ),
+        "get_requests (summary)": (
+            lambda db, admin: transaction_ctrl.get_requests(db, admin, view=ListView.SUMMARY), Page[IssueRequestSummary]
+        ),
+    }
+
+    failures = 0
+    for name, (call, schema) in checks.items():
+        db = SessionLocal()
+        try:
+            # The principal is resolved by the auth dependency, not the controller
+            admin = db.get(User, admin_id)
+            counter = StatementCounter()
+            # Reads and writes may run on different engines (single-writer SQLite)
+            for bind in {engine, read_engine}:
+                event.listen(bind, "before_cursor_execute", counter)
+            try:
+                TypeAdapter(schema).validate_python(call(db, admin), from_attributes=True)
+            finally:
+                for bind in {engine, read_engine}:
+                    event.remove(bind, "before_cursor_execute", counter)
+        finally:
+            db.close()
+
+        budget = BUDGETS[name]
+        status = "ok" if counter.count <= budget else "OVER BUDGET"
+        if counter.count > budget:
+            failures += 1
+        print(f"{name:<24} {counter.count:>3} statements (budget {budget}) {status}")
+
+    if failures:
+        print(f"{failures} controller(s) exceeded their query budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
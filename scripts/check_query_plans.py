@@ -0,0 +1,180 @@
+"""Index check for the hot controller queries.
+
+Builds a throwaway SQLite database through the migrations, seeds it, runs the
+controllers the routers call and captures every statement they emit. Each one
+is then run through EXPLAIN QUERY PLAN; a table step that is a full scan
+(`SCAN <table>` without an index) fails the check with a non-zero exit code.
+
+List endpoints are checked on a page after the first: the first page of an
+unfiltered admin listing is a rowid-ordered scan that stops at the page limit,
+which is expected.
+
+Usage:
+    python scripts/check_query_plans.py
+"""
+import sys
+import os
+import tempfile
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'query_plans.db')}"
+
+from fastapi import HTTPException
+from sqlalchemy import event
+from app.database import SessionLocal, engine, read_engine
+from app.migrations import run_migrations
+from app.models import *  # noqa: F401,F403 - register all models
+from app.models.book import BookCopyStatus
+from app.models.transaction import IssueStatus, RequestStatus
+from app.core.pagination import encode_cursor
+from app.schemas.pagination import ListView
+from app.core.principals import Principal
+from app.schemas.transaction import (
+    BookCheckout, IssueCreate, IssueRequestBulkUpdate, IssueRequestCreate, RequestBulkAction
+)
+from app.controllers import book as book_ctrl
+from app.controllers import transaction as transaction_ctrl
+from app.controllers import user as user_ctrl
+
+ROWS = 200
+
+# Plan steps that read a table through something other than a full scan
+INDEXED_MARKERS = ("USING INDEX", "USING COVERING INDEX", "USING INTEGER PRIMARY KEY", "VIRTUAL TABLE INDEX")
+
+
+class StatementCapture:
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            self.statements.append((statement, parameters))
+
+
+def seed(db):
+    publisher = Publisher(name="Seed Publisher")
+    authors = [Author(name=f"Author {i}") for i in range(ROWS)]
+    admin = User(email="admin@example.com", hashed_password="x", role="admin")
+    members = [User(email=f"member{i}@example.com", hashed_password="x") for i in range(ROWS)]
+    db.add_all([publisher, admin, *authors, *members])
+    db.flush()
+
+    books = []
+    for i in range(ROWS):
+        book = Book(isbn=f"isbn-{i}", title=f"Book {i}", publisher_id=publisher.id)
+        book.authors = [authors[i]]
+        books.append(book)
+    db.add_all(books)
+    db.flush()
+
+    copies = [BookCopy(book_id=b.id, status=BookCopyStatus.ISSUED.value) for b in books]
+    copies += [BookCopy(book_id=b.id, shelf_location="A1") for b in books]
+    db.add_all(copies)
+    db.flush()
+
+    db.add_all([
+        Issue(user_id=members[i].id, copy_id=copies[i].id, status=IssueStatus.ISSUED.value)
+        for i in range(ROWS)
+    ])
+    db.add_all([
+        IssueRequest(user_id=members[i].id, book_id=books[i].id, status=RequestStatus.PENDING.value)
+        for i in range(ROWS)
+    ])
+    db.commit()
+    return admin, members[0], books[1].id
+
+
+def principal(user):
+    return Principal(id=user.id, email=user.email, role=user.role, is_active=True, created_at=datetime.utcnow())
+
+
+def full_scans(connection, statement, parameters):
+    plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    # Subqueries SQLite evaluates first (derived tables, window functions);
+    # scanning their output reads no table
+    derived = {row[-1].split(" ", 1)[1] for row in plan if row[-1].startswith(("CO-ROUTINE ", "MATERIALIZE "))}
+    return [
+        row[-1] for row in plan
+        if row[-1].startswith("SCAN ")
+        and not row[-1].startswith("SCAN CONSTANT ROW")
+        and row[-1][len("SCAN "):] not in derived
+        and not any(marker in row[-1] for marker in INDEXED_MARKERS)
+    ]
+
+
+def main():
+    run_migrations(engine)
+    db = SessionLocal()
+    admin_user, member_user, book_id = seed(db)
+    admin, member = principal(admin_user), principal(member_user)
+    db.close()
+    page_two = encode_cursor(10)
+
+    checks = {
+        "get_books": lambda db: book_ctrl.get_books(db, cursor=page_two),
+        "get_book": lambda db: book_ctrl.get_book(db, book_id),
+        "search_books": lambda db: book_ctrl.search_books(db, "book"),
+        "get_all_copies": lambda db: book_ctrl.get_all_copies(db, cursor=page_two),
+        "get_users": lambda db: user_ctrl.get_users(db, cursor=page_two),
+        "get_user_by_email": lambda db: user_ctrl.get_user_by_email(db, member.email),
+        "get_issues (admin)": lambda db: transaction_ctrl.get_issues(db, admin, cursor=page_two),
+        "get_issues (member)": lambda db: transaction_ctrl.get_issues(db, member),
+        "get_requests (admin)": lambda db: transaction_ctrl.get_requests(db, admin, cursor=page_two),
+        "get_requests (member)": lambda db: transaction_ctrl.get_requests(db, member),
+        "get_books (summary)": lambda db: book_ctrl.get_books(db, cursor=page_two, view=ListView.SUMMARY),
+        "get_all_copies (summary)": lambda db: book_ctrl.get_all_copies(db, cursor=page_two, view=ListView.SUMMARY),
+        "get_issues (summary)": lambda db: transaction_ctrl.get_issues(db, member, view=ListView.SUMMARY),
+        "get_requests (summary)": lambda db: transaction_ctrl.get_requests(db, admin, cursor=page_two, view=ListView.SUMMARY),
+        "create_request": lambda db: transaction_ctrl.create_request(db, IssueRequestCreate(book_id=book_id), member),
+        "checkout_book": lambda db: transaction_ctrl.checkout_book(
+            db, book_id, BookCheckout(user_id=member.id, preferred_shelf="A1")
+        ),
+        "create_issue": lambda db: transaction_ctrl.create_issue(
+            db, IssueCreate(copy_id=ROWS + 3, user_id=member.id)
+        ),
+        "bulk_update_requests": lambda db: transaction_ctrl.bulk_update_requests(
+            db, IssueRequestBulkUpdate(request_ids=list(range(1, 51)), action=RequestBulkAction.FULFILL)
+        ),
+        "return_book": lambda db: transaction_ctrl.return_book(db, 1),
+        "sweep_overdue": lambda db: transaction_ctrl.sweep_overdue(db),
+        "expire_holds": lambda db: transaction_ctrl.expire_holds(db),
+        "get_queue_position": lambda db: transaction_ctrl.get_queue_position(db, ROWS, admin),
+        "get_overdue_issues": lambda db: transaction_ctrl.get_overdue_issues(db),
+    }
+
+    failures = 0
+    for name, call in checks.items():
+        capture = StatementCapture()
+        db = SessionLocal()
+        # Reads and writes may run on different engines (single-writer SQLite)
+        for bind in {engine, read_engine}:
+            event.listen(bind, "before_cursor_execute", capture)
+        try:
+            call(db)
+        except HTTPException:
+            # Business-rule rejections still ran their lookups
+            db.rollback()
+        finally:
+            for bind in {engine, read_engine}:
+                event.remove(bind, "before_cursor_execute", capture)
+            db.close()
+
+        with engine.connect() as connection:
+            scans = [
+                scan for statement, parameters in capture.statements
+                for scan in full_scans(connection, statement, parameters)
+            ]
+        status = "ok" if not scans else "FULL SCAN: " + "; ".join(scans)
+        if scans:
+            failures += 1
+        print(f"{name:<26} {len(capture.statements):>3} statements {status}")
+
+    if failures:
+        print(f"{failures} controller(s) read a table without an index")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
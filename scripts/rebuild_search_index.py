@@ -0,0 +1,21 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import engine, Base
+from app.models import *  # noqa: F401,F403 - register all models
+from app.models.search import FTS_TABLE, fts_available, rebuild_search_index
+
+def rebuild():
+    # create_all also (re)creates the FTS table and its sync triggers if missing
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        if not fts_available(connection):
+            print(f"Full-text index is only available on SQLite (dialect: {connection.dialect.name}).")
+            return
+        rebuild_search_index(connection)
+        count = connection.exec_driver_sql(f"SELECT count(*) FROM {FTS_TABLE}").scalar()
+    print(f"Rebuilt {FTS_TABLE}: {count} books indexed.")
+
+if __name__ == "__main__":
+    rebuild()
@@ -0,0 +1,42 @@
+"""Repair drift in the books.total_copies / available_copies / issued_copies counters.
+
+Recounts every book from book_copies and fixes the ones that disagree, then
+does the same for the library-wide counters behind /metrics (copies by
+status, open issues). Safe to
+run while the API is serving; schedule it (e.g. nightly cron) to catch drift
+from writes that bypassed the controllers.
+
+Usage:
+    python scripts/reconcile_copy_counters.py [--dry-run]
+"""
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine
+from app.migrations import run_migrations_once
+from app.models import *  # noqa: F401,F403 - register all models
+from app.controllers.book import reconcile_copy_counters
+from app.controllers.transaction import reconcile_library_counters
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="report drifted books without fixing them")
+    args = parser.parse_args()
+
+    run_migrations_once(engine)
+    db = SessionLocal()
+    try:
+        book_ids = reconcile_copy_counters(db, dry_run=args.dry_run)
+        drifted = reconcile_library_counters(db, dry_run=args.dry_run)
+    finally:
+        db.close()
+    verb = "would repair" if args.dry_run else "repaired"
+    sample = ", ".join(map(str, book_ids[:20])) + (" ..." if len(book_ids) > 20 else "")
+    print(f"{verb} counters of {len(book_ids)} books" + (f": {sample}" if book_ids else ""))
+    for name, (counted, actual) in sorted(drifted.items()):
+        print(f"{verb} library counter {name}: {counted} -> {actual}")
+
+if __name__ == "__main__":
+    main()